@@ -0,0 +1,329 @@
+# benchmark_anova.py - Benchmark das etapas do pipeline ANOVA fora do Streamlit
+#
+# Gera conjuntos sintéticos no formato do Ames Housing (SalePrice, Neighborhood,
+# House_Style, Bsmt_Full_Bath), variando o número de linhas e de níveis do
+# fator principal, e mede tempo e pico de memória de cada etapa do aplicativo.
+#
+# Uso (a partir da raiz do repositório):
+#   python benchmarks/benchmark_anova.py --linhas 1000 100000 --niveis 3 300 --saida relatorio
+#   python benchmarks/benchmark_anova.py --comparar relatorio_anterior.json --saida relatorio
+#
+# Gera relatorio.json e relatorio.csv. Com --comparar, imprime a razão de
+# tempo em relação a um relatório anterior e termina com código 1 se alguma
+# etapa ficou mais lenta do que --tolerancia.
+
+import argparse
+import ast
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+DIRETORIO_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, DIRETORIO_SRC)
+
+from anova.analises import (  # noqa: E402
+    calcular_anova_multifatorial,
+    calcular_avaliacao,
+    calcular_gameshowell,
+    calcular_permutacao,
+    calcular_qq_medias,
+    calcular_qq_residuos,
+    calcular_resumo_boxplot,
+)
+from anova.dados import carregar_tabela  # noqa: E402
+from anova.graficos import grafico_boxplot, grafico_qq  # noqa: E402
+from anova.indice import IndiceDados  # noqa: E402
+
+VAR_TARGET = 'SalePrice'
+FATORES = ['Neighborhood', 'House_Style', 'Bsmt_Full_Bath']
+ESTILOS = ['1Story', '2Story', '1.5Fin', 'SLvl', 'SFoyer', '2.5Unf', '1.5Unf', '2.5Fin']
+
+# Acima destes tamanhos a etapa não é executada (registrada como "pulado")
+LIMITES_LINHAS = {
+    'boxplot_altair': 1_000_000,
+    'permutacao_f': 100_000,
+}
+LIMITES_NIVEIS = {
+    'gameshowell': 1000,
+}
+
+
+# ================================
+# DADOS SINTÉTICOS
+# ================================
+
+def gerar_dados(n_linhas, n_niveis, semente=0):
+    """
+    Conjunto sintético com o mesmo esquema das colunas analisadas do Ames Housing.
+
+    Os níveis de Neighborhood seguem uma distribuição de Zipf (poucos bairros
+    grandes e muitos pequenos) e cada nível tem média e variância próprias.
+    """
+    rng = np.random.default_rng(semente)
+    pesos = 1.0 / np.arange(1, n_niveis + 1)
+    bairro = rng.choice(n_niveis, size=n_linhas, p=pesos / pesos.sum())
+    estilo = rng.choice(len(ESTILOS), size=n_linhas)
+    banheiros = rng.choice(4, size=n_linhas, p=[0.58, 0.40, 0.015, 0.005])
+
+    efeito_bairro = rng.normal(0, 40_000, n_niveis)
+    escala_bairro = rng.uniform(0.5, 1.5, n_niveis)
+    preco = (180_000 + efeito_bairro[bairro] + 8_000 * estilo + 25_000 * banheiros
+             + rng.normal(0, 30_000, n_linhas) * escala_bairro[bairro])
+
+    return pd.DataFrame({
+        VAR_TARGET: np.round(np.maximum(preco, 10_000)).astype(np.int64),
+        'Neighborhood': np.char.add('N', bairro.astype(str)),
+        'House_Style': np.array(ESTILOS)[estilo],
+        'Bsmt_Full_Bath': banheiros.astype(np.float64),
+    })
+
+
+# ================================
+# ETAPAS
+# ================================
+
+_indices = {}
+
+
+def _indice(df):
+    """IndiceDados de `df`, montado uma vez por conjunto (a montagem é medida na etapa indice_fatores)."""
+    if id(df) not in _indices:
+        _indices.clear()
+        _indices[id(df)] = IndiceDados(df, VAR_TARGET, FATORES)
+    return _indices[id(df)]
+
+
+_amostras = {}
+
+
+def _amostra(df):
+    """Amostra da prévia rápida de `df`, sorteada uma vez por conjunto (o sorteio é medido na etapa amostra_previa)."""
+    if id(df) not in _amostras:
+        _amostras.clear()
+        _amostras[id(df)] = _indice(df).amostra()
+    return _amostras[id(df)]
+
+
+def _qq_plot(df):
+    qq = calcular_qq_medias.__wrapped__(_indice(df), 'Neighborhood')
+    return {'payload_bytes': len(grafico_qq(qq, 'Neighborhood').to_json())}
+
+
+def _qq_residuos(df):
+    qq = calcular_qq_residuos.__wrapped__(_indice(df), 'Neighborhood')
+    return {'payload_bytes': len(grafico_qq(qq, 'Neighborhood').to_json())}
+
+
+def _boxplot_altair(df):
+    chart = alt.Chart(df[['Neighborhood', VAR_TARGET]]).mark_boxplot(extent='min-max').encode(
+        x=alt.X('Neighborhood:N'),
+        y=alt.Y(f'{VAR_TARGET}:Q'),
+        color=alt.Color('Neighborhood:N', legend=None),
+    )
+    with alt.data_transformers.disable_max_rows():
+        return {'payload_bytes': len(chart.to_json())}
+
+
+def _boxplot_resumo(df):
+    resumo, outliers = calcular_resumo_boxplot.__wrapped__(_indice(df), 'Neighborhood')
+    return {'payload_bytes': len(grafico_boxplot(resumo, outliers, 'Neighborhood', VAR_TARGET).to_json())}
+
+
+def modulos_importados_app(caminho=os.path.join(DIRETORIO_SRC, 'streamlit_app.py')):
+    """Módulos importados no nível superior do aplicativo (os que pesam na partida a frio)."""
+    with open(caminho, encoding='utf-8') as f:
+        arvore = ast.parse(f.read())
+    modulos = []
+    for no in arvore.body:
+        if isinstance(no, ast.Import):
+            modulos.extend(alias.name for alias in no.names)
+        elif isinstance(no, ast.ImportFrom) and no.module:
+            modulos.append(no.module)
+    return list(dict.fromkeys(modulos))
+
+
+def _importacao_app():
+    """
+    Importa os módulos do aplicativo em um interpretador novo com `-X importtime`.
+
+    Retorna o tempo total e os três pacotes de nível superior mais caros.
+    """
+    codigo = '; '.join(f'import {m}' for m in modulos_importados_app())
+    ambiente = dict(os.environ, PYTHONPATH=DIRETORIO_SRC)
+    inicio = time.perf_counter()
+    saida = subprocess.run([sys.executable, '-X', 'importtime', '-c', codigo], capture_output=True,
+                           text=True, env=ambiente, check=True).stderr
+    total = time.perf_counter() - inicio
+
+    # Linhas "import time: self [us] | cumulative | pacote"; sem recuo = importação de nível superior
+    pacotes = {}
+    for linha in saida.splitlines():
+        partes = linha.split('|')
+        if len(partes) == 3 and partes[1].strip().isdigit() and not partes[2].startswith('  '):
+            pacotes[partes[2].strip()] = int(partes[1]) / 1e6
+    mais_caros = sorted(pacotes.items(), key=lambda item: -item[1])[:3]
+    return {'importacao_s': total, 'importacao_mais_caros': dict(mais_caros)}
+
+
+# Cada etapa recebe (caminho do CSV, DataFrame carregado). As funções
+# memoizadas são chamadas por __wrapped__ para medir o cálculo, não o cache.
+ETAPAS = {
+    'carregar_dados_csv': lambda caminho, df: carregar_tabela(caminho, usar_sidecar=False),
+    'carregar_dados_parquet': lambda caminho, df: carregar_tabela(caminho),
+    'indice_fatores': lambda caminho, df: IndiceDados(df, VAR_TARGET, FATORES),
+    'qq_plot_medias': lambda caminho, df: _qq_plot(df),
+    'boxplot_altair': lambda caminho, df: _boxplot_altair(df),
+    'qq_residuos': lambda caminho, df: _qq_residuos(df),
+    'boxplot_resumo': lambda caminho, df: _boxplot_resumo(df),
+    'anova_multifatorial': lambda caminho, df: calcular_anova_multifatorial.__wrapped__(_indice(df), FATORES),
+    'anova_interacao': lambda caminho, df: calcular_anova_multifatorial.__wrapped__(
+        _indice(df), FATORES, (('Neighborhood', 'House_Style'),)),
+    'avaliar_variavel': lambda caminho, df: calcular_avaliacao.__wrapped__(_indice(df), 'Neighborhood'),
+    'amostra_previa': lambda caminho, df: _indice(df).amostra(),
+    'avaliar_variavel_previa': lambda caminho, df: calcular_avaliacao.__wrapped__(_amostra(df), 'Neighborhood'),
+    'gameshowell': lambda caminho, df: calcular_gameshowell.__wrapped__(_indice(df), 'Neighborhood'),
+    'permutacao_f': lambda caminho, df: calcular_permutacao.__wrapped__(_indice(df), 'Neighborhood'),
+    'importacao_app': lambda caminho, df: _importacao_app(),
+}
+
+
+def medir(funcao, repeticoes):
+    """Executa `funcao` `repeticoes` vezes; retorna tempos (s), pico de memória (MB) e o último retorno."""
+    # A primeira execução mede o pico de memória (tracemalloc distorce o tempo)
+    # e serve de aquecimento para as execuções cronometradas
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    tempos = []
+    retorno = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        retorno = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos, pico / 1e6, retorno
+
+
+def executar(linhas, niveis, estagios, repeticoes, semente):
+    resultados = []
+    with tempfile.TemporaryDirectory() as diretorio:
+        for n_linhas in linhas:
+            for n_niveis in niveis:
+                caminho = os.path.join(diretorio, f'sintetico_{n_linhas}_{n_niveis}.csv')
+                gerar_dados(n_linhas, n_niveis, semente).to_csv(caminho, index=False)
+                df = carregar_tabela(caminho)  # também gera o Parquet usado por carregar_dados_parquet
+                for estagio in estagios:
+                    registro = {'estagio': estagio, 'linhas': n_linhas, 'niveis': n_niveis}
+                    if n_linhas > LIMITES_LINHAS.get(estagio, np.inf) or n_niveis > LIMITES_NIVEIS.get(estagio, np.inf):
+                        registro['status'] = 'pulado'
+                        resultados.append(registro)
+                        continue
+                    try:
+                        with warnings.catch_warnings():
+                            warnings.simplefilter('ignore')
+                            tempos, pico, retorno = medir(lambda: ETAPAS[estagio](caminho, df), repeticoes)
+                    except Exception as e:
+                        registro.update(status='erro', erro=str(e))
+                    else:
+                        registro.update(
+                            status='ok',
+                            tempo_min_s=min(tempos),
+                            tempo_mediana_s=statistics.median(tempos),
+                            memoria_pico_mb=pico,
+                        )
+                        if isinstance(retorno, dict):
+                            # Medidas próprias da etapa (tamanho do payload, tempos de importação)
+                            registro.update(retorno)
+                    resultados.append(registro)
+                    print(json.dumps(registro), flush=True)
+    return resultados
+
+
+# ================================
+# RELATÓRIO
+# ================================
+
+def versao_codigo():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def gravar_relatorio(resultados, prefixo):
+    relatorio = {
+        'versao': versao_codigo(),
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'resultados': resultados,
+    }
+    with open(f'{prefixo}.json', 'w') as f:
+        json.dump(relatorio, f, indent=2)
+    tabela = pd.DataFrame(resultados)
+    tabela.insert(0, 'versao', relatorio['versao'])
+    tabela.to_csv(f'{prefixo}.csv', index=False)
+    return relatorio
+
+
+def comparar(resultados, caminho_base, tolerancia):
+    """Imprime a razão tempo_atual / tempo_base por etapa; retorna True se houve regressão."""
+    with open(caminho_base) as f:
+        base = json.load(f)
+    chave = lambda r: (r['estagio'], r['linhas'], r['niveis'])
+    tempos_base = {chave(r): r['tempo_min_s'] for r in base['resultados'] if r.get('status') == 'ok'}
+
+    regressao = False
+    print(f"\nComparação com {caminho_base} (versão {base.get('versao') or '?'})")
+    for r in resultados:
+        if r.get('status') != 'ok' or chave(r) not in tempos_base:
+            continue
+        razao = r['tempo_min_s'] / tempos_base[chave(r)]
+        marca = ''
+        if razao > 1 + tolerancia:
+            marca = '  <-- mais lento'
+            regressao = True
+        print(f"{r['estagio']:<24} linhas={r['linhas']:<10} niveis={r['niveis']:<6} {razao:6.2f}x{marca}")
+    return regressao
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do pipeline ANOVA.")
+    parser.add_argument('--linhas', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000],
+                        help="números de linhas (até 10^7)")
+    parser.add_argument('--niveis', type=int, nargs='+', default=[3, 30, 300],
+                        help="números de níveis do fator principal (até 1000)")
+    parser.add_argument('--estagios', nargs='+', choices=list(ETAPAS), default=list(ETAPAS))
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', default='benchmark_anova', help="prefixo dos arquivos .json e .csv")
+    parser.add_argument('--comparar', help="relatório JSON anterior para comparação")
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help="aumento relativo de tempo aceito antes de indicar regressão")
+    args = parser.parse_args(argv)
+
+    resultados = executar(args.linhas, args.niveis, args.estagios, args.repeticoes, args.semente)
+    gravar_relatorio(resultados, args.saida)
+    if args.comparar and comparar(resultados, args.comparar, args.tolerancia):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# anova - Núcleo de cálculo estatístico do aplicativo ANOVA (sem dependência do Streamlit)
+
+from anova.amostragem import amostra_estratificada, projetar_pvalor
+from anova.api import RelatorioAnalise, analisar, analisar_alvos_arquivo, analisar_arquivo
+from anova.dados import carregar_tabela, colunas_disponiveis
+from anova.efeito import (
+    efeito_minimo_detectavel,
+    efeitos_multifatorial,
+    f_cohen,
+    hedges_g,
+    n_necessario,
+    poder_anova,
+)
+from anova.estatisticas import (
+    EstatisticasGrupos,
+    IndiceFator,
+    ResultadoUmFator,
+    anova_um_fator,
+    codificar_fator,
+    combinar_codigos,
+    dividir_por_grupo,
+    momentos_grupos,
+)
+from anova.incremental import EstadoIncremental
+from anova.indice import IndiceDados
+from anova.multialvo import anova_multialvo
+from anova.multifatorial import anova_multifatorial_esparsa
+from anova.normalidade import Momentos, ResultadoNormalidade, testar_normalidade
+from anova.perfil import Perfilador, perfil_ativo
+from anova.posthoc import ajustar_pvalores, games_howell, sf_amplitude_studentizada, tukey_hsd
+from anova.postos import PostosResposta, ResultadoKruskal, dunn, kruskal_postos, kruskal_wallis, ranquear
+from anova.reamostragem import ResultadoPermutacao, bootstrap_medias, teste_permutacao_f
+from anova.relatorio import relatorio_final, tabela_descricoes
+from anova.streaming import AcumuladorAnova, anova_multifatorial_streaming, anova_um_fator_streaming
+from anova.triagem import colunas_categoricas, triagem_pressupostos
+
+__version__ = '0.2.0'
+
+__all__ = [
+    'AcumuladorAnova',
+    'EstadoIncremental',
+    'EstatisticasGrupos',
+    'IndiceDados',
+    'IndiceFator',
+    'Momentos',
+    'Perfilador',
+    'PostosResposta',
+    'RelatorioAnalise',
+    'ResultadoKruskal',
+    'ResultadoNormalidade',
+    'ResultadoPermutacao',
+    'ResultadoUmFator',
+    'ajustar_pvalores',
+    'amostra_estratificada',
+    'analisar',
+    'analisar_alvos_arquivo',
+    'analisar_arquivo',
+    'anova_multialvo',
+    'anova_multifatorial_esparsa',
+    'anova_multifatorial_streaming',
+    'anova_um_fator',
+    'anova_um_fator_streaming',
+    'bootstrap_medias',
+    'carregar_tabela',
+    'codificar_fator',
+    'colunas_categoricas',
+    'colunas_disponiveis',
+    'combinar_codigos',
+    'dividir_por_grupo',
+    'dunn',
+    'efeito_minimo_detectavel',
+    'efeitos_multifatorial',
+    'f_cohen',
+    'games_howell',
+    'hedges_g',
+    'kruskal_postos',
+    'kruskal_wallis',
+    'momentos_grupos',
+    'n_necessario',
+    'perfil_ativo',
+    'poder_anova',
+    'projetar_pvalor',
+    'ranquear',
+    'relatorio_final',
+    'sf_amplitude_studentizada',
+    'tabela_descricoes',
+    'testar_normalidade',
+    'teste_permutacao_f',
+    'triagem_pressupostos',
+    'tukey_hsd',
+]
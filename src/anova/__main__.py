@@ -0,0 +1,7 @@
+# __main__.py - Permite executar `python -m anova` (ver cli.py)
+
+import sys
+
+from anova.cli import main
+
+sys.exit(main())
@@ -0,0 +1,226 @@
+# amostragem.py - Prévia rápida: amostra estratificada e limites para o resultado completo
+#
+# Em bases grandes, a exploração interativa pode rodar os testes sobre uma
+# amostra estratificada pelas células dos fatores (todo nível de todo fator
+# com um mínimo de linhas). A partir da estatística F da amostra, o intervalo
+# de confiança do parâmetro de não centralidade λ (inversão da F não central)
+# dá a faixa do tamanho de efeito e do p-valor esperado com todas as linhas.
+# Quando essa faixa cruza o nível de significância, a conclusão da amostra é
+# limítrofe e a análise deve ser refeita com os dados completos.
+#
+# A amostra não é proporcional: os níveis pequenos são completados até o
+# mínimo e ficam super-representados. Por isso a projeção não usa a razão
+# global n_total / n_amostra, e sim a razão de cada grupo (N_g / n_g): a
+# faixa de λ é alargada pela menor e pela maior razão entre os grupos, e cada
+# par do Games-Howell é escalado pelos seus dois grupos.
+
+import numpy as np
+
+from anova.estatisticas import combinar_codigos
+from anova.posthoc import sf_amplitude_studentizada
+from anova.tardio import ModuloTardio
+
+optimize = ModuloTardio('scipy.optimize')
+stats = ModuloTardio('scipy.stats')
+
+# Tamanho padrão da amostra da prévia e mínimo de linhas por nível de cada fator
+N_AMOSTRA_PREVIA = 20000
+MIN_POR_GRUPO_PREVIA = 30
+
+
+# ================================
+# AMOSTRA ESTRATIFICADA
+# ================================
+
+def _primeiros_por_grupo(grupos, chave, cotas):
+    """Marca, em cada grupo, as `cotas[grupo]` linhas de menor `chave` (sorteio sem reposição)."""
+    # chave em [0, 1): somada ao grupo, uma só ordenação agrupa e sorteia
+    ordem = np.argsort(grupos + chave)
+    grupos_ordenados = grupos[ordem]
+    inicios = np.concatenate([[0], np.cumsum(np.bincount(grupos_ordenados))[:-1]])
+    posicao = np.arange(len(ordem)) - inicios[grupos_ordenados]
+    marcadas = np.zeros(len(grupos), dtype=bool)
+    marcadas[ordem] = posicao < cotas[grupos_ordenados]
+    return marcadas
+
+
+def amostra_estratificada(indices, n_alvo, min_por_grupo=MIN_POR_GRUPO_PREVIA, semente=0):
+    """
+    Linhas de uma amostra estratificada pelas células (combinações de níveis) dos fatores.
+
+    Parâmetros:
+    - indices: lista de IndiceFator do mesmo conjunto de dados
+    - n_alvo: tamanho aproximado da amostra
+    - min_por_grupo: mínimo de linhas de cada nível de cada fator (o nível inteiro, se menor)
+    - semente: semente do sorteio
+
+    Cada célula contribui na proporção do seu tamanho; os níveis que ficarem
+    abaixo do mínimo são completados com linhas sorteadas do próprio nível.
+    Retorna os números das linhas em ordem crescente.
+    """
+    n = len(indices[0])
+    chave = np.random.default_rng(semente).random(n)
+    celulas, _ = combinar_codigos([indice.codigos for indice in indices], [indice.k for indice in indices])
+    validas = celulas >= 0
+    celulas = celulas[validas]
+
+    fracao = min(1.0, n_alvo / max(int(validas.sum()), 1))
+    cotas = np.ceil(np.bincount(celulas) * fracao)
+    selecionadas = np.zeros(n, dtype=bool)
+    selecionadas[validas] = _primeiros_por_grupo(celulas, chave[validas], cotas)
+
+    # Completa os níveis pequenos de cada fator
+    for indice in indices:
+        presentes = indice.codigos >= 0
+        contagem = np.bincount(indice.codigos[presentes & selecionadas], minlength=indice.k)
+        faltam = np.maximum(np.minimum(min_por_grupo, indice.tamanhos) - contagem, 0)
+        if not faltam.any():
+            continue
+        livres = np.flatnonzero(presentes & ~selecionadas)
+        extras = _primeiros_por_grupo(indice.codigos[livres], chave[livres], faltam)
+        selecionadas[livres[extras]] = True
+    return np.flatnonzero(selecionadas)
+
+
+# ================================
+# LIMITES PARA O RESULTADO COMPLETO
+# ================================
+
+def _inverter_nao_centralidade(acumulada, estatistica, escala_inicial, confianca):
+    """
+    Limites do intervalo de λ em que `acumulada(λ)` (cdf da estatística observada) vai de (1 + c)/2 a (1 - c)/2.
+
+    O limite inferior é 0 quando nem λ = 0 chega ao quantil.
+    """
+    if not np.isfinite(estatistica):
+        return np.inf, np.inf
+    cauda = (1.0 - confianca) / 2.0
+
+    def limite(prob):
+        if acumulada(0.0) <= prob:
+            return 0.0
+        alto = max(10.0, 2.0 * escala_inicial)
+        while acumulada(alto) > prob:
+            alto *= 2.0
+        return float(optimize.brentq(lambda lam: acumulada(lam) - prob, 0.0, alto))
+
+    return limite(1.0 - cauda), limite(cauda)
+
+
+def intervalo_nao_centralidade(f, gl_entre, gl_dentro, confianca=0.95):
+    """
+    Intervalo de confiança do parâmetro de não centralidade λ de uma estatística F observada.
+
+    Cada limite é o λ cuja F não central deixa a F observada no quantil
+    (1 ± confianca) / 2; o limite inferior é 0 quando nem λ = 0 chega lá.
+    """
+    def acumulada(lam):
+        return stats.f.cdf(f, gl_entre, gl_dentro) if lam <= 0 else stats.ncf.cdf(f, gl_entre, gl_dentro, lam)
+
+    return _inverter_nao_centralidade(acumulada, f, f * gl_entre, confianca)
+
+
+def intervalo_nao_centralidade_qui2(h, gl, confianca=0.95):
+    """Intervalo de confiança de λ de uma estatística qui-quadrado observada (H do Kruskal-Wallis)."""
+    def acumulada(lam):
+        return stats.chi2.cdf(h, gl) if lam <= 0 else stats.ncx2.cdf(h, gl, lam)
+
+    return _inverter_nao_centralidade(acumulada, h, h, confianca)
+
+
+def inflacao_grupos(n_amostra, n_total):
+    """
+    Menor e maior razão N_g / n_g entre os grupos presentes na amostra.
+
+    Com λ = Σ n_g (μ_g - μ̄)² / σ², o λ dos dados completos fica entre essas
+    duas razões vezes o λ da amostra, qualquer que seja a alocação da amostra.
+    """
+    n_amostra = np.asarray(n_amostra, dtype=np.float64)
+    presentes = n_amostra > 0
+    razao = np.asarray(n_total, dtype=np.float64)[presentes] / n_amostra[presentes]
+    return float(razao.min()), float(razao.max())
+
+
+def _faixa_projetada(lam_baixo, lam_alto, inflacao, pvalor):
+    """(mínimo, máximo) do p-valor com o λ alto inflado pela maior razão e o baixo pela menor."""
+    razao_min, razao_max = inflacao
+
+    def projetar(lam, razao):
+        return 0.0 if not np.isfinite(lam) else pvalor(lam * razao)
+
+    return projetar(lam_alto, razao_max), projetar(lam_baixo, razao_min)
+
+
+def projetar_pvalor(f, gl_entre, gl_dentro, n_amostra, n_total, confianca=0.95, inflacao=None):
+    """
+    Faixa (mínimo, máximo) do p-valor esperado com `n_total` linhas, a partir da F de uma amostra.
+
+    Parâmetros:
+    - f, gl_entre, gl_dentro: estatística F e graus de liberdade na amostra
+    - n_amostra: número de linhas da amostra
+    - n_total: número de linhas dos dados completos
+    - confianca: nível de confiança do intervalo de λ
+    - inflacao: (menor, maior) razão N_g / n_g entre os grupos (ver `inflacao_grupos`);
+      None = n_total / n_amostra, válido só para amostra proporcional
+
+    Com todas as linhas, λ passa a λ · razão e a F esperada é 1 + λ · razão / gl_entre.
+    """
+    if inflacao is None:
+        inflacao = (n_total / n_amostra,) * 2
+    baixo, alto = intervalo_nao_centralidade(f, gl_entre, gl_dentro, confianca)
+    gl_total = gl_dentro + (n_total - n_amostra)
+    return _faixa_projetada(baixo, alto, inflacao,
+                            lambda lam: float(stats.f.sf(1.0 + lam / gl_entre, gl_entre, gl_total)))
+
+
+def projetar_pvalor_kruskal(h, gl, inflacao, confianca=0.95):
+    """
+    Faixa (mínimo, máximo) do p-valor do Kruskal-Wallis com todas as linhas, a partir do H de uma amostra.
+
+    H segue, aproximadamente, uma qui-quadrado não central com `gl` graus de
+    liberdade; com todas as linhas, λ passa a λ · razão e o H esperado é gl + λ · razão.
+    """
+    baixo, alto = intervalo_nao_centralidade_qui2(h, gl, confianca)
+    return _faixa_projetada(baixo, alto, inflacao, lambda lam: float(stats.chi2.sf(gl + lam, gl)))
+
+
+def intervalo_eta(f, gl_entre, gl_dentro, n_amostra, confianca=0.95):
+    """Intervalo de confiança de η² (λ / (λ + n)) a partir da F de uma amostra."""
+    baixo, alto = intervalo_nao_centralidade(f, gl_entre, gl_dentro, confianca)
+    return tuple(1.0 if not np.isfinite(lam) else lam / (lam + n_amostra) for lam in (baixo, alto))
+
+
+def projetar_pvalores_pares(t, k, gl_completo, inflacao, confianca=0.95):
+    """
+    Faixas do p-valor de Games-Howell de cada par com todas as linhas, a partir das T de uma amostra.
+
+    Parâmetros:
+    - t: estatística T de cada par na amostra
+    - k: número de grupos
+    - gl_completo: graus de liberdade de Welch de cada par com as contagens completas
+    - inflacao: razão, por par, entre a variância da diferença de médias na
+      amostra e com todas as linhas (s_a²/n_a + s_b²/n_b) / (s_a²/N_a + s_b²/N_b)
+    - confianca: nível de confiança do intervalo de T
+
+    O intervalo |T| ± z é escalado por sqrt(inflacao) do próprio par: um par
+    de níveis pequenos, completados até o mínimo na amostra, cresce menos
+    que um par de níveis grandes.
+    """
+    z = float(stats.norm.isf((1.0 - confianca) / 2.0))
+    t = np.abs(np.asarray(t, dtype=np.float64))
+    escala = np.sqrt(np.asarray(inflacao, dtype=np.float64))
+    alto = (t + z) * escala
+    baixo = np.maximum(t - z, 0.0) * escala
+    return (sf_amplitude_studentizada(np.sqrt(2.0) * alto, k, gl_completo),
+            sf_amplitude_studentizada(np.sqrt(2.0) * baixo, k, gl_completo))
+
+
+def cruza_alpha(faixa, alpha=0.05):
+    """Verdadeiro quando a faixa (mínimo, máximo) de p-valores contém `alpha`: conclusão limítrofe."""
+    minimo, maximo = faixa
+    return bool(np.any((np.asarray(minimo) < alpha) & (np.asarray(maximo) >= alpha)))
+
+
+def proximo_de_alpha(pvalor, alpha=0.05, margem=4.0):
+    """Verdadeiro quando `pvalor` está entre alpha / margem e alpha · margem (pressupostos limítrofes)."""
+    return pvalor is not None and alpha / margem <= pvalor <= alpha * margem
@@ -0,0 +1,319 @@
+# analises.py - Parte computacional das análises exibidas no aplicativo
+#
+# Cada função recebe apenas os dados de que precisa, não chama st.* e tem o
+# resultado memoizado pelo conteúdo dos dados e parâmetros (ver cache.py).
+# As análises por fator recebem o IndiceDados do conjunto limpo (indice.py),
+# com os fatores já codificados e agrupados. As funções `calcular_previa_*`
+# recebem o índice de uma amostra (IndiceDados.amostra) e indicam quando o
+# resultado da amostra é limítrofe e precisa ser refeito com todos os dados.
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from anova.amostragem import (
+    cruza_alpha, inflacao_grupos, intervalo_eta, projetar_pvalor, projetar_pvalor_kruskal, projetar_pvalores_pares,
+    proximo_de_alpha,
+)
+from anova.cache import memoizar
+from anova.efeito import (
+    efeito_minimo_detectavel, efeitos_multifatorial, eta_de_f, f_cohen, n_necessario, poder_anova,
+)
+from anova.estatisticas import anova_um_fator
+from anova.graficos import MAX_OUTLIERS_POR_GRUPO, MAX_PONTOS_QQ, quantis_qq, resumo_boxplot
+from anova.multialvo import anova_multialvo
+from anova.multifatorial import anova_multifatorial_esparsa
+from anova.normalidade import testar_normalidade
+from anova.posthoc import games_howell_estatisticas, tukey_hsd_estatisticas
+from anova.postos import dunn, kruskal_postos
+from anova.reamostragem import bootstrap_medias, teste_permutacao_f
+from anova.triagem import triagem_pressupostos
+
+
+@dataclass
+class ResultadoAvaliacao:
+    """p-valores e tamanhos de efeito da ANOVA de um fator, dos pressupostos e do Kruskal-Wallis (quando aplicado)."""
+    pvalor_anova: float
+    teste_normalidade: str
+    p_normalidade: float
+    p_bp: float
+    eta_quadrado: float
+    omega_quadrado: float
+    p_kruskal: Optional[float] = None
+    epsilon_quadrado: Optional[float] = None
+
+    @property
+    def atende_pressupostos(self):
+        return self.p_normalidade >= 0.05 and self.p_bp >= 0.05
+
+
+@memoizar
+def calcular_qq_medias(indice, var_categ):
+    """Quantis teóricos e amostrais das médias por grupo, e a reta de referência do Q-Q plot."""
+    mom = indice.momentos(var_categ)
+    return quantis_qq(mom.medias[mom.n > 0])
+
+
+@memoizar
+def calcular_qq_residuos(indice, var, max_pontos=MAX_PONTOS_QQ):
+    """Q-Q plot dos resíduos da ANOVA de um fator, com no máximo `max_pontos` pontos."""
+    anova = anova_um_fator(indice[var], indice.y)
+    return quantis_qq(anova.residuos, max_pontos=max_pontos)
+
+
+@memoizar
+def calcular_avaliacao(indice, var, metodo_normalidade='auto'):
+    """ANOVA de um fator, normalidade e Breusch-Pagan dos resíduos e, se necessário, Kruskal-Wallis."""
+    anova = anova_um_fator(indice[var], indice.y)
+    normalidade = testar_normalidade(anova.residuos, metodo_normalidade)
+    resultado = ResultadoAvaliacao(
+        pvalor_anova=anova.pvalor,
+        teste_normalidade=normalidade.nome,
+        p_normalidade=normalidade.pvalor,
+        p_bp=anova.bp_pvalor,
+        eta_quadrado=anova.eta_quadrado,
+        omega_quadrado=anova.omega_quadrado,
+    )
+    if not resultado.atende_pressupostos:
+        kruskal = kruskal_postos(indice[var], indice.postos)
+        resultado.p_kruskal = kruskal.pvalor
+        resultado.epsilon_quadrado = kruskal.epsilon_quadrado
+    return resultado
+
+
+@memoizar
+def calcular_resumo_boxplot(indice, var_cat, extensao='min-max', max_outliers=MAX_OUTLIERS_POR_GRUPO):
+    """Quartis, bigodes e amostra de outliers por categoria de `var_cat` (poucas linhas por grupo)."""
+    return resumo_boxplot(indice[var_cat], indice.y, extensao=extensao, max_outliers=max_outliers)
+
+
+@memoizar
+def calcular_permutacao(indice, var, n_permutacoes=9999, semente=0):
+    """Teste F de um fator por permutação dos rótulos de `var`."""
+    return teste_permutacao_f(indice[var], indice.y, n_permutacoes=n_permutacoes, semente=semente)
+
+
+@memoizar
+def calcular_bootstrap_medias(indice, var, n_reamostras=2000, confianca=0.95, semente=0):
+    """Intervalos de confiança bootstrap da média da resposta em cada categoria de `var`."""
+    return bootstrap_medias(indice[var], indice.y, n_reamostras=n_reamostras, confianca=confianca, semente=semente)
+
+
+@memoizar
+def calcular_anova_multifatorial(indice, fatores, interacoes=(), tipo=2):
+    """Tabela ANOVA Tipo II ou III de `y ~ C(f1) + C(f2) + ...` (formato `anova_lm`) com η², η² parcial e ω²."""
+    tabela = anova_multifatorial_esparsa(indice.tabela(fatores), indice.var_target, list(fatores), interacoes,
+                                         tipo=tipo)
+    return efeitos_multifatorial(tabela)
+
+
+def _niveis_presentes(indice, var_cat):
+    mom = indice.momentos(var_cat)
+    presentes = mom.n > 0
+    return indice[var_cat].niveis[presentes], mom, presentes
+
+
+@memoizar
+def calcular_tukey(indice, var_cat, alpha=0.05, top_k=None):
+    """Comparações de Tukey HSD entre os pares de categorias de `var_cat` (ou só as `top_k` significativas)."""
+    niveis, mom, presentes = _niveis_presentes(indice, var_cat)
+    return tukey_hsd_estatisticas(niveis, mom.n[presentes], mom.medias[presentes],
+                                  float(mom.ss_dentro_grupos.sum()), alpha=alpha, top_k=top_k,
+                                  variancias=mom.variancias[presentes])
+
+
+@memoizar
+def calcular_gameshowell(indice, var_cat):
+    """Comparações de Games-Howell entre todos os pares de categorias de `var_cat`."""
+    niveis, mom, presentes = _niveis_presentes(indice, var_cat)
+    resultado = games_howell_estatisticas(niveis, mom.n[presentes], mom.medias[presentes],
+                                          mom.variancias[presentes])
+    resultado['A'] = resultado['A'].astype(str)
+    resultado['B'] = resultado['B'].astype(str)
+    resultado['significant'] = resultado['pval'] < 0.05
+    return resultado
+
+
+@memoizar
+def calcular_dunn(indice, var_cat, correcao='holm', alpha=0.05):
+    """Pós-teste de Dunn entre os pares de categorias de `var_cat`, com p-valores ajustados por `correcao`."""
+    resultado = dunn(indice[var_cat], indice.postos, correcao=correcao, alpha=alpha)
+    resultado['A'] = resultado['A'].astype(str)
+    resultado['B'] = resultado['B'].astype(str)
+    return resultado
+
+
+def _somas_quadrados(indice, var):
+    """Número de grupos, de observações e as SS entre e dentro dos grupos de `var`, a partir dos momentos."""
+    mom = indice.momentos(var)
+    n = mom.n[mom.n > 0]
+    medias = mom.medias[mom.n > 0]
+    ss_entre = float((n * (medias - mom.media_geral) ** 2).sum())
+    return len(n), int(n.sum()), ss_entre, float(mom.ss_dentro_grupos.sum())
+
+
+@memoizar
+def calcular_planejamento(indice, var, poder=0.8, alpha=0.05, n_total=None):
+    """
+    Poder e efeito mínimo detectável da ANOVA de `var`, a partir das estatísticas por grupo.
+
+    Parâmetros:
+    - indice: IndiceDados do conjunto analisado
+    - var: fator
+    - poder: poder desejado
+    - alpha: nível de significância
+    - n_total: tamanho de amostra planejado (None = todas as linhas)
+
+    Retorna um dict com k, n_total, o η² e o f observados, o poder para o efeito
+    observado com n_total, o efeito mínimo detectável (f e η²) com n_total e o
+    n necessário para detectar o efeito observado.
+    """
+    k, n_observado, ss_entre, ss_dentro = _somas_quadrados(indice, var)
+    eta2 = ss_entre / (ss_entre + ss_dentro)
+    f = f_cohen(eta2)
+    n_total = n_observado if n_total is None else int(n_total)
+    f_minimo = efeito_minimo_detectavel(k, n_total, poder=poder, alpha=alpha)
+    return {
+        'k': k,
+        'n_total': n_total,
+        'eta_quadrado': eta2,
+        'f': f,
+        'poder_observado': poder_anova(f, k, n_total, alpha),
+        'f_minimo': f_minimo,
+        'eta_minimo': eta_de_f(f_minimo),
+        'n_necessario': n_necessario(f, k, poder=poder, alpha=alpha),
+    }
+
+
+@dataclass
+class ResultadoPrevia:
+    """Avaliação de um fator sobre a amostra da prévia e os limites esperados com todas as linhas."""
+    avaliacao: ResultadoAvaliacao
+    n_amostra: int
+    n_total: int
+    eta_intervalo: tuple
+    pvalor_projetado: tuple
+    motivos: list = field(default_factory=list)
+
+    @property
+    def limitrofe(self):
+        return bool(self.motivos)
+
+
+def _contagens_completas(indice, var):
+    """Contagens por nível de `var` na amostra e nos dados completos (`indice.origem`), nos níveis da amostra."""
+    niveis, mom, presentes = _niveis_presentes(indice, var)
+    origem = indice.origem
+    posicoes = {nivel: i for i, nivel in enumerate(origem[var].niveis)}
+    return niveis, mom.n[presentes], origem.momentos(var).n[[posicoes[nivel] for nivel in niveis]]
+
+
+@memoizar
+def calcular_previa_avaliacao(indice, var, metodo_normalidade='auto', alpha=0.05):
+    """
+    `calcular_avaliacao` sobre a amostra da prévia, com o IC de η² e a faixa do p-valor com todas as linhas.
+
+    Parâmetros:
+    - indice: IndiceDados de uma amostra (`IndiceDados.amostra`; `indice.origem` é o índice completo)
+    - var: fator
+    - metodo_normalidade: teste de normalidade dos resíduos
+    - alpha: nível de significância
+
+    A prévia é limítrofe (`motivos` não vazio) quando a faixa do p-valor da
+    ANOVA ou do Kruskal-Wallis contém `alpha`, ou quando um teste de
+    pressuposto tem p-valor próximo de `alpha`. As faixas usam a razão
+    N_g / n_g de cada nível (ver `inflacao_grupos`), já que a amostra
+    super-representa os níveis pequenos.
+    """
+    avaliacao = calcular_avaliacao(indice, var, metodo_normalidade)
+    k, n, ss_entre, ss_dentro = _somas_quadrados(indice, var)
+    gl_entre, gl_dentro = k - 1, n - k
+    f = (ss_entre / gl_entre) / (ss_dentro / gl_dentro) if ss_dentro > 0 else np.inf
+    _, n_amostra, n_completo = _contagens_completas(indice, var)
+    n_total = int(n_completo.sum())
+    inflacao = inflacao_grupos(n_amostra, n_completo)
+
+    resultado = ResultadoPrevia(
+        avaliacao=avaliacao,
+        n_amostra=n,
+        n_total=n_total,
+        eta_intervalo=intervalo_eta(f, gl_entre, gl_dentro, n),
+        pvalor_projetado=projetar_pvalor(f, gl_entre, gl_dentro, n, n_total, inflacao=inflacao),
+    )
+    if cruza_alpha(resultado.pvalor_projetado, alpha):
+        resultado.motivos.append('ANOVA')
+    if proximo_de_alpha(avaliacao.p_normalidade, alpha):
+        resultado.motivos.append(avaliacao.teste_normalidade)
+    if proximo_de_alpha(avaliacao.p_bp, alpha):
+        resultado.motivos.append('Breusch-Pagan')
+    if avaliacao.p_kruskal is not None:
+        kruskal = kruskal_postos(indice[var], indice.postos)
+        if cruza_alpha(projetar_pvalor_kruskal(kruskal.h, kruskal.gl, inflacao), alpha):
+            resultado.motivos.append('Kruskal-Wallis')
+    return resultado
+
+
+@memoizar
+def calcular_previa_multifatorial(indice, fatores, interacoes=(), alpha=0.05, tipo=2):
+    """
+    Tabela de `calcular_anova_multifatorial` sobre a amostra da prévia, com a faixa do p-valor de cada
+    termo com todas as linhas (`p_completo_min`, `p_completo_max`).
+
+    Retorna (tabela, limitrofe); limítrofe quando a faixa de algum termo contém `alpha`.
+    A faixa de cada termo usa a menor e a maior razão N_g / n_g entre os níveis
+    dos seus fatores; para interações é uma aproximação, pois as caselas podem
+    ter razões fora dessa faixa.
+    """
+    tabela = calcular_anova_multifatorial(indice, fatores, interacoes, tipo).copy()
+    n, n_total = len(indice), len(indice.origem)
+    gl_dentro = float(tabela.loc['Residual', 'df'])
+    termos = ~tabela.index.isin(['Residual', 'Intercept'])
+    razoes = {f'C({fator})': inflacao_grupos(*_contagens_completas(indice, fator)[1:]) for fator in fatores}
+
+    def inflacao(termo):
+        faixas = [razoes[parte] for parte in termo.split(':')]
+        return min(r[0] for r in faixas), max(r[1] for r in faixas)
+
+    faixas = [projetar_pvalor(linha['F'], linha['df'], gl_dentro, n, n_total, inflacao=inflacao(termo))
+              if linha['df'] > 0 else (np.nan, np.nan)
+              for termo, linha in tabela[termos].iterrows()]
+    tabela['p_completo_min'] = np.nan
+    tabela['p_completo_max'] = np.nan
+    tabela.loc[termos, ['p_completo_min', 'p_completo_max']] = np.array(faixas, dtype=np.float64)
+    limitrofe = cruza_alpha((tabela.loc[termos, 'p_completo_min'], tabela.loc[termos, 'p_completo_max']), alpha)
+    return tabela, limitrofe
+
+
+@memoizar
+def calcular_previa_gameshowell(indice, var_cat, alpha=0.05):
+    """
+    Games-Howell sobre a amostra da prévia, com a faixa do p-valor de cada par com todas as linhas.
+
+    Retorna (resultado, limitrofe); limítrofe quando a faixa de algum par contém `alpha`.
+    Cada par é escalado pelas contagens completas dos seus dois níveis, com as
+    variâncias da amostra: os níveis pequenos, super-representados na amostra,
+    crescem menos que os grandes.
+    """
+    resultado = calcular_gameshowell(indice, var_cat).copy()
+    niveis, _, n_completo = _contagens_completas(indice, var_cat)
+    mom = indice.momentos(var_cat)
+    presentes = mom.n > 0
+    completo = games_howell_estatisticas(niveis, n_completo, mom.medias[presentes], mom.variancias[presentes])
+    resultado['p_completo_min'], resultado['p_completo_max'] = projetar_pvalores_pares(
+        resultado['T'], len(niveis), completo['df'], (resultado['se'] / completo['se']) ** 2)
+    limitrofe = cruza_alpha((resultado['p_completo_min'], resultado['p_completo_max']), alpha)
+    return resultado, limitrofe
+
+
+@memoizar
+def calcular_multialvo(df, alvos, fatores, min_grupo=3, metodo_normalidade='auto'):
+    """ANOVA, pressupostos e Kruskal-Wallis de cada par (alvo, fator), com p-valores corrigidos por FDR."""
+    return anova_multialvo(df, alvos, fatores, min_grupo=min_grupo, metodo_normalidade=metodo_normalidade)
+
+
+@memoizar
+def calcular_triagem(df, var_target, min_grupo=3, metodo_normalidade='auto'):
+    """Triagem dos pressupostos da ANOVA para todas as colunas categóricas de `df`."""
+    return triagem_pressupostos(df, var_target=var_target, min_grupo=min_grupo,
+                                metodo_normalidade=metodo_normalidade)
@@ -0,0 +1,198 @@
+# api.py - Análises completas sem interface: resultados tipados e exportáveis
+#
+# `analisar` executa, para uma variável resposta e uma lista de fatores, as
+# mesmas análises do aplicativo (ANOVA de um fator com pressupostos,
+# Kruskal-Wallis com pós-teste de Dunn, ANOVA multifatorial, Tukey HSD e
+# Games-Howell) e devolve um
+# RelatorioAnalise, que pode ser convertido em tabelas (DataFrames) ou em um
+# dict serializável em JSON. Nada aqui depende do Streamlit.
+
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from anova.dados import carregar_tabela, normalizar_nome
+from anova.efeito import efeitos_multifatorial
+from anova.estatisticas import IndiceFator, ResultadoUmFator, anova_um_fator
+from anova.multialvo import anova_multialvo
+from anova.multifatorial import anova_multifatorial_esparsa
+from anova.normalidade import ResultadoNormalidade, testar_normalidade
+from anova.posthoc import games_howell, tukey_hsd
+from anova.postos import ResultadoKruskal, dunn, kruskal_postos, ranquear
+
+TESTES = ('um_fator', 'kruskal', 'dunn', 'multifatorial', 'tukey', 'games_howell')
+
+
+@dataclass
+class ResultadoMultifatorial:
+    """Tabela ANOVA Tipo II ou III (formato `anova_lm`, com η², η² parcial e ω²) e número de observações usadas."""
+    tabela: pd.DataFrame
+    n: int
+    tipo: int = 2
+
+    @property
+    def caselas(self):
+        """Caselas possíveis, observadas, vazias e unitárias de cada interação."""
+        return self.tabela.attrs.get('caselas', {})
+
+
+@dataclass
+class ResultadoPosHoc:
+    """Comparações entre pares de níveis de `fator` ('tukey', 'games_howell' ou 'dunn')."""
+    metodo: str
+    fator: str
+    comparacoes: pd.DataFrame
+
+
+@dataclass
+class ResultadoFator:
+    """Resultados de uma análise de `var_target` por um único fator."""
+    fator: str
+    um_fator: Optional[ResultadoUmFator] = None
+    normalidade: Optional[ResultadoNormalidade] = None
+    kruskal: Optional[ResultadoKruskal] = None
+    tukey: Optional[ResultadoPosHoc] = None
+    games_howell: Optional[ResultadoPosHoc] = None
+    dunn: Optional[ResultadoPosHoc] = None
+
+
+@dataclass
+class RelatorioAnalise:
+    origem: Optional[str]
+    var_target: str
+    fatores: List[str]
+    n: int
+    por_fator: Dict[str, ResultadoFator] = field(default_factory=dict)
+    multifatorial: Optional[ResultadoMultifatorial] = None
+
+    def tabelas(self):
+        """Resultados como DataFrames: 'resumo', 'multifatorial', 'tukey', 'games_howell' e 'dunn' (os que existirem)."""
+        resumo = []
+        for fator, r in self.por_fator.items():
+            linha = {'fator': fator}
+            if r.um_fator is not None:
+                linha.update(
+                    grupos=len(r.um_fator.niveis), f=r.um_fator.f, pvalor=r.um_fator.pvalor,
+                    gl_entre=r.um_fator.gl_entre, gl_dentro=r.um_fator.gl_dentro,
+                    breusch_pagan_pvalor=r.um_fator.bp_pvalor,
+                    eta_quadrado=r.um_fator.eta_quadrado, omega_quadrado=r.um_fator.omega_quadrado,
+                )
+            if r.normalidade is not None:
+                linha.update(teste_normalidade=r.normalidade.metodo, normalidade_pvalor=r.normalidade.pvalor)
+            if r.kruskal is not None:
+                linha.update(kruskal_h=r.kruskal.h, kruskal_pvalor=r.kruskal.pvalor,
+                             kruskal_epsilon_quadrado=r.kruskal.epsilon_quadrado)
+            resumo.append(linha)
+
+        tabelas = {'resumo': pd.DataFrame(resumo)}
+        if self.multifatorial is not None:
+            tabelas['multifatorial'] = self.multifatorial.tabela.rename_axis('termo').reset_index()
+        for metodo, colunas in (('tukey', ['group1', 'group2']), ('games_howell', ['A', 'B']), ('dunn', ['A', 'B'])):
+            partes = []
+            for fator, r in self.por_fator.items():
+                posthoc = getattr(r, metodo)
+                if posthoc is not None:
+                    # Níveis como texto: fatores diferentes podem ter níveis de tipos diferentes
+                    comparacoes = posthoc.comparacoes.astype({c: str for c in colunas})
+                    comparacoes.insert(0, 'fator', fator)
+                    partes.append(comparacoes)
+            if partes:
+                tabelas[metodo] = pd.concat(partes, ignore_index=True)
+
+        for tabela in tabelas.values():
+            tabela.insert(0, 'var_target', self.var_target)
+            tabela.insert(0, 'origem', self.origem)
+        return tabelas
+
+    def para_dict(self):
+        """Metadados e tabelas em estruturas de Python serializáveis em JSON (NaN vira null)."""
+        return {
+            'origem': self.origem,
+            'var_target': self.var_target,
+            'fatores': list(self.fatores),
+            'n': self.n,
+            'caselas': self.multifatorial.caselas if self.multifatorial is not None else {},
+            'tabelas': {nome: json.loads(tabela.to_json(orient='records'))
+                        for nome, tabela in self.tabelas().items()},
+        }
+
+
+def analisar(df, var_target, fatores, interacoes=(), testes=TESTES, metodo_normalidade='auto',
+             alpha=0.05, correcao_dunn='holm', tipo_ss=2, origem=None):
+    """
+    Executa as análises de `var_target` pelos `fatores` e retorna um RelatorioAnalise.
+
+    Parâmetros:
+    - df: DataFrame com os dados (linhas com ausentes em qualquer coluna usada são descartadas)
+    - var_target: string com o nome da variável resposta
+    - fatores: lista de strings com os nomes das variáveis categóricas
+    - interacoes: lista de tuplas de fatores incluídas na ANOVA multifatorial
+    - testes: subconjunto de TESTES a executar
+    - metodo_normalidade: teste de normalidade dos resíduos (ver `testar_normalidade`)
+    - alpha: nível de significância do Tukey HSD e do teste de Dunn
+    - correcao_dunn: ajuste dos p-valores do teste de Dunn (ver `ajustar_pvalores`)
+    - tipo_ss: soma de quadrados da ANOVA multifatorial (2 ou 3)
+    - origem: identificação dos dados (por exemplo, o caminho do arquivo)
+    """
+    desconhecidos = set(testes) - set(TESTES)
+    if desconhecidos:
+        raise ValueError(f"Testes desconhecidos: {sorted(desconhecidos)}. Disponíveis: {list(TESTES)}.")
+    fatores = list(fatores)
+    dados = df[[var_target] + fatores].dropna()
+    y = pd.to_numeric(dados[var_target], errors='coerce')
+
+    relatorio = RelatorioAnalise(origem=origem, var_target=var_target, fatores=fatores, n=len(dados))
+    # Os postos da resposta são os mesmos para todos os fatores: uma única ordenação
+    postos = ranquear(y) if {'kruskal', 'dunn'} & set(testes) else None
+    for fator in fatores:
+        resultado = ResultadoFator(fator=fator)
+        # Codificado uma vez e reaproveitado por todos os testes do fator
+        codificado = IndiceFator.criar(dados[fator])
+        if 'um_fator' in testes:
+            resultado.um_fator = anova_um_fator(codificado, y)
+            resultado.normalidade = testar_normalidade(resultado.um_fator.residuos, metodo_normalidade)
+        if 'kruskal' in testes:
+            resultado.kruskal = kruskal_postos(codificado, postos)
+        if 'dunn' in testes:
+            resultado.dunn = ResultadoPosHoc(
+                'dunn', fator, dunn(codificado, postos, correcao=correcao_dunn, alpha=alpha))
+        if 'tukey' in testes:
+            resultado.tukey = ResultadoPosHoc('tukey', fator, tukey_hsd(codificado, y, alpha=alpha))
+        if 'games_howell' in testes:
+            resultado.games_howell = ResultadoPosHoc('games_howell', fator, games_howell(codificado, y))
+        relatorio.por_fator[fator] = resultado
+
+    if 'multifatorial' in testes:
+        tabela = efeitos_multifatorial(
+            anova_multifatorial_esparsa(dados, var_target, fatores, interacoes, tipo=tipo_ss))
+        relatorio.multifatorial = ResultadoMultifatorial(tabela=tabela, n=len(dados), tipo=tipo_ss)
+    return relatorio
+
+
+def analisar_arquivo(caminho, var_target, fatores, interacoes=(), **opcoes):
+    """
+    Carrega apenas as colunas necessárias de um CSV e executa `analisar`.
+
+    Os nomes de colunas podem ser dados com espaços ('House Style') ou com '_'.
+    """
+    var_target = normalizar_nome(var_target)
+    fatores = [normalizar_nome(f) for f in fatores]
+    interacoes = [tuple(normalizar_nome(f) for f in interacao) for interacao in interacoes]
+    df = carregar_tabela(caminho, colunas=[var_target] + fatores)
+    return analisar(df, var_target, fatores, interacoes, origem=str(caminho), **opcoes)
+
+
+def analisar_alvos_arquivo(caminho, alvos, fatores, **opcoes):
+    """
+    Carrega apenas as colunas necessárias de um CSV e executa `anova_multialvo` para todos os alvos.
+
+    Retorna o DataFrame de `anova_multialvo` com a coluna `origem` no início.
+    """
+    alvos = [normalizar_nome(a) for a in alvos]
+    fatores = [normalizar_nome(f) for f in fatores]
+    df = carregar_tabela(caminho, colunas=list(dict.fromkeys(alvos + fatores)))
+    tabela = anova_multialvo(df, alvos, fatores, **opcoes)
+    tabela.insert(0, 'origem', str(caminho))
+    return tabela
@@ -0,0 +1,277 @@
+# cache.py - Cache persistente, endereçado por conteúdo, para os resultados dos testes
+#
+# A chave de cada resultado é o SHA-256 dos dados de entrada (valores e tipos
+# das colunas) e dos parâmetros do teste. Os resultados ficam em memória e em
+# disco (um arquivo pickle por chave), com remoção LRU quando o diretório
+# ultrapassa o limite de tamanho. O acesso a um arquivo atualiza seu mtime,
+# que serve como ordem de uso recente.
+#
+# Como o cache em disco sobrevive a atualizações, a chave também inclui a
+# versão do pacote e o hash do código-fonte dos seus módulos (uma função em
+# cache pode chamar outras do pacote) e, em `memoizar`, o hash do bytecode da
+# própria função: qualquer mudança no código invalida os resultados antigos.
+
+import dataclasses
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import types
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Incrementar ao mudar o formato de qualquer resultado em cache sem mudar o código do pacote
+VERSAO_CACHE = 9
+
+DIRETORIO_PADRAO = os.path.join(os.path.expanduser('~'), '.cache', 'anova')
+MAX_BYTES_PADRAO = 512 * 1024 * 1024
+MAX_ITENS_MEMORIA = 256
+
+# Tipos cujo repr identifica o valor exatamente (o repr de arrays e de objetos quaisquer é truncado ou genérico)
+ESCALARES = (str, bytes, bool, int, float, type(None), np.generic)
+
+
+# ================================
+# CHAVES DE CONTEÚDO
+# ================================
+
+def _atualizar_hash(h, obj):
+    if isinstance(obj, pd.DataFrame):
+        h.update(b'DataFrame')
+        h.update(repr([(str(c), str(t)) for c, t in obj.dtypes.items()]).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=False).to_numpy().tobytes())
+    elif isinstance(obj, pd.Series):
+        h.update(b'Series')
+        h.update(repr((str(obj.name), str(obj.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=False).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(b'ndarray')
+        h.update(repr((obj.dtype.str, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(type(obj).__name__.encode())
+        for item in obj:
+            _atualizar_hash(h, item)
+    elif isinstance(obj, dict):
+        h.update(b'dict')
+        for k in sorted(obj, key=repr):
+            _atualizar_hash(h, k)
+            _atualizar_hash(h, obj[k])
+    elif hasattr(type(obj), 'chave_cache'):
+        # Objetos que já conhecem a assinatura do seu conteúdo (ex.: IndiceDados)
+        h.update(type(obj).__name__.encode())
+        h.update(obj.chave_cache.encode())
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        h.update(type(obj).__qualname__.encode())
+        for campo in dataclasses.fields(obj):
+            _atualizar_hash(h, campo.name)
+            _atualizar_hash(h, getattr(obj, campo.name))
+    elif isinstance(obj, ESCALARES):
+        h.update(repr(obj).encode())
+    else:
+        raise TypeError(f"Não é possível calcular a chave de cache de um objeto do tipo {type(obj).__name__}; "
+                        f"use tipos básicos, arrays, DataFrames, dataclasses ou objetos com `chave_cache`.")
+
+
+def _atualizar_hash_constante(h, const):
+    if isinstance(const, types.CodeType):
+        _atualizar_hash_codigo(h, const)
+    elif isinstance(const, (tuple, frozenset)):
+        # A ordem de um frozenset de textos muda com PYTHONHASHSEED
+        itens = const if isinstance(const, tuple) else sorted(const, key=repr)
+        h.update(type(const).__name__.encode())
+        for item in itens:
+            _atualizar_hash_constante(h, item)
+    else:
+        h.update(repr(const).encode())
+
+
+def _atualizar_hash_codigo(h, codigo):
+    h.update(codigo.co_code)
+    h.update(repr(codigo.co_names).encode())
+    for const in codigo.co_consts:
+        _atualizar_hash_constante(h, const)
+
+
+def assinatura_codigo(func):
+    """SHA-256 do bytecode de `func`: instruções, nomes usados e constantes, incluindo funções internas."""
+    h = hashlib.sha256()
+    _atualizar_hash_codigo(h, func.__code__)
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def versao_codigo():
+    """
+    Versão do pacote `anova` e SHA-256 do código-fonte dos seus módulos (calculada uma vez por processo).
+
+    Cobre mudanças nas funções chamadas pelas funções em cache, que o
+    bytecode da própria função não revela.
+    """
+    import anova
+    h = hashlib.sha256(anova.__version__.encode())
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    for nome in sorted(os.listdir(diretorio)):
+        if nome.endswith('.py'):
+            h.update(nome.encode())
+            with open(os.path.join(diretorio, nome), 'rb') as f:
+                h.update(f.read())
+    return f'{anova.__version__}:{h.hexdigest()}'
+
+
+def chave_conteudo(*partes):
+    """
+    Calcula a chave SHA-256 de um conjunto de dados e parâmetros.
+
+    Aceita DataFrames, Series, arrays, listas, tuplas, dicts, dataclasses,
+    objetos com `chave_cache` e escalares (ESCALARES); outros tipos levantam
+    TypeError, pois o repr deles pode ser igual para conteúdos diferentes.
+    A chave muda com VERSAO_CACHE e com `versao_codigo()`.
+    """
+    h = hashlib.sha256()
+    h.update(f'v{VERSAO_CACHE}:{versao_codigo()}'.encode())
+    for parte in partes:
+        _atualizar_hash(h, parte)
+    return h.hexdigest()
+
+
+# ================================
+# ARMAZENAMENTO
+# ================================
+
+class CacheDisco:
+    """
+    Armazena resultados em `diretorio`, um arquivo por chave, limitado a `max_bytes`.
+
+    Os itens mais recentes também ficam em memória para evitar leituras
+    repetidas do disco no mesmo processo. Com `max_bytes=0` apenas a memória é usada.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_PADRAO, max_bytes=MAX_BYTES_PADRAO, max_itens_memoria=MAX_ITENS_MEMORIA):
+        self.diretorio = diretorio
+        self.max_bytes = max_bytes
+        self.max_itens_memoria = max_itens_memoria
+        self._memoria = OrderedDict()
+        self._trava = threading.Lock()
+        if self.max_bytes > 0:
+            os.makedirs(self.diretorio, exist_ok=True)
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f'{chave}.pkl')
+
+    def _guardar_memoria(self, chave, valor):
+        with self._trava:
+            self._memoria[chave] = valor
+            self._memoria.move_to_end(chave)
+            while len(self._memoria) > self.max_itens_memoria:
+                self._memoria.popitem(last=False)
+
+    def obter(self, chave):
+        """Retorna (encontrado, valor)."""
+        with self._trava:
+            if chave in self._memoria:
+                self._memoria.move_to_end(chave)
+                return True, self._memoria[chave]
+        if self.max_bytes <= 0:
+            return False, None
+
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'rb') as f:
+                valor = pickle.load(f)
+            os.utime(caminho)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None
+        self._guardar_memoria(chave, valor)
+        return True, valor
+
+    def guardar(self, chave, valor):
+        self._guardar_memoria(chave, valor)
+        if self.max_bytes <= 0:
+            return
+
+        fd, temporario = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, self._caminho(chave))
+        except OSError:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            return
+        self.remover_excedente()
+
+    def remover_excedente(self):
+        """Remove os arquivos usados há mais tempo até o diretório caber em `max_bytes`."""
+        arquivos = []
+        for entrada in os.scandir(self.diretorio):
+            if entrada.name.endswith('.pkl'):
+                try:
+                    info = entrada.stat()
+                except OSError:
+                    continue
+                arquivos.append((info.st_mtime, info.st_size, entrada.path))
+
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, caminho in sorted(arquivos):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+            total -= tamanho
+
+    def limpar(self):
+        with self._trava:
+            self._memoria.clear()
+        if self.max_bytes > 0:
+            for entrada in os.scandir(self.diretorio):
+                if entrada.name.endswith('.pkl'):
+                    os.remove(entrada.path)
+
+
+_cache_padrao = None
+
+
+def cache_padrao():
+    """
+    Cache compartilhado pelo aplicativo, configurado por variáveis de ambiente:
+    ANOVA_CACHE_DIR (diretório) e ANOVA_CACHE_MAX_BYTES (limite; 0 desativa o disco).
+    """
+    global _cache_padrao
+    if _cache_padrao is None:
+        _cache_padrao = CacheDisco(
+            diretorio=os.environ.get('ANOVA_CACHE_DIR', DIRETORIO_PADRAO),
+            max_bytes=int(os.environ.get('ANOVA_CACHE_MAX_BYTES', MAX_BYTES_PADRAO)),
+        )
+    return _cache_padrao
+
+
+def memoizar(func):
+    """
+    Decorador que guarda o resultado de `func` no cache padrão.
+
+    A chave combina o nome qualificado e o bytecode da função com o conteúdo
+    de todos os argumentos, de modo que DataFrames iguais em reruns distintos
+    reaproveitam o resultado e uma função alterada não recebe resultados antigos.
+    """
+    nome = f'{func.__module__}.{func.__qualname__}'
+    codigo = assinatura_codigo(func)
+
+    @functools.wraps(func)
+    def envoltorio(*args, **kwargs):
+        cache = cache_padrao()
+        chave = chave_conteudo(nome, codigo, args, kwargs)
+        encontrado, valor = cache.obter(chave)
+        if encontrado:
+            return valor
+        valor = func(*args, **kwargs)
+        cache.guardar(chave, valor)
+        return valor
+
+    return envoltorio
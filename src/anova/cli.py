@@ -0,0 +1,144 @@
+# cli.py - Execução em lote das análises, sem o Streamlit
+#
+# Uso (com `src` no PYTHONPATH):
+#   python -m anova dados/*.csv --alvos SalePrice --fatores Neighborhood House_Style Bsmt_Full_Bath \
+#       --interacoes Neighborhood:House_Style --formatos json parquet --saida resultados
+#
+# Para cada par (arquivo, alvo) são gravados <saida>/<arquivo>__<alvo>.json e,
+# com parquet, um arquivo <saida>/<arquivo>__<alvo>__<tabela>.parquet por
+# tabela. O código de saída é 1 se alguma análise falhou.
+#
+# Com --multialvo, cada arquivo é analisado uma única vez para todos os alvos
+# (ver multialvo.py) e o resultado é uma tabela <saida>/<arquivo>__multialvo.json
+# (ou .parquet) com uma linha por par (alvo, fator) e p-valores corrigidos.
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from anova.api import TESTES, analisar_alvos_arquivo, analisar_arquivo
+from anova.normalidade import METODOS_NORMALIDADE
+from anova.posthoc import CORRECOES
+
+
+def _prefixo(saida, caminho, alvo):
+    nome = os.path.splitext(os.path.basename(caminho))[0]
+    return os.path.join(saida, f'{nome}__{alvo}')
+
+
+def executar_tarefa(tarefa):
+    """Analisa um par (arquivo, alvo) e grava os resultados; retorna (arquivo, alvo, arquivos gravados, erro)."""
+    caminho, alvo, opcoes = tarefa
+    opcoes = dict(opcoes)
+    saida = opcoes.pop('saida')
+    formatos = opcoes.pop('formatos')
+    try:
+        relatorio = analisar_arquivo(caminho, alvo, **opcoes)
+        prefixo = _prefixo(saida, caminho, relatorio.var_target)
+        gravados = []
+        if 'json' in formatos:
+            with open(f'{prefixo}.json', 'w', encoding='utf-8') as f:
+                json.dump(relatorio.para_dict(), f, ensure_ascii=False, indent=2)
+            gravados.append(f'{prefixo}.json')
+        if 'parquet' in formatos:
+            for nome, tabela in relatorio.tabelas().items():
+                tabela.to_parquet(f'{prefixo}__{nome}.parquet', index=False)
+                gravados.append(f'{prefixo}__{nome}.parquet')
+    except Exception as e:
+        return caminho, alvo, [], f'{type(e).__name__}: {e}'
+    return caminho, alvo, gravados, None
+
+
+def executar_multialvo(tarefa):
+    """Analisa todos os alvos de um arquivo em uma passada e grava a tabela; retorna como `executar_tarefa`."""
+    caminho, alvos, opcoes = tarefa
+    prefixo = os.path.join(opcoes['saida'], os.path.splitext(os.path.basename(caminho))[0] + '__multialvo')
+    try:
+        tabela = analisar_alvos_arquivo(caminho, alvos, opcoes['fatores'],
+                                        metodo_normalidade=opcoes['metodo_normalidade'],
+                                        correcao=opcoes['correcao_alvos'])
+        gravados = []
+        if 'json' in opcoes['formatos']:
+            tabela.to_json(f'{prefixo}.json', orient='records', force_ascii=False, indent=2)
+            gravados.append(f'{prefixo}.json')
+        if 'parquet' in opcoes['formatos']:
+            tabela.to_parquet(f'{prefixo}.parquet', index=False)
+            gravados.append(f'{prefixo}.parquet')
+    except Exception as e:
+        return caminho, ','.join(alvos), [], f'{type(e).__name__}: {e}'
+    return caminho, ','.join(alvos), gravados, None
+
+
+def _interacao(texto):
+    fatores = tuple(f for f in texto.split(':') if f)
+    if len(fatores) < 2:
+        raise argparse.ArgumentTypeError(f"Interação inválida: {texto!r} (use Fator1:Fator2).")
+    return fatores
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m anova',
+        description="Executa as análises ANOVA em lote sobre vários arquivos CSV e variáveis resposta.",
+    )
+    parser.add_argument('arquivos', nargs='+', help="arquivos CSV a analisar")
+    parser.add_argument('--alvos', nargs='+', default=['SalePrice'], help="variáveis resposta")
+    parser.add_argument('--fatores', nargs='+', required=True, help="variáveis categóricas")
+    parser.add_argument('--interacoes', nargs='*', type=_interacao, default=[],
+                        help="interações da ANOVA multifatorial, no formato Fator1:Fator2")
+    parser.add_argument('--tipo-ss', type=int, choices=[2, 3], default=2,
+                        help="soma de quadrados da ANOVA multifatorial (Tipo II ou III)")
+    parser.add_argument('--testes', nargs='+', choices=TESTES, default=list(TESTES))
+    parser.add_argument('--normalidade', choices=list(METODOS_NORMALIDADE), default='auto',
+                        help="teste de normalidade dos resíduos")
+    parser.add_argument('--alpha', type=float, default=0.05, help="nível de significância do Tukey HSD e do teste de Dunn")
+    parser.add_argument('--correcao-dunn', choices=list(CORRECOES), default='holm',
+                        help="ajuste dos p-valores do teste de Dunn")
+    parser.add_argument('--multialvo', action='store_true',
+                        help="analisa todos os alvos de cada arquivo de uma vez, em uma única tabela")
+    parser.add_argument('--correcao-alvos', choices=list(CORRECOES), default='fdr_bh',
+                        help="ajuste dos p-valores da tabela de --multialvo")
+    parser.add_argument('--formatos', nargs='+', choices=['json', 'parquet'], default=['json'])
+    parser.add_argument('--saida', default='resultados_anova', help="diretório de saída")
+    parser.add_argument('--processos', type=int, default=1, help="número de análises executadas em paralelo")
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    os.makedirs(args.saida, exist_ok=True)
+    opcoes = {
+        'fatores': args.fatores,
+        'interacoes': args.interacoes,
+        'testes': args.testes,
+        'metodo_normalidade': args.normalidade,
+        'alpha': args.alpha,
+        'correcao_dunn': args.correcao_dunn,
+        'tipo_ss': args.tipo_ss,
+        'saida': args.saida,
+        'formatos': args.formatos,
+    }
+    if args.multialvo:
+        executar = executar_multialvo
+        opcoes['correcao_alvos'] = args.correcao_alvos
+        tarefas = [(caminho, args.alvos, opcoes) for caminho in args.arquivos]
+    else:
+        executar = executar_tarefa
+        tarefas = [(caminho, alvo, opcoes) for caminho in args.arquivos for alvo in args.alvos]
+
+    if args.processos <= 1:
+        resultados = [executar(t) for t in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=args.processos) as executor:
+            resultados = list(executor.map(executar, tarefas))
+
+    falhas = 0
+    for caminho, alvo, gravados, erro in resultados:
+        if erro is None:
+            print(f"ok    {caminho} [{alvo}] -> {', '.join(gravados)}")
+        else:
+            falhas += 1
+            print(f"erro  {caminho} [{alvo}]: {erro}", file=sys.stderr)
+    return 1 if falhas else 0
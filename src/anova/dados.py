@@ -0,0 +1,123 @@
+# dados.py - Carregamento colunar e tipado dos conjuntos de dados
+#
+# Na primeira leitura o CSV é convertido para tipos compactos (colunas de texto
+# viram `category`) e gravado em um arquivo Parquet ao lado do original. As
+# leituras seguintes usam o Parquet com memory-map e leem apenas as colunas pedidas.
+
+import importlib.util
+import os
+
+import pandas as pd
+
+from anova.tardio import ModuloTardio
+
+# pyarrow é opcional (sem ele o CSV é sempre lido diretamente) e só é
+# importado na primeira leitura ou gravação do Parquet, não na partida do app
+PYARROW_DISPONIVEL = importlib.util.find_spec('pyarrow') is not None
+pa = ModuloTardio('pyarrow')
+pq = ModuloTardio('pyarrow.parquet')
+
+# Colunas de texto com mais valores distintos do que esta fração das linhas
+# (identificadores, por exemplo) não compensam a codificação como `category`
+FRACAO_MAX_NIVEIS = 0.5
+
+# Chave dos metadados do Parquet com a assinatura do CSV de origem
+_CHAVE_ORIGEM = b'anova.origem'
+
+
+def normalizar_nome(coluna):
+    """Nome de coluna usado pelo aplicativo: espaços viram sublinhados."""
+    return str(coluna).replace(' ', '_')
+
+
+def caminho_sidecar(caminho):
+    """Caminho do arquivo Parquet associado a um CSV."""
+    return f'{caminho}.parquet'
+
+
+def _assinatura(caminho):
+    info = os.stat(caminho)
+    return f'{info.st_size}:{info.st_mtime_ns}'.encode()
+
+
+def tipar_colunas(df, fracao_max_niveis=FRACAO_MAX_NIVEIS):
+    """Converte colunas de texto com poucos valores distintos para `category` (códigos inteiros)."""
+    limite = max(1, int(len(df) * fracao_max_niveis))
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+            if serie.nunique(dropna=True) <= limite:
+                df[col] = serie.astype('category')
+    return df
+
+
+def _ler_csv(caminho, colunas=None):
+    usecols = None
+    if colunas is not None:
+        desejadas = set(colunas)
+        usecols = lambda col: normalizar_nome(col) in desejadas
+    df = pd.read_csv(caminho, usecols=usecols)
+    df.columns = [normalizar_nome(c) for c in df.columns]
+    if colunas is not None:
+        df = df[colunas]
+    return tipar_colunas(df)
+
+
+def _sidecar_valido(sidecar, caminho):
+    if not PYARROW_DISPONIVEL or not os.path.exists(sidecar):
+        return False
+    try:
+        metadados = pq.read_schema(sidecar).metadata or {}
+    except (OSError, ValueError):
+        return False
+    return metadados.get(_CHAVE_ORIGEM) == _assinatura(caminho)
+
+
+def _gravar_sidecar(df, sidecar, caminho):
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    metadados = dict(tabela.schema.metadata or {})
+    metadados[_CHAVE_ORIGEM] = _assinatura(caminho)
+    temporario = f'{sidecar}.tmp'
+    pq.write_table(tabela.replace_schema_metadata(metadados), temporario)
+    os.replace(temporario, sidecar)
+
+
+def carregar_tabela(caminho, colunas=None, usar_sidecar=True):
+    """
+    Carrega um CSV como DataFrame tipado, com nomes de colunas normalizados.
+
+    Parâmetros:
+    - caminho: caminho do arquivo CSV
+    - colunas: nomes (já normalizados) das colunas a carregar; None carrega todas
+    - usar_sidecar: lê/grava o Parquet associado ao CSV (requer pyarrow)
+
+    Quando o Parquet está desatualizado ou ausente, o CSV completo é lido uma
+    vez para gerá-lo. Se não for possível gravá-lo (pyarrow ausente, diretório
+    somente leitura), apenas as colunas pedidas são lidas do CSV.
+    """
+    if colunas is not None:
+        colunas = list(dict.fromkeys(colunas))
+
+    if not (usar_sidecar and PYARROW_DISPONIVEL):
+        return _ler_csv(caminho, colunas)
+
+    sidecar = caminho_sidecar(caminho)
+    if not _sidecar_valido(sidecar, caminho):
+        df = _ler_csv(caminho)
+        try:
+            _gravar_sidecar(df, sidecar, caminho)
+        except OSError:
+            pass
+        return df if colunas is None else df[colunas]
+
+    return pq.read_table(sidecar, columns=colunas, memory_map=True).to_pandas()
+
+
+def colunas_disponiveis(caminho):
+    """Nomes normalizados das colunas de um CSV, sem carregar os dados."""
+    sidecar = caminho_sidecar(caminho)
+    if _sidecar_valido(sidecar, caminho):
+        return list(pq.read_schema(sidecar).names)
+    return [normalizar_nome(c) for c in pd.read_csv(caminho, nrows=0).columns]
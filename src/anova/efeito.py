@@ -0,0 +1,130 @@
+# efeito.py - Tamanhos de efeito e poder da ANOVA a partir das estatísticas por grupo
+#
+# Com n grande quase todo fator sai "muito significativo"; o tamanho de efeito
+# diz quanto da variação ele explica. Tudo aqui usa somas de quadrados,
+# contagens, médias e variâncias já calculadas (nenhum modelo é reajustado).
+# O poder usa a distribuição F não central com f de Cohen: λ = f² · N.
+
+import numpy as np
+
+from anova.tardio import ModuloTardio
+
+optimize = ModuloTardio('scipy.optimize')
+stats = ModuloTardio('scipy.stats')
+
+# Limites usuais de Cohen para η² (pequeno, médio, grande)
+LIMITES_ETA = ((0.14, 'grande'), (0.06, 'médio'), (0.01, 'pequeno'))
+
+
+# ================================
+# TAMANHOS DE EFEITO
+# ================================
+
+def eta_quadrado(ss_efeito, ss_total):
+    """Proporção da variação total explicada pelo efeito."""
+    return ss_efeito / ss_total if ss_total > 0 else np.nan
+
+
+def omega_quadrado(ss_efeito, gl_efeito, ss_total, qm_residuo):
+    """Estimativa menos viesada de η²: (SS_efeito - gl · QM_res) / (SS_total + QM_res)."""
+    denominador = ss_total + qm_residuo
+    return (ss_efeito - gl_efeito * qm_residuo) / denominador if denominador > 0 else np.nan
+
+
+def epsilon_quadrado(h, n):
+    """Tamanho de efeito do Kruskal-Wallis: H / (n - 1)."""
+    return h / (n - 1) if n > 1 else np.nan
+
+
+def classificar_eta(eta2):
+    """'grande', 'médio', 'pequeno' ou 'desprezível' segundo os limites de Cohen para η²."""
+    for limite, rotulo in LIMITES_ETA:
+        if eta2 >= limite:
+            return rotulo
+    return 'desprezível'
+
+
+def efeitos_multifatorial(tabela):
+    """
+    Acrescenta eta_sq, partial_eta_sq e omega_sq a uma tabela no formato de `anova_lm`.
+
+    SS_total é a soma da coluna sum_sq (termos e resíduo, sem a linha Intercept
+    da Tipo III); com delineamento desbalanceado, η² dos termos não soma
+    exatamente o R² do modelo.
+    """
+    tabela = tabela.copy()
+    ss, gl = tabela['sum_sq'], tabela['df']
+    ss_residuo = float(ss['Residual'])
+    qm_residuo = ss_residuo / float(gl['Residual'])
+    termos = ~tabela.index.isin(['Residual', 'Intercept'])
+    ss_total = float(ss[termos].sum()) + ss_residuo
+    tabela['eta_sq'] = np.where(termos, ss / ss_total, np.nan)
+    tabela['partial_eta_sq'] = np.where(termos, ss / (ss + ss_residuo), np.nan)
+    tabela['omega_sq'] = np.where(termos, (ss - gl * qm_residuo) / (ss_total + qm_residuo), np.nan)
+    return tabela
+
+
+def hedges_g(n1, media1, variancia1, n2, media2, variancia2):
+    """g de Hedges (d de Cohen com desvio combinado e correção de viés), vetorizado."""
+    n1, n2 = np.asarray(n1, dtype=np.float64), np.asarray(n2, dtype=np.float64)
+    gl = n1 + n2 - 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        desvio = np.sqrt(((n1 - 1) * np.nan_to_num(variancia1) + (n2 - 1) * np.nan_to_num(variancia2)) / gl)
+        return (np.asarray(media1) - np.asarray(media2)) / desvio * (1.0 - 3.0 / (4.0 * gl - 1.0))
+
+
+# ================================
+# PODER E EFEITO MÍNIMO DETECTÁVEL
+# ================================
+
+def f_cohen(eta2):
+    """f de Cohen a partir de η²: sqrt(η² / (1 - η²))."""
+    return float(np.sqrt(eta2 / (1.0 - eta2)))
+
+
+def eta_de_f(f):
+    """η² a partir do f de Cohen."""
+    return f * f / (1.0 + f * f)
+
+
+def poder_anova(f, k, n_total, alpha=0.05):
+    """
+    Poder da ANOVA de um fator com `k` grupos de tamanhos iguais e `n_total` observações.
+
+    Parâmetros:
+    - f: tamanho de efeito (f de Cohen; ver `f_cohen`)
+    - k: número de grupos
+    - n_total: número total de observações
+    - alpha: nível de significância
+    """
+    gl_entre, gl_dentro = k - 1, n_total - k
+    if gl_entre < 1 or gl_dentro < 1:
+        return np.nan
+    critico = stats.f.isf(alpha, gl_entre, gl_dentro)
+    return float(stats.ncf.sf(critico, gl_entre, gl_dentro, f * f * n_total))
+
+
+def efeito_minimo_detectavel(k, n_total, poder=0.8, alpha=0.05):
+    """Menor f de Cohen detectado com o `poder` pedido, dados `k` grupos e `n_total` observações."""
+    if poder_anova(10.0, k, n_total, alpha) < poder:
+        return np.nan
+    return float(optimize.brentq(lambda f: poder_anova(f, k, n_total, alpha) - poder, 1e-6, 10.0))
+
+
+def n_necessario(f, k, poder=0.8, alpha=0.05, n_maximo=10_000_000):
+    """Menor número total de observações para detectar o efeito `f` com o `poder` pedido (None se > n_maximo)."""
+    if f <= 0 or poder_anova(f, k, n_maximo, alpha) < poder:
+        return None
+    if poder_anova(f, k, k + 1, alpha) >= poder:
+        return k + 1
+    baixo, alto = k + 1, k + 2
+    while poder_anova(f, k, alto, alpha) < poder:
+        baixo, alto = alto, min(2 * alto, n_maximo)
+    # Busca binária: o poder cresce com n
+    while alto - baixo > 1:
+        meio = (baixo + alto) // 2
+        if poder_anova(f, k, meio, alpha) >= poder:
+            alto = meio
+        else:
+            baixo = meio
+    return int(alto)
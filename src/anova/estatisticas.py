@@ -0,0 +1,284 @@
+# estatisticas.py - ANOVA de um fator a partir de estatísticas suficientes por grupo
+#
+# Em vez de montar uma matriz de dummies (patsy) e resolver mínimos quadrados,
+# cada fator é convertido em códigos inteiros e as somas por grupo são obtidas
+# com np.bincount. F, p-valor, resíduos e Breusch-Pagan saem dessas somas.
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from anova.efeito import eta_quadrado, omega_quadrado
+from anova.tardio import ModuloTardio
+
+stats = ModuloTardio('scipy.stats')
+
+
+# ================================
+# CODIFICAÇÃO E MOMENTOS POR GRUPO
+# ================================
+
+def codificar_fator(valores):
+    """
+    Converte uma coluna categórica em códigos inteiros 0..k-1.
+
+    Retorna (codigos, niveis). Valores ausentes recebem código -1 e níveis
+    sem observações são descartados, para que todo código corresponda a um grupo.
+    Um IndiceFator já contém a codificação e é devolvido sem novo cálculo.
+    """
+    if isinstance(valores, IndiceFator):
+        return valores.codigos, valores.niveis
+    if isinstance(valores, pd.Series) and isinstance(valores.dtype, pd.CategoricalDtype):
+        categorico = valores.cat.remove_unused_categories().array
+    else:
+        categorico = pd.Categorical(valores)
+        categorico = categorico.remove_unused_categories()
+    codigos = np.asarray(categorico.codes, dtype=np.int64)
+    return codigos, categorico.categories
+
+
+@dataclass
+class EstatisticasGrupos:
+    """Contagem, soma e soma de quadrados por grupo (valores deslocados por `deslocamento`)."""
+    n: np.ndarray
+    soma: np.ndarray
+    soma_quadrados: np.ndarray
+    deslocamento: float = 0.0
+
+    @property
+    def k(self):
+        return len(self.n)
+
+    @property
+    def n_total(self):
+        return int(self.n.sum())
+
+    @property
+    def medias(self):
+        return self.soma / self.n + self.deslocamento
+
+    @property
+    def media_geral(self):
+        return self.soma.sum() / self.n.sum() + self.deslocamento
+
+    @property
+    def ss_dentro_grupos(self):
+        """Soma de quadrados de cada grupo em torno da própria média."""
+        return np.maximum(self.soma_quadrados - self.soma ** 2 / self.n, 0.0)
+
+    @property
+    def variancias(self):
+        """Variância amostral (ddof=1) de cada grupo; NaN para grupos com uma observação."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.n > 1, self.ss_dentro_grupos / (self.n - 1), np.nan)
+
+
+def momentos_grupos(codigos, y, k=None):
+    """
+    Calcula contagem, soma e soma de quadrados de `y` por grupo em uma única passada.
+
+    `y` é deslocado pela própria média antes do acúmulo para reduzir o
+    cancelamento numérico em Σy² - (Σy)²/n.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    if k is None:
+        k = int(codigos.max()) + 1 if len(codigos) else 0
+    deslocamento = float(y.mean()) if len(y) else 0.0
+    yc = y - deslocamento
+    n = np.bincount(codigos, minlength=k).astype(np.float64)
+    soma = np.bincount(codigos, weights=yc, minlength=k)
+    soma_quadrados = np.bincount(codigos, weights=yc * yc, minlength=k)
+    return EstatisticasGrupos(n, soma, soma_quadrados, deslocamento)
+
+
+def combinar_codigos(codigos, tamanhos):
+    """
+    Código da célula (combinação de níveis) de cada linha, numerado 0..c-1 entre as células observadas.
+
+    Parâmetros:
+    - codigos: lista de arrays de códigos, um por fator (-1 = ausente)
+    - tamanhos: número de níveis de cada fator
+
+    Retorna (celulas, c); linhas com algum fator ausente recebem -1. Só as
+    células presentes nos dados são numeradas, sem alocar o produto dos níveis.
+    """
+    celulas = np.zeros(len(codigos[0]), dtype=np.int64)
+    validas = np.ones(len(codigos[0]), dtype=bool)
+    combinacoes = 1
+    for cod, k in zip(codigos, tamanhos):
+        celulas = celulas * k + cod
+        validas &= cod >= 0
+        combinacoes *= k
+        # Renumera antes que o produto dos números de níveis estoure o int64
+        if combinacoes > 2 ** 31:
+            celulas, combinacoes = _compactar(np.where(validas, celulas, -1))
+    return _compactar(np.where(validas, celulas, -1))
+
+
+def _compactar(codigos):
+    """Renumera os códigos não negativos presentes como 0..c-1 (negativos viram -1)."""
+    validos = codigos >= 0
+    unicos, inverso = np.unique(codigos[validos], return_inverse=True)
+    compactos = np.full(len(codigos), -1, dtype=np.int64)
+    compactos[validos] = inverso.ravel()
+    return compactos, len(unicos)
+
+
+def dividir_por_grupo(codigos, y, k=None):
+    """Separa `y` em uma lista de arrays, um por grupo, com uma ordenação estável."""
+    y = np.asarray(y)
+    if k is None:
+        k = int(codigos.max()) + 1 if len(codigos) else 0
+    ordem = np.argsort(codigos, kind='stable')
+    cortes = np.cumsum(np.bincount(codigos, minlength=k))[:-1]
+    return np.split(y[ordem], cortes)
+
+
+@dataclass
+class IndiceFator:
+    """
+    Codificação de um fator feita uma única vez: códigos, níveis e a ordem das
+    linhas agrupadas por nível (início e tamanho de cada grupo em `ordem`).
+
+    Pode ser passado no lugar dos valores do fator a qualquer função que use
+    `codificar_fator` (ANOVA, pós-testes, postos, boxplots, reamostragem).
+    """
+    codigos: np.ndarray
+    niveis: pd.Index
+    ordem: np.ndarray
+    inicios: np.ndarray
+    tamanhos: np.ndarray
+
+    @classmethod
+    def criar(cls, valores):
+        codigos, niveis = codificar_fator(valores)
+        validos = np.flatnonzero(codigos >= 0)
+        ordem = validos[np.argsort(codigos[validos], kind='stable')]
+        tamanhos = np.bincount(codigos[validos], minlength=len(niveis))
+        inicios = np.concatenate([[0], np.cumsum(tamanhos)[:-1]]).astype(np.int64)
+        # Compartilhado por todas as etapas: nenhuma delas pode alterá-lo
+        for array in (codigos, ordem, inicios, tamanhos):
+            array.setflags(write=False)
+        return cls(codigos, niveis, ordem, inicios, tamanhos)
+
+    @property
+    def k(self):
+        return len(self.niveis)
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def categorico(self):
+        """O fator como pd.Categorical, montado a partir dos códigos (sem nova codificação)."""
+        return pd.Categorical.from_codes(self.codigos, self.niveis)
+
+    def dividir(self, y):
+        """Separa `y` em uma lista de arrays, um por nível, usando a ordem já calculada."""
+        return np.split(np.asarray(y)[self.ordem], self.inicios[1:])
+
+
+# ================================
+# ANOVA DE UM FATOR
+# ================================
+
+@dataclass
+class ResultadoUmFator:
+    """Resultado da ANOVA de um fator e do teste de Breusch-Pagan sobre os resíduos."""
+    niveis: pd.Index
+    estatisticas: EstatisticasGrupos
+    f: float
+    pvalor: float
+    gl_entre: int
+    gl_dentro: int
+    ss_entre: float
+    ss_dentro: float
+    residuos: np.ndarray
+    bp_lm: float
+    bp_pvalor: float
+    bp_f: float
+    bp_f_pvalor: float
+
+    @property
+    def eta_quadrado(self):
+        return eta_quadrado(self.ss_entre, self.ss_entre + self.ss_dentro)
+
+    @property
+    def omega_quadrado(self):
+        return omega_quadrado(self.ss_entre, self.gl_entre, self.ss_entre + self.ss_dentro,
+                              self.ss_dentro / self.gl_dentro)
+
+
+def _breusch_pagan_grupos(codigos, residuos, k):
+    """
+    Breusch-Pagan (versão studentizada de Koenker, como `het_breuschpagan`).
+
+    A regressão auxiliar de e² sobre as dummies do fator tem como valores
+    ajustados as médias de e² por grupo, logo R² = SS_entre(e²) / SS_total(e²).
+    """
+    n = len(residuos)
+    e2 = residuos * residuos
+    mom = momentos_grupos(codigos, e2, k)
+    ss_total = float(mom.soma_quadrados.sum() - mom.soma.sum() ** 2 / n)
+    ss_dentro = float(mom.ss_dentro_grupos.sum())
+    r2 = 1.0 - ss_dentro / ss_total if ss_total > 0 else 0.0
+    gl_modelo, gl_resid = k - 1, n - k
+    lm = n * r2
+    lm_pvalor = float(stats.chi2.sf(lm, gl_modelo))
+    if gl_resid > 0 and r2 < 1.0:
+        f = (r2 / gl_modelo) / ((1.0 - r2) / gl_resid)
+        f_pvalor = float(stats.f.sf(f, gl_modelo, gl_resid))
+    else:
+        f, f_pvalor = np.inf, 0.0
+    return lm, lm_pvalor, f, f_pvalor
+
+
+def anova_um_fator(fator, y):
+    """
+    ANOVA de um fator calculada a partir das estatísticas suficientes de cada grupo.
+
+    Parâmetros:
+    - fator: valores categóricos (Series, Categorical, array ou IndiceFator)
+    - y: valores da variável resposta, alinhados com `fator`
+
+    Linhas com fator ou resposta ausentes são ignoradas. Os resíduos são
+    y menos a média do grupo, idênticos aos de `OLS(y ~ C(fator))`.
+    """
+    codigos, niveis = codificar_fator(fator)
+    y = np.asarray(y, dtype=np.float64)
+    validos = (codigos >= 0) & ~np.isnan(y)
+    if not validos.all():
+        codigos, niveis = codificar_fator(pd.Categorical.from_codes(codigos[validos], niveis))
+        y = y[validos]
+
+    k = len(niveis)
+    n = len(y)
+    if k < 2 or n <= k:
+        raise ValueError(f"ANOVA requer ao menos 2 grupos e mais observações do que grupos (k={k}, n={n}).")
+
+    mom = momentos_grupos(codigos, y, k)
+    ss_dentro = float(mom.ss_dentro_grupos.sum())
+    ss_entre = float((mom.soma ** 2 / mom.n).sum() - mom.soma.sum() ** 2 / n)
+    gl_entre, gl_dentro = k - 1, n - k
+    f = (ss_entre / gl_entre) / (ss_dentro / gl_dentro) if ss_dentro > 0 else np.inf
+    pvalor = float(stats.f.sf(f, gl_entre, gl_dentro))
+
+    residuos = y - mom.medias[codigos]
+    bp_lm, bp_pvalor, bp_f, bp_f_pvalor = _breusch_pagan_grupos(codigos, residuos, k)
+
+    return ResultadoUmFator(
+        niveis=niveis,
+        estatisticas=mom,
+        f=f,
+        pvalor=pvalor,
+        gl_entre=gl_entre,
+        gl_dentro=gl_dentro,
+        ss_entre=ss_entre,
+        ss_dentro=ss_dentro,
+        residuos=residuos,
+        bp_lm=bp_lm,
+        bp_pvalor=bp_pvalor,
+        bp_f=bp_f,
+        bp_f_pvalor=bp_f_pvalor,
+    )
+
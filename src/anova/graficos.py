@@ -0,0 +1,181 @@
+# graficos.py - Resumos calculados no servidor para os gráficos do aplicativo
+#
+# Em vez de enviar todas as linhas para o navegador (o Vega calcula os quartis
+# no cliente), os boxplots são desenhados a partir de um resumo com poucas
+# linhas por grupo: quartis, bigodes e uma amostra limitada de outliers.
+# Os Q-Q plots seguem a mesma ideia: quantis calculados com NumPy e, para
+# muitos pontos (resíduos), apenas uma seleção de estatísticas de ordem.
+
+import numpy as np
+import pandas as pd
+
+from anova.estatisticas import codificar_fator
+from anova.tardio import ModuloTardio
+
+alt = ModuloTardio('altair')
+special = ModuloTardio('scipy.special')
+
+MAX_OUTLIERS_POR_GRUPO = 50
+MAX_PONTOS_QQ = 2000
+
+
+def _quantis_ordenados(valores, inicios, n, p):
+    """Quantil p (interpolação linear, como numpy e d3) de cada grupo já ordenado em `valores`."""
+    posicao = inicios + p * (n - 1)
+    baixo = np.floor(posicao).astype(np.int64)
+    alto = np.minimum(baixo + 1, inicios + n - 1)
+    fracao = posicao - baixo
+    return valores[baixo] * (1.0 - fracao) + valores[alto] * fracao
+
+
+def resumo_boxplot(fator, y, extensao='min-max', max_outliers=MAX_OUTLIERS_POR_GRUPO, semente=0):
+    """
+    Quartis, bigodes e outliers de `y` para cada nível de `fator`.
+
+    Parâmetros:
+    - fator, y: valores alinhados (linhas com ausentes são ignoradas)
+    - extensao: 'min-max' (bigodes no mínimo e no máximo, sem outliers, como
+      `mark_boxplot(extent='min-max')`) ou um número k para bigodes em k * IQR
+    - max_outliers: número máximo de outliers mantidos por grupo (amostra reprodutível)
+
+    Retorna (resumo, outliers): um DataFrame com uma linha por nível e outro
+    com os outliers amostrados.
+    """
+    codigos, niveis = codificar_fator(fator)
+    y = np.asarray(y, dtype=np.float64)
+    validos = (codigos >= 0) & ~np.isnan(y)
+    codigos, y = codigos[validos], y[validos]
+
+    k = len(niveis)
+    n = np.bincount(codigos, minlength=k)
+    presentes = np.flatnonzero(n > 0)
+    ordem = np.lexsort((y, codigos))
+    valores, codigos_ordenados = y[ordem], codigos[ordem]
+    inicios = np.concatenate([[0], np.cumsum(n)[:-1]])[presentes]
+    n = n[presentes]
+
+    q1 = _quantis_ordenados(valores, inicios, n, 0.25)
+    mediana = _quantis_ordenados(valores, inicios, n, 0.5)
+    q3 = _quantis_ordenados(valores, inicios, n, 0.75)
+    minimo = valores[inicios]
+    maximo = valores[inicios + n - 1]
+
+    if extensao == 'min-max':
+        bigode_inf, bigode_sup = minimo, maximo
+        outliers = pd.DataFrame({'nivel': pd.Series([], dtype=object), 'valor': pd.Series([], dtype=np.float64)})
+    else:
+        iqr = q3 - q1
+        limite_inf, limite_sup = q1 - extensao * iqr, q3 + extensao * iqr
+        # Por grupo: o índice de grupo de cada valor ordenado dentro de `presentes`
+        grupo = np.searchsorted(presentes, codigos_ordenados)
+        dentro = (valores >= limite_inf[grupo]) & (valores <= limite_sup[grupo])
+        # Valores ordenados: o menor/maior valor dentro dos limites são os bigodes
+        bigode_inf = np.full(len(presentes), np.nan)
+        bigode_sup = np.full(len(presentes), np.nan)
+        np.fmin.at(bigode_inf, grupo[dentro], valores[dentro])
+        np.fmax.at(bigode_sup, grupo[dentro], valores[dentro])
+
+        fora = np.flatnonzero(~dentro)
+        rng = np.random.default_rng(semente)
+        fora = fora[rng.permutation(len(fora))]
+        # Mantém até max_outliers por grupo: posição de cada outlier dentro do seu grupo após o embaralhamento
+        grupos_fora = grupo[fora]
+        ordem_fora = np.argsort(grupos_fora, kind='stable')
+        fora, grupos_fora = fora[ordem_fora], grupos_fora[ordem_fora]
+        primeiros = np.searchsorted(grupos_fora, grupos_fora, side='left')
+        manter = (np.arange(len(fora)) - primeiros) < max_outliers
+        outliers = pd.DataFrame({
+            'nivel': np.asarray(niveis, dtype=object)[presentes[grupos_fora[manter]]],
+            'valor': valores[fora[manter]],
+        })
+
+    resumo = pd.DataFrame({
+        'nivel': np.asarray(niveis, dtype=object)[presentes],
+        'n': n,
+        'minimo': minimo,
+        'bigode_inf': bigode_inf,
+        'q1': q1,
+        'mediana': mediana,
+        'q3': q3,
+        'bigode_sup': bigode_sup,
+        'maximo': maximo,
+    })
+    return resumo, outliers
+
+
+def grafico_boxplot(resumo, outliers, var, titulo_y):
+    """Boxplot Altair desenhado a partir do resumo por grupo (poucas linhas por nível)."""
+    resumo = resumo.assign(nivel=resumo['nivel'].astype(str))
+    x = alt.X('nivel:N', title=var)
+    cor = alt.Color('nivel:N', legend=None)
+    dica = [alt.Tooltip('nivel:N', title=var), 'n:Q', 'q1:Q', 'mediana:Q', 'q3:Q']
+
+    base = alt.Chart(resumo)
+    bigodes = base.mark_rule().encode(x=x, y=alt.Y('bigode_inf:Q', title=titulo_y), y2='bigode_sup:Q')
+    caixas = base.mark_bar(size=14).encode(x=x, y='q1:Q', y2='q3:Q', color=cor, tooltip=dica)
+    medianas = base.mark_tick(color='white', size=14).encode(x=x, y='mediana:Q')
+    camadas = [bigodes, caixas, medianas]
+
+    if len(outliers):
+        pontos = alt.Chart(outliers.assign(nivel=outliers['nivel'].astype(str))).mark_point(size=12).encode(
+            x=x, y='valor:Q', color=cor)
+        camadas.append(pontos)
+    return alt.layer(*camadas)
+
+
+# ================================
+# Q-Q PLOT
+# ================================
+
+def quantis_qq(valores, max_pontos=MAX_PONTOS_QQ):
+    """
+    Quantis teóricos (normal) e amostrais de `valores`, e a reta de referência, como `stats.probplot`.
+
+    Parâmetros:
+    - valores: amostra (valores ausentes são ignorados)
+    - max_pontos: número máximo de pontos devolvidos; acima dele são mantidas
+      estatísticas de ordem igualmente espaçadas, incluindo o mínimo e o máximo
+
+    A reta (mínimos quadrados dos quantis amostrais sobre os teóricos) usa
+    todos os valores, não só os pontos devolvidos.
+    """
+    x = np.sort(np.asarray(valores, dtype=np.float64))
+    x = x[~np.isnan(x)]
+    n = len(x)
+    # Posições de plotagem de Filliben, as mesmas do `stats.probplot`
+    p = (np.arange(1, n + 1) - 0.3175) / (n + 0.365)
+    if n:
+        p[-1] = 0.5 ** (1.0 / n)
+        p[0] = 1.0 - p[-1]
+    teoricos = special.ndtri(p)
+
+    if n > 1:
+        centrados = teoricos - teoricos.mean()
+        inclinacao = float(centrados @ (x - x.mean()) / (centrados @ centrados))
+        intercepto = float(x.mean() - inclinacao * teoricos.mean())
+    else:
+        inclinacao, intercepto = np.nan, np.nan
+
+    if n > max_pontos:
+        selecionados = np.unique(np.linspace(0, n - 1, max_pontos).round().astype(np.int64))
+        teoricos, x = teoricos[selecionados], x[selecionados]
+    return {
+        'teoricos': teoricos,
+        'amostrais': x,
+        'inclinacao': inclinacao,
+        'intercepto': intercepto,
+        'n': n,
+    }
+
+
+def grafico_qq(qq, titulo):
+    """Q-Q plot Altair (pontos e reta de referência) a partir do resultado de `quantis_qq`."""
+    pontos = pd.DataFrame({'teoricos': qq['teoricos'], 'amostrais': qq['amostrais']})
+    extremos = np.array([pontos['teoricos'].min(), pontos['teoricos'].max()])
+    reta = pd.DataFrame({'teoricos': extremos, 'amostrais': qq['inclinacao'] * extremos + qq['intercepto']})
+
+    x = alt.X('teoricos:Q', title='Quantis teóricos')
+    y = alt.Y('amostrais:Q', title='Quantis amostrais', scale=alt.Scale(zero=False))
+    camada_pontos = alt.Chart(pontos).mark_circle(size=25, color='steelblue').encode(x=x, y=y)
+    camada_reta = alt.Chart(reta).mark_line(color='red').encode(x=x, y=y)
+    return alt.layer(camada_pontos, camada_reta).properties(title=titulo, height=260)
@@ -0,0 +1,108 @@
+# incremental.py - Atualização incremental das ANOVAs quando linhas entram ou saem
+#
+# O estado guarda as estatísticas suficientes de um AcumuladorAnova (momentos
+# por grupo e contagens cruzadas, ou seja, X'X e X'y do modelo aditivo) e a
+# contagem de quantas vezes cada linha (hash) foi acrescentada, o que impede retirar
+# linhas que não entraram ou que já saíram. Momentos e registro são
+# atualizados em O(tamanho do lote); o registro ocupa uma entrada de
+# dicionário por linha distinta (da ordem de 100 bytes), a única parte do
+# estado que cresce com o número de linhas. Os p-valores são recalculados a
+# partir das estatísticas, que têm o tamanho do número de níveis, e ficam
+# guardados até a próxima alteração.
+
+import pickle
+
+from anova.posthoc import games_howell_estatisticas, tukey_hsd_estatisticas
+from anova.streaming import AcumuladorAnova
+
+
+class EstadoIncremental:
+    """
+    Estado das análises de `var_target` para um conjunto fixo de `fatores`.
+
+    Exemplo:
+        estado = EstadoIncremental('SalePrice', ['Neighborhood', 'House_Style'])
+        estado.acrescentar(df_inicial)
+        estado.acrescentar(novas_vendas)      # custo proporcional ao lote
+        estado.anova_multifatorial()
+    """
+
+    def __init__(self, var_target, fatores):
+        self.acumulador = AcumuladorAnova(var_target, fatores)
+        self._resultados = {}
+
+    @property
+    def var_target(self):
+        return self.acumulador.var_target
+
+    @property
+    def fatores(self):
+        return self.acumulador.fatores
+
+    @property
+    def n(self):
+        return int(self.acumulador.n)
+
+    # -------- alterações --------
+
+    def acrescentar(self, linhas):
+        """Incorpora um lote de novas linhas (DataFrame com a resposta e os fatores)."""
+        self.acumulador.atualizar(linhas)
+        self._resultados.clear()
+        return self
+
+    def retirar(self, linhas):
+        """Remove um lote de linhas incorporadas anteriormente (ValueError, sem alterar o estado, se alguma não foi)."""
+        self.acumulador.retirar(linhas)
+        self._resultados.clear()
+        return self
+
+    # -------- resultados --------
+
+    def _memorizado(self, chave, calcular):
+        if chave not in self._resultados:
+            self._resultados[chave] = calcular()
+        return self._resultados[chave]
+
+    def resumo_grupos(self, fator):
+        return self._memorizado(('resumo', fator), lambda: self.acumulador.resumo_grupos(fator))
+
+    def anova_um_fator(self, fator):
+        """Tabela ANOVA de um fator (formato `anova_lm`)."""
+        return self._memorizado(('um_fator', fator), lambda: self.acumulador.tabela_um_fator(fator))
+
+    def anova_multifatorial(self):
+        """Tabela ANOVA Tipo II do modelo aditivo com todos os fatores."""
+        return self._memorizado(('multifatorial',), self.acumulador.tabela_multifatorial)
+
+    def games_howell(self, fator):
+        """Games-Howell entre os níveis de `fator`."""
+        def calcular():
+            resumo = self.resumo_grupos(fator)
+            return games_howell_estatisticas(resumo.index, resumo['n'], resumo['media'], resumo['variancia'])
+        return self._memorizado(('games_howell', fator), calcular)
+
+    def tukey(self, fator, alpha=0.05, top_k=None):
+        """Tukey HSD entre os níveis de `fator`."""
+        def calcular():
+            resumo = self.resumo_grupos(fator)
+            i = self.fatores.index(fator)
+            ss_dentro = float(self.acumulador.m2_grupos[i].sum())
+            return tukey_hsd_estatisticas(resumo.index, resumo['n'], resumo['media'], ss_dentro,
+                                          alpha=alpha, top_k=top_k, variancias=resumo['variancia'])
+        return self._memorizado(('tukey', fator, alpha, top_k), calcular)
+
+    # -------- persistência --------
+
+    def salvar(self, caminho):
+        """Grava as estatísticas suficientes e o registro de hashes (sem os dados brutos) em `caminho`."""
+        with open(caminho, 'wb') as f:
+            pickle.dump(self.acumulador, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def carregar(cls, caminho):
+        with open(caminho, 'rb') as f:
+            acumulador = pickle.load(f)
+        estado = cls(acumulador.var_target, acumulador.fatores)
+        estado.acumulador = acumulador
+        return estado
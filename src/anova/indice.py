@@ -0,0 +1,94 @@
+# indice.py - Índice dos fatores de um conjunto de dados, montado uma única vez
+#
+# Depois da limpeza dos dados, cada fator é codificado uma vez (IndiceFator:
+# códigos, níveis, ordem e início de cada grupo) e a resposta é convertida em
+# float uma vez. Os momentos da resposta por grupo e os postos são calculados
+# no primeiro uso e guardados. As análises do aplicativo recebem o índice em
+# vez de recortes do DataFrame: nenhuma etapa volta a codificar ou agrupar um
+# fator, e a chave de cache dos resultados usa a assinatura do conjunto de
+# dados em vez de um novo hash das colunas a cada chamada. `amostra` monta o
+# índice de uma amostra estratificada para a prévia rápida (ver amostragem.py).
+
+import numpy as np
+import pandas as pd
+
+from anova.amostragem import MIN_POR_GRUPO_PREVIA, N_AMOSTRA_PREVIA, amostra_estratificada
+from anova.cache import chave_conteudo
+from anova.estatisticas import IndiceFator, momentos_grupos
+from anova.postos import ranquear
+
+
+class IndiceDados:
+    """
+    Resposta e fatores codificados de um conjunto de dados.
+
+    Parâmetros:
+    - df: DataFrame com os dados (normalmente já sem ausentes)
+    - var_target: string com o nome da variável resposta
+    - fatores: lista de strings com os nomes das variáveis categóricas
+    - assinatura: chave de conteúdo de `df`, se já calculada (ver `chave_conteudo`)
+
+    Exemplo:
+        indice = IndiceDados(df_clean, 'SalePrice', ['Neighborhood', 'House_Style'])
+        anova_um_fator(indice['Neighborhood'], indice.y)
+    """
+
+    def __init__(self, df, var_target, fatores, assinatura=None):
+        self.var_target = var_target
+        self.fatores = list(fatores)
+        self.y = pd.to_numeric(df[var_target], errors='coerce').to_numpy(dtype=np.float64)
+        self.y.setflags(write=False)
+        self.indices = {fator: IndiceFator.criar(df[fator]) for fator in self.fatores}
+        if assinatura is None:
+            assinatura = chave_conteudo(df[[var_target] + self.fatores])
+        self.assinatura = assinatura
+        self._momentos = {}
+        self._postos = None
+        # Índice completo de onde a amostra foi tirada (None para os dados completos)
+        self.origem = None
+
+    def __getitem__(self, fator):
+        return self.indices[fator]
+
+    def __len__(self):
+        return len(self.y)
+
+    @property
+    def chave_cache(self):
+        """Identifica o conteúdo do índice nas chaves do cache (ver `cache.chave_conteudo`)."""
+        return f'{self.assinatura}:{self.var_target}:{",".join(self.fatores)}'
+
+    def momentos(self, fator):
+        """Contagem, soma e soma de quadrados da resposta por nível de `fator` (calculados uma vez)."""
+        if fator not in self._momentos:
+            indice = self.indices[fator]
+            validos = (indice.codigos >= 0) & ~np.isnan(self.y)
+            self._momentos[fator] = momentos_grupos(indice.codigos[validos], self.y[validos], indice.k)
+        return self._momentos[fator]
+
+    @property
+    def postos(self):
+        """Postos médios da resposta, compartilhados pelo Kruskal-Wallis e pelo Dunn de todos os fatores."""
+        if self._postos is None:
+            self._postos = ranquear(self.y)
+        return self._postos
+
+    def tabela(self, fatores=None):
+        """DataFrame com a resposta e os `fatores` como Categorical, montado a partir dos códigos."""
+        fatores = self.fatores if fatores is None else list(fatores)
+        colunas = {self.var_target: self.y}
+        colunas.update((fator, self.indices[fator].categorico()) for fator in fatores)
+        return pd.DataFrame(colunas)
+
+    def amostra(self, n_alvo=N_AMOSTRA_PREVIA, min_por_grupo=MIN_POR_GRUPO_PREVIA, semente=0):
+        """
+        Índice de uma amostra estratificada pelas células dos fatores (ver `amostra_estratificada`).
+
+        A amostra guarda este índice em `origem`; a chave de cache inclui os parâmetros do sorteio.
+        """
+        linhas = amostra_estratificada([self.indices[fator] for fator in self.fatores], n_alvo,
+                                       min_por_grupo=min_por_grupo, semente=semente)
+        amostra = IndiceDados(self.tabela().iloc[linhas], self.var_target, self.fatores,
+                              assinatura=f'{self.assinatura}:amostra:{n_alvo}:{min_por_grupo}:{semente}')
+        amostra.origem = self
+        return amostra
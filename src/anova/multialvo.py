@@ -0,0 +1,160 @@
+# multialvo.py - ANOVA, pressupostos e Kruskal-Wallis de várias variáveis resposta de uma vez
+#
+# Para cada fator, os códigos e a ordenação por grupo são calculados uma única
+# vez; as contagens, somas e somas de quadrados de todas as respostas saem de
+# uma só chamada a np.add.reduceat sobre a matriz (observações × respostas).
+# F, Breusch-Pagan e H de Kruskal-Wallis ficam vetorizados nas respostas, e os
+# postos de cada resposta são calculados uma vez e reaproveitados por todos os
+# fatores. Ausentes na resposta são tratados coluna a coluna (cada resposta usa
+# as suas linhas válidas), sem descartar linhas das demais.
+
+import numpy as np
+import pandas as pd
+
+from anova.efeito import epsilon_quadrado, eta_quadrado
+from anova.estatisticas import IndiceFator
+from anova.normalidade import testar_normalidade
+from anova.posthoc import ajustar_pvalores
+from anova.postos import ranquear
+from anova.tardio import ModuloTardio
+
+stats = ModuloTardio('scipy.stats')
+
+
+def _matriz_postos(Y):
+    """Postos médios de cada coluna de `Y` (NaN onde ausente) e a soma Σ(t³ - t) dos empates de cada coluna."""
+    postos = np.empty_like(Y)
+    empates = np.empty(Y.shape[1])
+    for j in range(Y.shape[1]):
+        resultado = ranquear(Y[:, j])
+        postos[:, j], empates[j] = resultado.postos, resultado.soma_empates
+    return postos, empates
+
+
+def _somas_por_grupo(M, inicios, centralizar=True):
+    """
+    Contagem, soma e soma de quadrados por grupo de cada coluna de `M` (linhas já ordenadas por grupo).
+
+    Com `centralizar`, cada coluna é deslocada pela própria média antes do
+    acúmulo, como em `momentos_grupos`; o deslocamento é retornado.
+    """
+    presentes = ~np.isnan(M)
+    n_coluna = presentes.sum(axis=0)
+    deslocamento = np.zeros(M.shape[1])
+    if centralizar:
+        deslocamento = np.where(n_coluna > 0, np.where(presentes, M, 0.0).sum(axis=0) / np.maximum(n_coluna, 1), 0.0)
+    centrados = np.where(presentes, M - deslocamento, 0.0)
+    n = np.add.reduceat(presentes.astype(np.float64), inicios, axis=0)
+    soma = np.add.reduceat(centrados, inicios, axis=0)
+    soma_quadrados = np.add.reduceat(centrados * centrados, inicios, axis=0)
+    return n, soma, soma_quadrados, deslocamento
+
+
+def _ss_por_coluna(n, soma, soma_quadrados):
+    """SS entre e dentro dos grupos de cada coluna (grupos vazios não contribuem)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media_quadrado = np.where(n > 0, soma ** 2 / n, 0.0)
+    n_total = n.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ss_entre = media_quadrado.sum(axis=0) - soma.sum(axis=0) ** 2 / n_total
+    ss_dentro = np.maximum(soma_quadrados - media_quadrado, 0.0).sum(axis=0)
+    return ss_entre, ss_dentro
+
+
+def _avaliar_fator(fator, Y, postos, empates, alvos, nome_fator, min_grupo, metodo_normalidade):
+    indice = fator if isinstance(fator, IndiceFator) else IndiceFator.criar(fator)
+    if indice.k < 2:
+        return []
+    ordem, inicios = indice.ordem, indice.inicios
+    grupo = np.repeat(np.arange(indice.k), indice.tamanhos)
+    Ys = Y[ordem]
+
+    # ANOVA de um fator de todas as respostas
+    n, soma, soma_quadrados, deslocamento = _somas_por_grupo(Ys, inicios)
+    k = (n > 0).sum(axis=0)
+    n_total = n.sum(axis=0)
+    ss_entre, ss_dentro = _ss_por_coluna(n, soma, soma_quadrados)
+    gl_entre, gl_dentro = k - 1, n_total - k
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f = np.where(ss_dentro > 0, (ss_entre / gl_entre) / (ss_dentro / gl_dentro), np.inf)
+        medias = soma / n + deslocamento
+    pvalor = stats.f.sf(f, gl_entre, gl_dentro)
+
+    # Breusch-Pagan (Koenker) sobre os resíduos: R² de e² nas dummies do fator
+    residuos = Ys - medias[grupo]
+    n_e, soma_e, sq_e, _ = _somas_por_grupo(residuos * residuos, inicios)
+    ss_entre_e, ss_dentro_e = _ss_por_coluna(n_e, soma_e, sq_e)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(ss_entre_e + ss_dentro_e > 0, ss_entre_e / (ss_entre_e + ss_dentro_e), 0.0)
+    bp_pvalor = stats.chi2.sf(n_total * r2, gl_entre)
+
+    # Kruskal-Wallis: os postos compartilhados valem enquanto o fator não tiver ausentes
+    if len(ordem) == len(indice):
+        postos_s, empates_s = postos[ordem], empates
+    else:
+        postos_s, empates_s = _matriz_postos(postos[ordem])
+    n_r, soma_r, _, _ = _somas_por_grupo(postos_s, inicios, centralizar=False)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        h = (12.0 / (n_total * (n_total + 1)) * np.where(n_r > 0, soma_r ** 2 / n_r, 0.0).sum(axis=0)
+             - 3.0 * (n_total + 1))
+        correcao = 1.0 - empates_s / (n_total ** 3 - n_total)
+        h = np.where(correcao > 0, h / correcao, np.nan)
+    kruskal_pvalor = stats.chi2.sf(h, gl_entre)
+
+    linhas_resultado = []
+    for j, alvo in enumerate(alvos):
+        contagens = n[:, j][n[:, j] > 0]
+        if k[j] < 2 or n_total[j] <= k[j] or contagens.min() < min_grupo:
+            continue
+        normalidade = testar_normalidade(residuos[:, j][~np.isnan(residuos[:, j])], metodo_normalidade)
+        linhas_resultado.append({
+            'alvo': alvo,
+            'fator': nome_fator,
+            'grupos': int(k[j]),
+            'n': int(n_total[j]),
+            'f': float(f[j]),
+            'pvalor': float(pvalor[j]),
+            'eta_quadrado': float(eta_quadrado(ss_entre[j], ss_entre[j] + ss_dentro[j])),
+            'teste_normalidade': normalidade.metodo,
+            'normalidade_pvalor': normalidade.pvalor,
+            'breusch_pagan_pvalor': float(bp_pvalor[j]),
+            'kruskal_h': float(h[j]),
+            'kruskal_pvalor': float(kruskal_pvalor[j]),
+            'kruskal_epsilon_quadrado': float(epsilon_quadrado(h[j], n_total[j])),
+        })
+    return linhas_resultado
+
+
+def anova_multialvo(df, alvos, fatores, min_grupo=3, metodo_normalidade='auto', correcao='fdr_bh'):
+    """
+    ANOVA de um fator, pressupostos e Kruskal-Wallis de cada par (alvo, fator), com uma passada por fator.
+
+    Parâmetros:
+    - df: DataFrame com os dados
+    - alvos: lista de strings com os nomes das variáveis resposta (numéricas)
+    - fatores: lista de strings com os nomes das variáveis categóricas
+    - min_grupo: tamanho mínimo de cada grupo para o par ser avaliado
+    - metodo_normalidade: teste de normalidade dos resíduos (ver `testar_normalidade`)
+    - correcao: ajuste dos p-valores sobre todos os pares (ver `ajustar_pvalores`)
+
+    Retorna um DataFrame com uma linha por par avaliado, incluindo
+    `pvalor_ajustado` e `kruskal_pvalor_ajustado` (correção sobre a tabela toda),
+    os tamanhos de efeito η² e ε² e `atende_pressupostos`.
+    """
+    alvos, fatores = list(alvos), list(fatores)
+    Y = np.column_stack([pd.to_numeric(df[alvo], errors='coerce').to_numpy(dtype=np.float64) for alvo in alvos])
+    postos, empates = _matriz_postos(Y)
+
+    linhas = []
+    for fator in fatores:
+        linhas.extend(_avaliar_fator(df[fator], Y, postos, empates, alvos, fator, min_grupo, metodo_normalidade))
+
+    colunas = ['alvo', 'fator', 'grupos', 'n', 'f', 'pvalor', 'eta_quadrado', 'teste_normalidade',
+               'normalidade_pvalor', 'breusch_pagan_pvalor', 'kruskal_h', 'kruskal_pvalor', 'kruskal_epsilon_quadrado']
+    resultado = pd.DataFrame(linhas, columns=colunas)
+    resultado.insert(resultado.columns.get_loc('pvalor') + 1, 'pvalor_ajustado',
+                     ajustar_pvalores(resultado['pvalor'], correcao))
+    resultado['kruskal_pvalor_ajustado'] = ajustar_pvalores(resultado['kruskal_pvalor'], correcao)
+    resultado['atende_pressupostos'] = ((resultado['normalidade_pvalor'] >= 0.05)
+                                        & (resultado['breusch_pagan_pvalor'] >= 0.05))
+    return resultado
@@ -0,0 +1,427 @@
+# multifatorial.py - Tabelas ANOVA Tipo II e III sem matriz de delineamento por linha
+#
+# Para o modelo aditivo acumulado em blocos (streaming.py), X'X é formada apenas por
+# contagens (marginais e tabelas cruzadas entre pares de fatores) e X'y pelas
+# somas por grupo. X'X é fatorada uma só vez (Cholesky) e a soma de quadrados
+# Tipo II de cada termo sai dessa fatoração pela identidade de Wald:
+# SS_j = b_j' [V_jj]^-1 b_j, com V = (X'X)^-1, o mesmo teste que
+# `anova_lm(typ=2)` faz via `f_test`.
+#
+# Em `anova_multifatorial_esparsa`, com ou sem interações, nada é montado por
+# linha nem por combinação de níveis possível: só as caselas observadas
+# (códigos inteiros combinados) entram no cálculo. Na Tipo II, cada submodelo
+# hierárquico equivale a um modelo aditivo nas caselas dos seus termos
+# maximais; o fator com mais níveis é absorvido pelas médias por nível e só
+# os demais formam um sistema denso. A Tipo III (codificação de soma zero)
+# usa X'WX montada sobre as caselas, com pesos iguais às contagens. Caselas
+# vazias e unitárias são informadas em `tabela.attrs['caselas']`.
+
+import numpy as np
+import pandas as pd
+
+from anova.estatisticas import codificar_fator, combinar_codigos
+from anova.tardio import ModuloTardio
+
+linalg = ModuloTardio('scipy.linalg')
+sparse = ModuloTardio('scipy.sparse')
+stats = ModuloTardio('scipy.stats')
+
+
+def _cholesky(a):
+    """
+    Fator de Cholesky de uma matriz simétrica semidefinida positiva, ou None se ela for singular.
+
+    Um pivô menor que p · eps · max(diag) conta como zero: com caselas vazias
+    ou fatores confundidos a fatoração pode terminar só por arredondamento.
+    """
+    if not len(a):
+        return None
+    try:
+        fator = linalg.cho_factor(a, lower=True, check_finite=False)
+    except np.linalg.LinAlgError:
+        return None
+    tolerancia = len(a) * np.finfo(np.float64).eps * float(np.max(np.diag(a)))
+    if np.min(np.diag(fator[0])) ** 2 <= tolerancia:
+        return None
+    return fator
+
+
+def _resolver_normais(a, b):
+    """Solução de a x = b (a = X'X) e posto de a: Cholesky se a tiver posto completo, pseudo-inversa caso contrário."""
+    fator = _cholesky(a)
+    if fator is not None:
+        return linalg.cho_solve(fator, b, check_finite=False), len(a)
+    return np.linalg.pinv(a, hermitian=True) @ b, int(np.linalg.matrix_rank(a, hermitian=True))
+
+
+def _residuo_submodelo(xtx, xty, yty, colunas):
+    """SS residual e posto do submodelo formado pelas `colunas` de X, a partir de X'X."""
+    beta, posto = _resolver_normais(xtx[np.ix_(colunas, colunas)], xty[colunas])
+    return float(yty - beta @ xty[colunas]), posto
+
+
+def tabela_tipo2(xtx, xty, yty, n, blocos):
+    """
+    Monta a tabela ANOVA Tipo II do modelo aditivo no mesmo formato de `sm.stats.anova_lm(typ=2)`.
+
+    Parâmetros:
+    - xtx: matriz X'X (p x p), com o intercepto na coluna 0
+    - xty: vetor X'y (p)
+    - yty: y'y (pode ser centrado na média, pois o modelo tem intercepto)
+    - n: número de observações
+    - blocos: dict {nome do termo: índices das colunas de X do termo}
+
+    Com X'X de posto completo, uma única fatoração de Cholesky dá β e
+    V = (X'X)^-1, e a SS de cada termo é b_j' [V_jj]^-1 b_j (só V_jj, do
+    tamanho do termo, é resolvida de novo). Com posto incompleto (fatores
+    confundidos), o teste de Wald deixa de ser definido e cada SS vem da
+    diferença de SS residual entre submodelos, obtidos por fatias da mesma
+    X'X, com gl dados pela diferença de postos.
+    """
+    xtx = np.asarray(xtx, dtype=np.float64)
+    xty = np.asarray(xty, dtype=np.float64)
+    p = len(xty)
+    fator = _cholesky(xtx)
+    if fator is not None:
+        inversa = linalg.cho_solve(fator, np.eye(p), check_finite=False)
+        beta = inversa @ xty
+        posto = p
+    else:
+        beta, posto = _resolver_normais(xtx, xty)
+
+    ss_residual = max(float(yty - beta @ xty), 0.0)
+    gl_residual = n - posto
+    qm_residual = ss_residual / gl_residual
+
+    linhas = {}
+    for termo, colunas in blocos.items():
+        colunas = list(colunas)
+        if fator is not None:
+            b = beta[colunas]
+            ss = float(b @ np.linalg.solve(inversa[np.ix_(colunas, colunas)], b))
+            gl = len(colunas)
+        else:
+            sem_termo = [c for c in range(p) if c not in set(colunas)]
+            ss_sem, posto_sem = _residuo_submodelo(xtx, xty, yty, sem_termo)
+            ss = max(ss_sem - (yty - float(beta @ xty)), 0.0)
+            gl = posto - posto_sem
+        if gl > 0:
+            f = (ss / gl) / qm_residual
+            pvalor = float(stats.f.sf(f, gl, gl_residual))
+        else:
+            f, pvalor = np.nan, np.nan
+        linhas[termo] = (ss, float(gl), f, pvalor)
+    linhas['Residual'] = (ss_residual, float(gl_residual), np.nan, np.nan)
+
+    return pd.DataFrame.from_dict(linhas, orient='index', columns=['sum_sq', 'df', 'F', 'PR(>F)'])
+
+
+def equacoes_normais(contagens, cruzadas, somas_centradas, n):
+    """
+    Monta X'X e X'y do modelo aditivo com codificação de tratamento (primeiro nível como referência).
+
+    Parâmetros:
+    - contagens: lista com as contagens por nível de cada fator
+    - cruzadas: dict {(i, j): matriz de contagens conjuntas dos fatores i < j}
+    - somas_centradas: lista com Σ(y - ȳ) por nível de cada fator
+    - n: número de observações
+
+    Retorna (xtx, xty, blocos), em que blocos traz os índices das colunas de cada fator.
+    """
+    tamanhos = [len(c) - 1 for c in contagens]
+    inicios = np.concatenate([[1], 1 + np.cumsum(tamanhos)[:-1]]).astype(int)
+    p = 1 + sum(tamanhos)
+
+    xtx = np.zeros((p, p))
+    xty = np.zeros(p)
+    xtx[0, 0] = n
+    blocos = []
+    for i, (cont, soma) in enumerate(zip(contagens, somas_centradas)):
+        cols = np.arange(inicios[i], inicios[i] + tamanhos[i])
+        blocos.append(cols)
+        xtx[0, cols] = xtx[cols, 0] = cont[1:]
+        xtx[cols, cols] = cont[1:]
+        xty[cols] = soma[1:]
+    for (i, j), tabela in cruzadas.items():
+        bloco = np.asarray(tabela, dtype=np.float64)[1:, 1:]
+        xtx[np.ix_(blocos[i], blocos[j])] = bloco
+        xtx[np.ix_(blocos[j], blocos[i])] = bloco.T
+    return xtx, xty, blocos
+
+
+# ================================
+# TERMOS DO MODELO
+# ================================
+
+def nome_termo(termo):
+    """'Neighborhood' -> 'C(Neighborhood)'; ('a', 'b') -> 'C(a):C(b)'."""
+    if isinstance(termo, str):
+        termo = (termo,)
+    return ':'.join(f'C({f})' for f in termo)
+
+
+def ordenar_termos(fatores, interacoes=()):
+    """Termos do modelo como tuplas, na ordem do patsy: efeitos principais e depois interações por grau."""
+    termos = [(f,) for f in fatores]
+    for interacao in interacoes:
+        interacao = tuple(interacao)
+        faltando = [f for f in interacao if (f,) not in termos]
+        if faltando:
+            raise ValueError(f"A interação {nome_termo(interacao)} requer os efeitos principais de {faltando}.")
+        termos.append(interacao)
+    return sorted(termos, key=len)
+
+
+def anova_multifatorial_esparsa(df, var_target, fatores, interacoes=(), tipo=2):
+    """
+    ANOVA de `var_target ~ C(f1) + C(f2) + ... + C(a):C(b)` sem matriz de delineamento densa.
+
+    Parâmetros:
+    - df: DataFrame com os dados (linhas com valores ausentes são descartadas)
+    - var_target: string com o nome da variável resposta
+    - fatores: lista de strings com os nomes das variáveis categóricas
+    - interacoes: lista de tuplas de fatores, por exemplo [('Neighborhood', 'House_Style')]
+    - tipo: 2 ou 3 (soma de quadrados Tipo II ou Tipo III com codificação de soma zero)
+
+    Retorna uma tabela no formato de `sm.stats.anova_lm(modelo, typ=tipo)`,
+    calculada a partir das caselas observadas; `tabela.attrs['caselas']` traz
+    as caselas vazias e unitárias de cada interação.
+    """
+    if tipo not in (2, 3):
+        raise ValueError(f"Tipo de soma de quadrados deve ser 2 ou 3, não {tipo!r}.")
+    termos = ordenar_termos(fatores, interacoes)
+    colunas = list(dict.fromkeys([var_target] + [f for termo in termos for f in termo]))
+    dados = df[colunas].dropna()
+    y = pd.to_numeric(dados[var_target]).to_numpy(dtype=np.float64)
+
+    codigos = {}
+    for fator in colunas[1:]:
+        cod, niveis = codificar_fator(dados[fator])
+        codigos[fator] = (cod, len(niveis))
+    caselas = resumo_caselas(codigos, termos)
+    if tipo == 3:
+        vazias = {termo: r['vazias'] for termo, r in caselas.items() if r['vazias']}
+        if vazias:
+            raise ValueError(f"A ANOVA Tipo III requer todas as caselas das interações observadas "
+                             f"(caselas vazias: {vazias}); use a Tipo II.")
+        tabela = tabela_tipo3_caselas(codigos, y, termos)
+    else:
+        tabela = tabela_tipo2_caselas(codigos, y - y.mean(), termos)
+    tabela.attrs['caselas'] = caselas
+    return tabela
+
+# ================================
+# SOMAS DE QUADRADOS A PARTIR DAS CASELAS OBSERVADAS
+# ================================
+
+# Acima deste número de colunas com soma zero, a Tipo III (que inverte X'WX) é recusada
+MAX_COLUNAS_TIPO3 = 5000
+
+
+def _tabela_cruzada(codigos_a, k_a, codigos_b, k_b):
+    """Contagens conjuntas (k_a x k_b) de dois fatores codificados."""
+    return np.bincount(codigos_a * k_b + codigos_b, minlength=k_a * k_b).reshape(k_a, k_b).astype(np.float64)
+
+
+def _residuo_aditivo(fatores, y):
+    """
+    SS residual e posto do modelo aditivo y ~ F1 + F2 + ... (com intercepto; `y` centrado).
+
+    Parâmetros:
+    - fatores: lista de (códigos 0..k-1, k), todos os níveis observados
+    - y: resposta centrada na média
+
+    O fator com mais níveis é absorvido (a resposta e as dummies dos demais
+    são centradas nas médias dos seus níveis); só as dummies de tratamento dos
+    outros fatores formam o sistema denso: M = X_R'X_R - C D⁻¹ C', em que C
+    são as contagens cruzadas com o fator absorvido e D as suas contagens.
+    """
+    yty = float(y @ y)
+    if not fatores:
+        return yty, 1
+    fatores = sorted(fatores, key=lambda fator: -fator[1])
+    codigos_g, k_g = fatores[0]
+    n_g = np.bincount(codigos_g, minlength=k_g).astype(np.float64)
+    soma_g = np.bincount(codigos_g, weights=y, minlength=k_g)
+    ss_absorvido = yty - float((soma_g ** 2 / n_g).sum())
+    resto = fatores[1:]
+    if not resto:
+        return max(ss_absorvido, 0.0), k_g
+
+    larguras = [k - 1 for _, k in resto]
+    inicios = np.concatenate([[0], np.cumsum(larguras)]).astype(int)
+    p = int(inicios[-1])
+    a = np.zeros((p, p))
+    cruzada_g = np.zeros((p, k_g))
+    xty = np.zeros(p)
+    for i, (codigos, k) in enumerate(resto):
+        bloco = slice(inicios[i], inicios[i + 1])
+        a[bloco, bloco] = np.diag(np.bincount(codigos, minlength=k)[1:].astype(np.float64))
+        xty[bloco] = np.bincount(codigos, weights=y, minlength=k)[1:]
+        cruzada_g[bloco] = _tabela_cruzada(codigos, k, codigos_g, k_g)[1:]
+        for j in range(i):
+            codigos_j, k_j = resto[j]
+            tabela = _tabela_cruzada(codigos, k, codigos_j, k_j)[1:, 1:]
+            a[bloco, inicios[j]:inicios[j + 1]] = tabela
+            a[inicios[j]:inicios[j + 1], bloco] = tabela.T
+    m = a - (cruzada_g / n_g) @ cruzada_g.T
+    r = xty - cruzada_g @ (soma_g / n_g)
+    beta, posto = _resolver_normais(m, r)
+    return max(ss_absorvido - float(beta @ r), 0.0), k_g + posto
+
+
+def _maximais(termos):
+    """Termos que não estão contidos em nenhum outro termo do conjunto."""
+    return [t for t in termos if not any(set(t) < set(s) for s in termos)]
+
+
+def resumo_caselas(codigos, termos):
+    """
+    Caselas possíveis, observadas, vazias e unitárias (uma observação) de cada interação.
+
+    Parâmetros:
+    - codigos: dict {fator: (códigos, k)}
+    - termos: termos do modelo como tuplas (ver `ordenar_termos`)
+    """
+    resumo = {}
+    for termo in termos:
+        if len(termo) < 2:
+            continue
+        celulas, observadas = combinar_codigos([codigos[f][0] for f in termo], [codigos[f][1] for f in termo])
+        possiveis = int(np.prod([codigos[f][1] for f in termo], dtype=np.float64))
+        resumo[nome_termo(termo)] = {
+            'possiveis': possiveis,
+            'observadas': observadas,
+            'vazias': possiveis - observadas,
+            'unitarias': int((np.bincount(celulas, minlength=observadas) == 1).sum()),
+        }
+    return resumo
+
+
+def tabela_tipo2_caselas(codigos, y, termos):
+    """
+    Tabela ANOVA Tipo II de um modelo hierárquico com interações, a partir das caselas observadas.
+
+    Parâmetros:
+    - codigos: dict {fator: (códigos 0..k-1, k)}
+    - y: resposta centrada na média
+    - termos: termos do modelo como tuplas (ver `ordenar_termos`)
+
+    A SS de cada termo é SS_res(sem o termo e os que o contêm) - SS_res(com o
+    termo), e os graus de liberdade são a diferença de postos, de modo que
+    caselas vazias reduzem os gl da interação em vez de criar colunas nulas.
+    """
+    # Efeitos principais já vêm codificados 0..k-1; só as interações são combinadas
+    celulas = {(fator,): codigos[fator] for fator in codigos}
+
+    def residuo(conjunto):
+        fatores = []
+        for termo in _maximais(conjunto):
+            if termo not in celulas:
+                celulas[termo] = combinar_codigos([codigos[f][0] for f in termo], [codigos[f][1] for f in termo])
+            fatores.append(celulas[termo])
+        return _residuo_aditivo(fatores, y)
+
+    linhas = {}
+    ss_residual, posto = residuo(termos)
+    for termo in termos:
+        sem_termo = [t for t in termos if not set(termo) <= set(t)]
+        ss_sem, posto_sem = residuo(sem_termo)
+        ss_com, posto_com = residuo(sem_termo + [termo])
+        linhas[nome_termo(termo)] = (max(ss_sem - ss_com, 0.0), float(posto_com - posto_sem))
+    return _montar_tabela(linhas, ss_residual, len(y) - posto)
+
+
+def _colunas_soma_zero(niveis, termo, k):
+    """
+    Linhas, colunas e valores das colunas de soma zero de um termo, para cada casela.
+
+    Na codificação de soma zero (`C(f, Sum)` do patsy), o último nível vale -1
+    em todas as colunas do fator; as colunas de uma interação são os produtos.
+    """
+    linhas = np.arange(len(niveis[termo[0]]))
+    colunas = np.zeros(len(linhas), dtype=np.int64)
+    valores = np.ones(len(linhas))
+    for fator in termo:
+        largura = k[fator] - 1
+        nivel = niveis[fator][linhas]
+        ultimo = nivel == largura
+        comuns = ~ultimo
+        # Último nível: -1 em todas as colunas do fator
+        n_ultimo = int(ultimo.sum())
+        linhas = np.concatenate([linhas[comuns], np.repeat(linhas[ultimo], largura)])
+        colunas = np.concatenate([colunas[comuns] * largura + nivel[comuns],
+                                  np.repeat(colunas[ultimo] * largura, largura) + np.tile(np.arange(largura), n_ultimo)])
+        valores = np.concatenate([valores[comuns], -np.repeat(valores[ultimo], largura)])
+    return linhas, colunas, valores
+
+
+def tabela_tipo3_caselas(codigos, y, termos):
+    """
+    Tabela ANOVA Tipo III (codificação de soma zero, com a linha Intercept) a partir das caselas observadas.
+
+    Parâmetros:
+    - codigos: dict {fator: (códigos 0..k-1, k)}
+    - y: resposta (não centrada: o intercepto também é testado)
+    - termos: termos do modelo como tuplas (ver `ordenar_termos`)
+
+    X'WX e X'Wȳ são somados sobre as caselas de todos os fatores do modelo,
+    com peso igual à contagem de cada casela. Equivale a `anova_lm(typ=3)` com
+    `C(f, Sum)`. Com caselas vazias em alguma interação as hipóteses Tipo III
+    não são únicas, e a tabela é recusada (ValueError).
+    """
+    fatores = list(dict.fromkeys(f for termo in termos for f in termo))
+    k = {f: codigos[f][1] for f in fatores}
+    larguras = [int(np.prod([k[f] - 1 for f in termo])) for termo in termos]
+    p = 1 + sum(larguras)
+    if p > MAX_COLUNAS_TIPO3:
+        raise ValueError(f"A ANOVA Tipo III teria {p} colunas (limite {MAX_COLUNAS_TIPO3}); use a Tipo II.")
+
+    celulas, m = combinar_codigos([codigos[f][0] for f in fatores], [k[f] for f in fatores])
+    n_c = np.bincount(celulas, minlength=m).astype(np.float64)
+    soma_c = np.bincount(celulas, weights=y, minlength=m)
+    media_c = soma_c / n_c
+    ss_dentro = float(np.bincount(celulas, weights=(y - media_c[celulas]) ** 2, minlength=m).sum())
+    primeira = np.empty(m, dtype=np.int64)
+    primeira[celulas[::-1]] = np.arange(len(y))[::-1]
+    niveis = {f: codigos[f][0][primeira] for f in fatores}
+
+    linhas, colunas, valores = [np.arange(m)], [np.zeros(m, dtype=np.int64)], [np.ones(m)]
+    blocos = {'Intercept': np.array([0])}
+    inicio = 1
+    for termo, largura in zip(termos, larguras):
+        li, co, va = _colunas_soma_zero(niveis, termo, k)
+        linhas.append(li)
+        colunas.append(inicio + co)
+        valores.append(va)
+        blocos[nome_termo(termo)] = np.arange(inicio, inicio + largura)
+        inicio += largura
+    x = sparse.csr_matrix((np.concatenate(valores), (np.concatenate(linhas), np.concatenate(colunas))), shape=(m, p))
+    xtwx = (x.T @ sparse.diags(n_c) @ x).toarray()
+    inversa = np.linalg.pinv(xtwx, hermitian=True)
+    beta = inversa @ (x.T @ soma_c)
+    ajuste = x @ beta
+    ss_residual = ss_dentro + float((n_c * (media_c - ajuste) ** 2).sum())
+    posto = int(np.linalg.matrix_rank(xtwx, hermitian=True))
+
+    resultado = {}
+    for termo, colunas_termo in blocos.items():
+        v = inversa[np.ix_(colunas_termo, colunas_termo)]
+        b = beta[colunas_termo]
+        resultado[termo] = (float(b @ np.linalg.pinv(v, hermitian=True) @ b),
+                            float(np.linalg.matrix_rank(v, hermitian=True)))
+    return _montar_tabela(resultado, ss_residual, len(y) - posto)
+
+
+def _montar_tabela(linhas, ss_residual, gl_residual):
+    """Tabela no formato de `anova_lm` a partir de {termo: (SS, gl)} e do resíduo."""
+    qm_residual = ss_residual / gl_residual
+    tabela = {}
+    for termo, (ss, gl) in linhas.items():
+        if gl > 0:
+            f = (ss / gl) / qm_residual
+            tabela[termo] = (ss, gl, f, float(stats.f.sf(f, gl, gl_residual)))
+        else:
+            tabela[termo] = (ss, gl, np.nan, np.nan)
+    tabela['Residual'] = (ss_residual, float(gl_residual), np.nan, np.nan)
+    return pd.DataFrame.from_dict(tabela, orient='index', columns=['sum_sq', 'df', 'F', 'PR(>F)'])
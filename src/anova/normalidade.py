@@ -0,0 +1,223 @@
+# normalidade.py - Testes de normalidade dos resíduos para amostras grandes
+#
+# O Shapiro-Wilk da SciPy só é exato até 5000 observações, fica lento e, com
+# milhões de resíduos, rejeita qualquer desvio mínimo. Aqui os testes de
+# D'Agostino K² e de Jarque-Bera são calculados a partir dos quatro primeiros
+# momentos centrais, que podem ser acumulados bloco a bloco (fórmulas de
+# Pébay) em O(n). O Anderson-Darling precisa dos resíduos ordenados
+# (O(n log n)) e o Shapiro-Wilk pode ser aplicado a uma subamostra
+# reprodutível. Com metodo='auto' o teste é escolhido pelo tamanho da amostra.
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from anova.tardio import ModuloTardio
+
+special = ModuloTardio('scipy.special')
+stats = ModuloTardio('scipy.stats')
+
+# Até este tamanho o modo 'auto' usa o Shapiro-Wilk com todos os resíduos
+LIMITE_SHAPIRO = 5000
+
+METODOS_NORMALIDADE = {
+    'auto': 'Automático (pelo tamanho da amostra)',
+    'shapiro': 'Shapiro-Wilk',
+    'shapiro_subamostra': 'Shapiro-Wilk (subamostra)',
+    'dagostino': "D'Agostino K²",
+    'jarque_bera': 'Jarque-Bera',
+    'anderson_darling': 'Anderson-Darling',
+}
+
+
+# ================================
+# MOMENTOS
+# ================================
+
+@dataclass
+class Momentos:
+    """Número de observações, média e somas dos desvios à média elevados a 2, 3 e 4."""
+    n: int = 0
+    media: float = 0.0
+    m2: float = 0.0
+    m3: float = 0.0
+    m4: float = 0.0
+
+    @classmethod
+    def da_amostra(cls, x):
+        x = np.asarray(x, dtype=np.float64)
+        if len(x) == 0:
+            return cls()
+        media = float(x.mean())
+        d = x - media
+        d2 = d * d
+        return cls(len(x), media, float(d2.sum()), float((d2 * d).sum()), float((d2 * d2).sum()))
+
+    def combinar(self, outro):
+        """Momentos da união das duas amostras (fórmulas de Pébay)."""
+        if outro.n == 0:
+            return Momentos(self.n, self.media, self.m2, self.m3, self.m4)
+        if self.n == 0:
+            return Momentos(outro.n, outro.media, outro.m2, outro.m3, outro.m4)
+        na, nb = self.n, outro.n
+        n = na + nb
+        delta = outro.media - self.media
+        m2 = self.m2 + outro.m2 + delta ** 2 * na * nb / n
+        m3 = (self.m3 + outro.m3 + delta ** 3 * na * nb * (na - nb) / n ** 2
+              + 3 * delta * (na * outro.m2 - nb * self.m2) / n)
+        m4 = (self.m4 + outro.m4 + delta ** 4 * na * nb * (na * na - na * nb + nb * nb) / n ** 3
+              + 6 * delta ** 2 * (na * na * outro.m2 + nb * nb * self.m2) / n ** 2
+              + 4 * delta * (na * outro.m3 - nb * self.m3) / n)
+        return Momentos(n, self.media + delta * nb / n, m2, m3, m4)
+
+    def atualizar(self, x):
+        """Incorpora um bloco de observações."""
+        combinado = self.combinar(Momentos.da_amostra(x))
+        self.n, self.media, self.m2, self.m3, self.m4 = (
+            combinado.n, combinado.media, combinado.m2, combinado.m3, combinado.m4)
+        return self
+
+    @property
+    def assimetria(self):
+        """Coeficiente de assimetria amostral g1 (viesado, como `stats.skew`)."""
+        return np.sqrt(self.n) * self.m3 / self.m2 ** 1.5
+
+    @property
+    def curtose(self):
+        """Curtose amostral b2 (não excessiva, como `stats.kurtosis(fisher=False)`)."""
+        return self.n * self.m4 / self.m2 ** 2
+
+
+# ================================
+# TESTES
+# ================================
+
+@dataclass
+class ResultadoNormalidade:
+    metodo: str
+    estatistica: float
+    pvalor: float
+    n: int
+
+    @property
+    def nome(self):
+        return METODOS_NORMALIDADE[self.metodo]
+
+
+def _z_assimetria(n, g1):
+    # Mesma transformação de `stats.skewtest`
+    y = g1 * np.sqrt((n + 1) * (n + 3) / (6.0 * (n - 2)))
+    beta2 = 3.0 * (n * n + 27 * n - 70) * (n + 1) * (n + 3) / ((n - 2.0) * (n + 5) * (n + 7) * (n + 9))
+    w2 = -1 + np.sqrt(2 * (beta2 - 1))
+    delta = 1 / np.sqrt(0.5 * np.log(w2))
+    alpha = np.sqrt(2.0 / (w2 - 1))
+    y = y if y != 0 else 1.0
+    return delta * np.log(y / alpha + np.sqrt((y / alpha) ** 2 + 1))
+
+
+def _z_curtose(n, b2):
+    # Mesma transformação de `stats.kurtosistest`
+    esperado = 3.0 * (n - 1) / (n + 1)
+    var_b2 = 24.0 * n * (n - 2) * (n - 3) / ((n + 1) ** 2 * (n + 3) * (n + 5))
+    x = (b2 - esperado) / np.sqrt(var_b2)
+    raiz_beta1 = (6.0 * (n * n - 5 * n + 2) / ((n + 7) * (n + 9))
+                  * np.sqrt(6.0 * (n + 3) * (n + 5) / (n * (n - 2) * (n - 3))))
+    a = 6.0 + 8.0 / raiz_beta1 * (2.0 / raiz_beta1 + np.sqrt(1 + 4.0 / raiz_beta1 ** 2))
+    termo1 = 1 - 2 / (9.0 * a)
+    denominador = 1 + x * np.sqrt(2 / (a - 4.0))
+    if denominador == 0:
+        return np.nan
+    termo2 = np.sign(denominador) * np.cbrt((1 - 2.0 / a) / abs(denominador))
+    return (termo1 - termo2) / np.sqrt(2 / (9.0 * a))
+
+
+def dagostino_k2(momentos):
+    """Teste omnibus de D'Agostino-Pearson (equivale a `stats.normaltest`); requer n >= 8."""
+    n = momentos.n
+    if n < 8:
+        raise ValueError(f"O teste de D'Agostino K² requer ao menos 8 observações (n = {n}).")
+    k2 = _z_assimetria(n, momentos.assimetria) ** 2 + _z_curtose(n, momentos.curtose) ** 2
+    return ResultadoNormalidade('dagostino', float(k2), float(stats.chi2.sf(k2, 2)), n)
+
+
+def jarque_bera(momentos):
+    """Teste de Jarque-Bera (equivale a `stats.jarque_bera`)."""
+    n = momentos.n
+    if n < 2:
+        raise ValueError(f"O teste de Jarque-Bera requer ao menos 2 observações (n = {n}).")
+    jb = n / 6.0 * (momentos.assimetria ** 2 + (momentos.curtose - 3) ** 2 / 4)
+    return ResultadoNormalidade('jarque_bera', float(jb), float(stats.chi2.sf(jb, 2)), n)
+
+
+def anderson_darling(x):
+    """
+    Anderson-Darling com média e variância estimadas (caso 3 de Stephens).
+
+    O p-valor usa a aproximação de D'Agostino e Stephens (1986) para a
+    estatística modificada A² (1 + 0,75/n + 2,25/n²), como `normal_ad` do statsmodels.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    if n < 8:
+        raise ValueError(f"O teste de Anderson-Darling requer ao menos 8 observações (n = {n}).")
+    z = np.sort((x - x.mean()) / x.std(ddof=1))
+    pesos = (2 * np.arange(1, n + 1) - 1) / n
+    a2 = -n - float(np.sum(pesos * (special.log_ndtr(z) + special.log_ndtr(-z[::-1]))))
+    a = a2 * (1 + 0.75 / n + 2.25 / n ** 2)
+    if a >= 0.6:
+        # O polinômio volta a crescer depois do vértice (A ≈ 153,5), onde p já é ~1e-189
+        a = min(a, 5.709 / (2 * 0.0186))
+        pvalor = np.exp(1.2937 - 5.709 * a + 0.0186 * a ** 2)
+    elif a >= 0.34:
+        pvalor = np.exp(0.9177 - 4.279 * a - 1.38 * a ** 2)
+    elif a >= 0.2:
+        pvalor = 1 - np.exp(-8.318 + 42.796 * a - 59.938 * a ** 2)
+    else:
+        pvalor = 1 - np.exp(-13.436 + 101.14 * a - 223.73 * a ** 2)
+    return ResultadoNormalidade('anderson_darling', a2, float(min(max(pvalor, 0.0), 1.0)), n)
+
+
+def shapiro_subamostra(x, tamanho=LIMITE_SHAPIRO, semente=0):
+    """Shapiro-Wilk de uma subamostra aleatória (reprodutível pela `semente`) de no máximo `tamanho` valores."""
+    x = np.asarray(x, dtype=np.float64)
+    if len(x) > tamanho:
+        x = np.random.default_rng(semente).choice(x, size=tamanho, replace=False)
+    resultado = stats.shapiro(x)
+    return ResultadoNormalidade('shapiro_subamostra', float(resultado.statistic), float(resultado.pvalue), len(x))
+
+
+def escolher_metodo(n):
+    """Shapiro-Wilk completo até LIMITE_SHAPIRO observações; acima disso, D'Agostino K²."""
+    return 'shapiro' if n <= LIMITE_SHAPIRO else 'dagostino'
+
+
+def testar_normalidade(residuos, metodo='auto', semente=0, tamanho_shapiro=LIMITE_SHAPIRO):
+    """
+    Testa a normalidade dos resíduos com o método escolhido.
+
+    Parâmetros:
+    - residuos: vetor de resíduos (ou um objeto Momentos para 'dagostino' e 'jarque_bera')
+    - metodo: uma das chaves de METODOS_NORMALIDADE
+    - semente, tamanho_shapiro: controlam a subamostra de 'shapiro_subamostra'
+    """
+    if metodo not in METODOS_NORMALIDADE:
+        raise ValueError(f"Método de normalidade desconhecido: {metodo!r}.")
+    if isinstance(residuos, Momentos):
+        if metodo == 'dagostino':
+            return dagostino_k2(residuos)
+        if metodo == 'jarque_bera':
+            return jarque_bera(residuos)
+        raise ValueError(f"O método {metodo!r} precisa dos resíduos, não apenas dos momentos.")
+
+    residuos = np.asarray(residuos, dtype=np.float64)
+    if metodo == 'auto':
+        metodo = escolher_metodo(len(residuos))
+    if metodo == 'shapiro':
+        resultado = stats.shapiro(residuos)
+        return ResultadoNormalidade('shapiro', float(resultado.statistic), float(resultado.pvalue), len(residuos))
+    if metodo == 'shapiro_subamostra':
+        return shapiro_subamostra(residuos, tamanho_shapiro, semente)
+    if metodo == 'anderson_darling':
+        return anderson_darling(residuos)
+    momentos = Momentos.da_amostra(residuos)
+    return dagostino_k2(momentos) if metodo == 'dagostino' else jarque_bera(momentos)
@@ -0,0 +1,147 @@
+# perfil.py - Instrumentação das etapas do pipeline (tempo, CPU, memória, linhas)
+#
+# Cada etapa é medida por um gerenciador de contexto ou decorador:
+#
+#     perfil = Perfilador()
+#     with perfil.etapa('avaliar_variavel', fator='Neighborhood', linhas=len(df)):
+#         ...
+#
+# A instrumentação é ativada pela variável de ambiente ANOVA_PERFIL=1; desativada,
+# `etapa` não mede nada. Cada registro vai para o logger 'anova.perfil' como uma
+# linha JSON e, se ANOVA_PERFIL_ARQUIVO estiver definida, é acrescentado a esse
+# arquivo (JSON Lines). O tracemalloc deixa o código medido bem mais lento;
+# ANOVA_PERFIL_MEMORIA=0 mede só tempos.
+
+import functools
+import json
+import logging
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+VARIAVEL_ATIVACAO = 'ANOVA_PERFIL'
+VARIAVEL_ARQUIVO = 'ANOVA_PERFIL_ARQUIVO'
+VARIAVEL_MEMORIA = 'ANOVA_PERFIL_MEMORIA'
+
+logger = logging.getLogger('anova.perfil')
+
+
+def _variavel_verdadeira(nome, padrao=''):
+    return os.environ.get(nome, padrao).strip().lower() in ('1', 'true', 'sim', 'yes', 'on')
+
+
+def perfil_ativo():
+    """Indica se ANOVA_PERFIL pede a instrumentação ('1', 'true', 'sim', ...)."""
+    return _variavel_verdadeira(VARIAVEL_ATIVACAO)
+
+
+class Perfilador:
+    """
+    Registra tempo de parede, tempo de CPU, pico de memória e número de linhas de cada etapa.
+
+    Parâmetros:
+    - ativo: liga a medição; None segue a variável de ambiente ANOVA_PERFIL
+    - arquivo: arquivo JSON Lines que recebe os registros; None segue ANOVA_PERFIL_ARQUIVO
+    - medir_memoria: mede o pico de memória com tracemalloc; None segue ANOVA_PERFIL_MEMORIA (padrão: sim)
+
+    O pico de memória vem do tracemalloc (alocações do Python e do NumPy) e é
+    relativo à memória em uso no início da etapa. Etapas aninhadas são
+    permitidas: o pico de uma etapa inclui o das etapas internas.
+    """
+
+    def __init__(self, ativo=None, arquivo=None, medir_memoria=None):
+        self.ativo = perfil_ativo() if ativo is None else ativo
+        self.arquivo = os.environ.get(VARIAVEL_ARQUIVO) if arquivo is None else arquivo
+        self.medir_memoria = _variavel_verdadeira(VARIAVEL_MEMORIA, '1') if medir_memoria is None else medir_memoria
+        self.registros = []
+        self._pilha = []
+        self._iniciou_tracemalloc = False
+
+    @contextmanager
+    def etapa(self, nome, fator=None, linhas=None):
+        if not self.ativo:
+            yield
+            return
+
+        if self.medir_memoria:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._iniciou_tracemalloc = True
+            if self._pilha:
+                # Preserva o pico da etapa externa antes de zerá-lo para a interna
+                self._pilha[-1]['pico'] = max(self._pilha[-1]['pico'], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            atual, _ = tracemalloc.get_traced_memory()
+        else:
+            atual = 0
+        quadro = {'memoria_inicial': atual, 'pico': atual}
+        self._pilha.append(quadro)
+
+        inicio_parede = time.perf_counter()
+        inicio_cpu = time.process_time()
+        erro = None
+        try:
+            yield
+        except BaseException as e:
+            erro = type(e).__name__
+            raise
+        finally:
+            parede = time.perf_counter() - inicio_parede
+            cpu = time.process_time() - inicio_cpu
+            pico = max(quadro['pico'], tracemalloc.get_traced_memory()[1]) if self.medir_memoria else 0
+            self._pilha.pop()
+            if self._pilha:
+                self._pilha[-1]['pico'] = max(self._pilha[-1]['pico'], pico)
+            elif self._iniciou_tracemalloc:
+                tracemalloc.stop()
+                self._iniciou_tracemalloc = False
+
+            registro = {
+                'etapa': nome,
+                'fator': fator,
+                'linhas': None if linhas is None else int(linhas),
+                'tempo_s': parede,
+                'cpu_s': cpu,
+                'memoria_pico_mb': (pico - quadro['memoria_inicial']) / 1e6 if self.medir_memoria else None,
+                'nivel': len(self._pilha),
+                'erro': erro,
+            }
+            self._registrar(registro)
+
+    def _registrar(self, registro):
+        self.registros.append(registro)
+        linha = json.dumps(registro, ensure_ascii=False)
+        logger.info(linha)
+        if self.arquivo:
+            try:
+                with open(self.arquivo, 'a', encoding='utf-8') as f:
+                    f.write(linha + '\n')
+            except OSError:
+                logger.warning("Não foi possível gravar o perfil em %s", self.arquivo)
+
+    def medir(self, nome=None, fator=None):
+        """
+        Decorador equivalente a `etapa`. O número de linhas é o `len` do
+        primeiro argumento que for um DataFrame.
+        """
+        def decorador(func):
+            nome_etapa = nome or func.__name__
+
+            @functools.wraps(func)
+            def envoltorio(*args, **kwargs):
+                linhas = next((len(a) for a in list(args) + list(kwargs.values()) if isinstance(a, pd.DataFrame)), None)
+                with self.etapa(nome_etapa, fator=fator, linhas=linhas):
+                    return func(*args, **kwargs)
+            return envoltorio
+        return decorador
+
+    def tabela(self):
+        """Registros como DataFrame, na ordem em que as etapas terminaram."""
+        return pd.DataFrame(self.registros, columns=['etapa', 'fator', 'linhas', 'tempo_s', 'cpu_s',
+                                                     'memoria_pico_mb', 'nivel', 'erro'])
+
+    def para_json(self):
+        return json.dumps(self.registros, ensure_ascii=False, indent=2)
@@ -0,0 +1,254 @@
+# posthoc.py - Testes post-hoc vetorizados a partir das estatísticas por grupo
+#
+# Todas as comparações par a par são calculadas de uma vez sobre os vetores de
+# média, variância e contagem dos grupos (índices np.triu_indices), sem laço
+# em Python por par.
+
+import numpy as np
+import pandas as pd
+
+from anova.efeito import hedges_g
+from anova.estatisticas import codificar_fator, momentos_grupos
+from anova.tardio import ModuloTardio
+
+special = ModuloTardio('scipy.special')
+stats = ModuloTardio('scipy.stats')
+
+# ================================
+# DISTRIBUIÇÃO DA AMPLITUDE STUDENTIZADA
+# ================================
+#
+# P(Q > q; k, v) = ∫ f_s(s; v) [1 - W(q s; k)] ds, em que s = sqrt(χ²_v / v) e
+# W(w; k) = k ∫ φ(z) [Φ(z) - Φ(z - w)]^(k-1) dz é a CDF da amplitude de k normais.
+# W depende só de k, então é tabelada uma vez numa grade fina de w e interpolada;
+# a integral em s usa nós de Gauss-Legendre (em log s) ajustados ao v de cada par.
+# `scipy.stats.studentized_range.sf` faz uma integração adaptativa por
+# elemento (~10 ms), o que inviabiliza dezenas de milhares de pares.
+
+_NOS_Z, _PESOS_Z = np.polynomial.legendre.leggauss(256)
+_NOS_S, _PESOS_S = np.polynomial.legendre.leggauss(256)
+_PASSO_W = 0.002
+_CAUDA_S = 1e-12
+_PARES_POR_LOTE = 4_000
+
+
+def _cdf_amplitude(k, w_max):
+    """Tabela W(w; k) em uma grade regular de [0, w_max]."""
+    z = 10.0 * _NOS_Z  # nós em [-10, 10]
+    pesos = 10.0 * _PESOS_Z * stats.norm.pdf(z)
+    grade = np.arange(0.0, w_max + _PASSO_W, _PASSO_W)
+    phi_z = special.ndtr(z)
+    cdf = np.empty_like(grade)
+    for inicio in range(0, len(grade), 2000):
+        w = grade[inicio:inicio + 2000, None]
+        dentro = np.clip(phi_z - special.ndtr(z - w), 0.0, 1.0)
+        cdf[inicio:inicio + 2000] = k * (dentro ** (k - 1)) @ pesos
+    return grade, np.clip(cdf, 0.0, 1.0)
+
+
+def sf_amplitude_studentizada(q, k, gl):
+    """
+    Função de sobrevivência da amplitude studentizada, vetorizada em `q` e `gl`.
+
+    Equivale a `scipy.stats.studentized_range.sf(q, k, gl)` com erro absoluto
+    da ordem de 1e-7, suficiente para p-valores de comparações múltiplas.
+    """
+    q, gl = np.broadcast_arrays(np.asarray(q, dtype=np.float64), np.asarray(gl, dtype=np.float64))
+    forma = q.shape
+    q, gl = q.ravel(), gl.ravel()
+    resultado = np.full(q.shape, np.nan)
+    validos = np.isfinite(q) & (gl > 0)
+    if not validos.any():
+        return resultado.reshape(forma)
+
+    # Para v muito grande a densidade de s é praticamente normal em torno de 1
+    gl_finito = np.minimum(gl, 1e12)
+    v_validos = gl_finito[validos]
+    z_cauda = stats.norm.isf(_CAUDA_S)
+    grande = v_validos > 1e6
+    v_pequeno = np.where(grande, 1.0, v_validos)
+    s_min = np.where(grande, 1.0 - z_cauda / np.sqrt(2.0 * v_validos),
+                     np.sqrt(stats.chi2.ppf(_CAUDA_S, v_pequeno) / v_pequeno))
+    s_max = np.where(grande, 1.0 + z_cauda / np.sqrt(2.0 * v_validos),
+                     np.sqrt(stats.chi2.isf(_CAUDA_S, v_pequeno) / v_pequeno))
+    # Acima de w_lim, 1 - W(w) < 1e-16 (limite de Bonferroni sobre os k(k-1)/2 pares)
+    w_lim = np.sqrt(2.0) * stats.norm.isf(1e-16 / (k * (k - 1)))
+    grade, cdf = _cdf_amplitude(k, min(float(np.abs(q[validos]).max() * s_max.max()), w_lim))
+
+    indices = np.flatnonzero(validos)
+    for inicio in range(0, len(indices), _PARES_POR_LOTE):
+        lote = slice(inicio, inicio + _PARES_POR_LOTE)
+        idx = indices[lote]
+        v = gl_finito[idx, None]
+        # Integração em x = log(s): a densidade de s = sqrt(χ²_v / v) vira
+        # exp(v x - v e^(2x) / 2), suave mesmo para v pequeno (a menos de constantes,
+        # pois os pesos são normalizados)
+        x_min, x_max = np.log(s_min[lote])[:, None], np.log(s_max[lote])[:, None]
+        meia = (x_max - x_min) / 2.0
+        x = (x_min + x_max) / 2.0 + meia * _NOS_S
+        log_f = v * (x - np.expm1(2.0 * x) / 2.0)
+        pesos = meia * _PESOS_S * np.exp(log_f - log_f.max(axis=1, keepdims=True))
+        s = np.exp(x)
+        cauda = 1.0 - np.interp(np.abs(q[idx, None]) * s, grade, cdf, right=1.0)
+        resultado[idx] = (pesos * cauda).sum(axis=1) / pesos.sum(axis=1)
+    return np.clip(resultado, 0.0, 1.0).reshape(forma)
+
+
+# ================================
+# CORREÇÃO PARA COMPARAÇÕES MÚLTIPLAS
+# ================================
+
+CORRECOES = ('holm', 'bonferroni', 'fdr_bh', 'nenhuma')
+
+
+def ajustar_pvalores(pvalores, metodo='holm'):
+    """
+    p-valores ajustados para comparações múltiplas (mesmos resultados de `multipletests`).
+
+    Parâmetros:
+    - pvalores: p-valores brutos (NaN é preservado e não conta como teste)
+    - metodo: 'holm', 'bonferroni', 'fdr_bh' (Benjamini-Hochberg) ou 'nenhuma'
+    """
+    if metodo not in CORRECOES:
+        raise ValueError(f"Correção desconhecida: {metodo!r}. Disponíveis: {list(CORRECOES)}.")
+    p = np.asarray(pvalores, dtype=np.float64)
+    ajustados = np.full(p.shape, np.nan)
+    validos = ~np.isnan(p)
+    q = p[validos]
+    m = len(q)
+    if metodo == 'nenhuma' or m == 0:
+        ajustados[validos] = q
+        return ajustados
+    if metodo == 'bonferroni':
+        ajustados[validos] = np.minimum(q * m, 1.0)
+        return ajustados
+
+    ordem = np.argsort(q, kind='stable')
+    ordenados = q[ordem]
+    if metodo == 'holm':
+        corrigidos = np.maximum.accumulate(ordenados * (m - np.arange(m)))
+    else:
+        corrigidos = np.minimum.accumulate((ordenados * m / np.arange(1, m + 1))[::-1])[::-1]
+    resultado = np.empty(m)
+    resultado[ordem] = np.minimum(corrigidos, 1.0)
+    ajustados[validos] = resultado
+    return ajustados
+
+
+# ================================
+# GAMES-HOWELL
+# ================================
+
+def games_howell_estatisticas(niveis, n, medias, variancias):
+    """
+    Games-Howell para todos os pares a partir de contagem, média e variância (ddof=1) de cada grupo.
+
+    Retorna um DataFrame com as colunas do `pingouin.pairwise_gameshowell`:
+    A, B, mean(A), mean(B), diff, se, T, df, pval e hedges.
+    """
+    n = np.asarray(n, dtype=np.float64)
+    medias = np.asarray(medias, dtype=np.float64)
+    variancias = np.asarray(variancias, dtype=np.float64)
+    k = len(n)
+    a, b = np.triu_indices(k, 1)
+
+    v = variancias / n
+    soma_v = v[a] + v[b]
+    se = np.sqrt(soma_v)
+    diff = medias[a] - medias[b]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = diff / se
+        gl = soma_v ** 2 / (v[a] ** 2 / (n[a] - 1) + v[b] ** 2 / (n[b] - 1))
+    pval = sf_amplitude_studentizada(np.sqrt(2.0) * np.abs(t), k, gl)
+
+    niveis = np.asarray(niveis, dtype=object)
+    return pd.DataFrame({
+        'A': niveis[a],
+        'B': niveis[b],
+        'mean(A)': medias[a],
+        'mean(B)': medias[b],
+        'diff': diff,
+        'se': se,
+        'T': t,
+        'df': gl,
+        'pval': pval,
+        'hedges': hedges_g(n[a], medias[a], variancias[a], n[b], medias[b], variancias[b]),
+    })
+
+
+def games_howell(fator, y):
+    """Games-Howell de `y` entre os níveis de `fator` (valores ausentes são ignorados)."""
+    codigos, niveis = codificar_fator(fator)
+    y = np.asarray(y, dtype=np.float64)
+    validos = (codigos >= 0) & ~np.isnan(y)
+    codigos, y = codigos[validos], y[validos]
+    mom = momentos_grupos(codigos, y, len(niveis))
+    presentes = mom.n > 0
+    return games_howell_estatisticas(
+        np.asarray(niveis)[presentes], mom.n[presentes], mom.medias[presentes], mom.variancias[presentes])
+
+
+# ================================
+# TUKEY HSD
+# ================================
+
+def tukey_hsd_estatisticas(niveis, n, medias, ss_dentro, alpha=0.05, top_k=None, variancias=None):
+    """
+    Tukey HSD para todos os pares a partir de contagem e média de cada grupo e da SS dentro dos grupos.
+
+    Retorna um DataFrame tipado com as colunas do resumo de `pairwise_tukeyhsd`
+    (group1, group2, meandiff, p-adj, lower, upper, reject), sem arredondamento.
+    Com as `variancias` (ddof=1) de cada grupo, acrescenta o g de Hedges do
+    par (`hedges`, no sentido de meandiff: group2 - group1).
+
+    Com `top_k`, apenas as `top_k` comparações significativas de maior
+    |meandiff| são retornadas. A significância é decidida pelo valor crítico
+    q (um único ppf), e o p-valor só é calculado para os pares selecionados.
+    """
+    n = np.asarray(n, dtype=np.float64)
+    medias = np.asarray(medias, dtype=np.float64)
+    k = len(n)
+    gl = n.sum() - k
+    qm_dentro = ss_dentro / gl
+    a, b = np.triu_indices(k, 1)
+
+    meandiff = medias[b] - medias[a]
+    se = np.sqrt(qm_dentro / 2.0 * (1.0 / n[a] + 1.0 / n[b]))
+    q = np.abs(meandiff) / se
+    q_crit = stats.studentized_range.ppf(1.0 - alpha, k, gl)
+    reject = q > q_crit
+
+    if top_k is not None:
+        significativos = np.flatnonzero(reject)
+        ordem = np.argsort(-np.abs(meandiff[significativos]), kind='stable')[:top_k]
+        selecionados = significativos[ordem]
+        a, b, meandiff, se, q, reject = (x[selecionados] for x in (a, b, meandiff, se, q, reject))
+
+    margem = se * q_crit
+    niveis = np.asarray(niveis, dtype=object)
+    resultado = pd.DataFrame({
+        'group1': niveis[a],
+        'group2': niveis[b],
+        'meandiff': meandiff,
+        'p-adj': sf_amplitude_studentizada(q, k, gl),
+        'lower': meandiff - margem,
+        'upper': meandiff + margem,
+        'reject': reject,
+    })
+    if variancias is not None:
+        v = np.asarray(variancias, dtype=np.float64)
+        resultado['hedges'] = hedges_g(n[b], medias[b], v[b], n[a], medias[a], v[a])
+    return resultado
+
+
+def tukey_hsd(fator, y, alpha=0.05, top_k=None):
+    """Tukey HSD de `y` entre os níveis de `fator` (valores ausentes são ignorados)."""
+    codigos, niveis = codificar_fator(fator)
+    y = np.asarray(y, dtype=np.float64)
+    validos = (codigos >= 0) & ~np.isnan(y)
+    codigos, y = codigos[validos], y[validos]
+    mom = momentos_grupos(codigos, y, len(niveis))
+    presentes = mom.n > 0
+    return tukey_hsd_estatisticas(
+        np.asarray(niveis)[presentes], mom.n[presentes], mom.medias[presentes],
+        float(mom.ss_dentro_grupos.sum()), alpha=alpha, top_k=top_k, variancias=mom.variancias[presentes])
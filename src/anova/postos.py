@@ -0,0 +1,154 @@
+# postos.py - Kruskal-Wallis e pós-teste de Dunn sobre postos calculados uma única vez
+#
+# A variável resposta é ranqueada uma vez por conjunto de dados limpo (postos
+# médios nos empates, com a soma Σ(t³ - t) guardada para as correções). Para
+# cada fator, H sai das somas de postos por grupo (np.bincount), sem nova
+# ordenação, e o teste de Dunn compara os postos médios de todos os pares de
+# uma só vez.
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from anova.efeito import epsilon_quadrado
+from anova.estatisticas import codificar_fator
+from anova.posthoc import ajustar_pvalores
+from anova.tardio import ModuloTardio
+
+stats = ModuloTardio('scipy.stats')
+
+
+@dataclass
+class PostosResposta:
+    """Postos médios da resposta (NaN onde ela é ausente) e a soma Σ(t³ - t) dos grupos de empates."""
+    postos: np.ndarray
+    soma_empates: float
+
+    @property
+    def n(self):
+        return int(np.count_nonzero(~np.isnan(self.postos)))
+
+    @property
+    def correcao_empates(self):
+        """Fator de correção de empates do H: 1 - Σ(t³ - t) / (n³ - n)."""
+        n = self.n
+        return 1.0 - self.soma_empates / (n ** 3 - n) if n > 1 else 1.0
+
+
+@dataclass
+class ResultadoKruskal:
+    h: float
+    pvalor: float
+    gl: int
+    n: int
+
+    @property
+    def epsilon_quadrado(self):
+        return epsilon_quadrado(self.h, self.n)
+
+
+def ranquear(y):
+    """Postos médios de `y` (como `stats.rankdata`), com uma única ordenação; valores ausentes ficam NaN."""
+    y = np.asarray(y, dtype=np.float64)
+    validos = ~np.isnan(y)
+    valores = y[validos]
+    ordem = np.argsort(valores, kind='mergesort')
+    ordenados = valores[ordem]
+
+    # Limites de cada bloco de valores iguais na ordem crescente
+    novo_bloco = np.concatenate([[True], ordenados[1:] != ordenados[:-1]])
+    inicios = np.flatnonzero(novo_bloco)
+    tamanhos = np.diff(np.append(inicios, len(ordenados)))
+    postos_bloco = inicios + (tamanhos + 1) / 2.0
+
+    postos_validos = np.empty(len(valores))
+    postos_validos[ordem] = np.repeat(postos_bloco, tamanhos)
+    postos = np.full(len(y), np.nan)
+    postos[validos] = postos_validos
+    t = tamanhos.astype(np.float64)
+    return PostosResposta(postos=postos, soma_empates=float((t ** 3 - t).sum()))
+
+
+def _alinhar(fator, postos):
+    """Códigos e postos das linhas válidas; re-ranqueia se o fator tiver ausentes onde a resposta não tem."""
+    if not isinstance(postos, PostosResposta):
+        postos = ranquear(postos)
+    codigos, niveis = codificar_fator(fator)
+    if len(codigos) != len(postos.postos):
+        raise ValueError("O fator e os postos devem ter o mesmo número de linhas.")
+    com_resposta = ~np.isnan(postos.postos)
+    validos = (codigos >= 0) & com_resposta
+    if (com_resposta & (codigos < 0)).any():
+        # Os postos compartilhados valem para todas as linhas com resposta; sem
+        # parte delas é preciso ranquear de novo o subconjunto usado
+        postos = ranquear(np.where(validos, postos.postos, np.nan))
+    return codigos[validos], niveis, postos.postos[validos], postos
+
+
+def _postos_por_grupo(codigos, postos, k):
+    n_grupos = np.bincount(codigos, minlength=k)
+    somas = np.bincount(codigos, weights=postos, minlength=k)
+    presentes = n_grupos > 0
+    return n_grupos[presentes], somas[presentes], presentes
+
+
+def kruskal_postos(fator, postos):
+    """
+    Kruskal-Wallis de um fator a partir de postos já calculados (ver `ranquear`).
+
+    Equivale a `stats.kruskal(*grupos)`, com correção de empates.
+    """
+    codigos, niveis, valores, postos = _alinhar(fator, postos)
+    n_grupos, somas, _ = _postos_por_grupo(codigos, valores, len(niveis))
+    k, n = len(n_grupos), len(valores)
+    if k < 2:
+        raise ValueError("O teste de Kruskal-Wallis requer ao menos 2 grupos com observações.")
+    h = 12.0 / (n * (n + 1)) * float((somas ** 2 / n_grupos).sum()) - 3.0 * (n + 1)
+    correcao = postos.correcao_empates
+    h = h / correcao if correcao > 0 else np.nan
+    return ResultadoKruskal(h=h, pvalor=float(stats.chi2.sf(h, k - 1)), gl=k - 1, n=n)
+
+
+def kruskal_wallis(fator, y):
+    """Teste de Kruskal-Wallis de `y` entre os níveis de `fator` (linhas com ausentes são ignoradas)."""
+    codigos, _ = codificar_fator(fator)
+    y = np.where(codigos >= 0, np.asarray(y, dtype=np.float64), np.nan)
+    return kruskal_postos(fator, ranquear(y))
+
+
+def dunn(fator, postos, correcao='holm', alpha=0.05):
+    """
+    Pós-teste de Dunn para todos os pares de níveis, sobre os mesmos postos do Kruskal-Wallis.
+
+    Parâmetros:
+    - fator: valores categóricos alinhados com os postos
+    - postos: PostosResposta (ou os próprios valores da resposta, que serão ranqueados)
+    - correcao: ajuste dos p-valores ('holm', 'bonferroni', 'fdr_bh' ou 'nenhuma')
+    - alpha: nível de significância usado na coluna `reject`
+
+    z_ij = (R̄_i - R̄_j) / sqrt((n(n+1)/12 - Σ(t³-t) / (12(n-1))) (1/n_i + 1/n_j)).
+    Retorna um DataFrame com A, B, mean_rank(A), mean_rank(B), z, pval, p-adj e reject.
+    """
+    codigos, niveis, valores, postos = _alinhar(fator, postos)
+    n_grupos, somas, presentes = _postos_por_grupo(codigos, valores, len(niveis))
+    n = len(valores)
+    medias = somas / n_grupos
+    a, b = np.triu_indices(len(n_grupos), 1)
+
+    variancia = n * (n + 1) / 12.0 - postos.soma_empates / (12.0 * (n - 1))
+    z = (medias[a] - medias[b]) / np.sqrt(variancia * (1.0 / n_grupos[a] + 1.0 / n_grupos[b]))
+    pval = 2 * stats.norm.sf(np.abs(z))
+    p_adj = ajustar_pvalores(pval, correcao)
+
+    niveis = np.asarray(niveis, dtype=object)[presentes]
+    return pd.DataFrame({
+        'A': niveis[a],
+        'B': niveis[b],
+        'mean_rank(A)': medias[a],
+        'mean_rank(B)': medias[b],
+        'z': z,
+        'pval': pval,
+        'p-adj': p_adj,
+        'reject': p_adj < alpha,
+    })
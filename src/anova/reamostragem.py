@@ -0,0 +1,172 @@
+# reamostragem.py - Teste F por permutação e intervalos bootstrap das médias
+#
+# As observações são ordenadas por grupo uma única vez; cada lote de
+# reamostras é uma matriz (reamostras x n) e as somas por grupo saem de um
+# único `np.add.reduceat` ao longo das linhas, sem laço em Python por reamostra.
+#
+# Como a soma de quadrados total não muda ao permutar os rótulos, o F de cada
+# permutação é uma função crescente de Σ S_g² / n_g (S_g = soma do grupo g), e
+# apenas essa estatística é comparada com a observada.
+#
+# Os lotes têm tamanho fixo e cada um usa uma semente derivada de
+# `np.random.SeedSequence(semente)`, de modo que o resultado é o mesmo com
+# qualquer número de processos.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from anova.estatisticas import IndiceFator, codificar_fator
+
+# Número máximo de elementos (reamostras x observações) de cada lote
+ELEMENTOS_POR_LOTE = 2_000_000
+
+# Dados compartilhados pelas tarefas de cada processo: y ordenado por grupo, inícios,
+# tamanhos e, no teste F, a estatística observada
+_dados_processo = None
+
+
+def _inicializar_processo(dados):
+    global _dados_processo
+    _dados_processo = dados
+
+
+@dataclass
+class ResultadoPermutacao:
+    f: float
+    pvalor: float
+    n_permutacoes: int
+
+
+def _preparar(fator, y):
+    """
+    Descarta ausentes e grupos vazios.
+
+    Retorna (níveis, y ordenado por grupo e centrado, inícios, tamanhos, média de y).
+    """
+    codigos, niveis = codificar_fator(fator)
+    y = np.asarray(y, dtype=np.float64)
+    validos = (codigos >= 0) & ~np.isnan(y)
+    if isinstance(fator, IndiceFator) and validos.all():
+        # Ordem das linhas por grupo já calculada no índice
+        n, ordem = fator.tamanhos, fator.ordem
+    else:
+        codigos, y = codigos[validos], y[validos]
+        n = np.bincount(codigos, minlength=len(niveis))
+        ordem = np.argsort(codigos, kind='stable')
+    presentes = np.flatnonzero(n > 0)
+    if len(presentes) < 2:
+        raise ValueError("São necessários ao menos 2 grupos com observações.")
+    tamanhos = n[presentes]
+    inicios = np.concatenate([[0], np.cumsum(tamanhos)[:-1]])
+    y = y[ordem]
+    media = float(y.mean())
+    return [niveis[i] for i in presentes], y - media, inicios, tamanhos, media
+
+
+def _lotes(total, n_obs, semente):
+    """Divide `total` reamostras em lotes de tamanho fixo, cada um com sua semente."""
+    por_lote = max(1, ELEMENTOS_POR_LOTE // max(n_obs, 1))
+    tamanhos = [por_lote] * (total // por_lote)
+    if total % por_lote:
+        tamanhos.append(total % por_lote)
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    return list(zip(sementes, tamanhos))
+
+
+def _executar(funcao, dados, lotes, max_workers):
+    """Aplica `funcao` a cada lote, no processo atual ou em um pool que recebe `dados` uma vez por processo."""
+    if max_workers is None:
+        max_workers = min(len(lotes), os.cpu_count() or 1)
+    if max_workers <= 1:
+        _inicializar_processo(dados)
+        return [funcao(lote) for lote in lotes]
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_inicializar_processo,
+                             initargs=(dados,)) as executor:
+        return list(executor.map(funcao, lotes))
+
+
+# ================================
+# TESTE F POR PERMUTAÇÃO
+# ================================
+
+def _estatistica_entre(somas, tamanhos):
+    return (somas * somas / tamanhos).sum(axis=-1)
+
+
+def _contar_permutacoes(lote):
+    """Número de permutações do lote com estatística maior ou igual à observada."""
+    semente, tamanho = lote
+    y, inicios, tamanhos, observada = _dados_processo
+    rng = np.random.default_rng(semente)
+    permutados = rng.permuted(np.broadcast_to(y, (tamanho, len(y))), axis=1)
+    estatisticas = _estatistica_entre(np.add.reduceat(permutados, inicios, axis=1), tamanhos)
+    # Tolerância relativa para empates numéricos com a estatística observada
+    return int(np.count_nonzero(estatisticas >= observada * (1 - 1e-12)))
+
+
+def teste_permutacao_f(fator, y, n_permutacoes=9999, semente=0, max_workers=1):
+    """
+    Teste F de um fator por permutação dos rótulos de grupo.
+
+    Parâmetros:
+    - fator, y: valores alinhados (linhas com ausentes são ignoradas)
+    - n_permutacoes: número de permutações aleatórias
+    - semente: semente do gerador (resultado reprodutível)
+    - max_workers: número de processos (None = número de CPUs; 1 = processo atual)
+
+    O p-valor é (1 + nº de permutações com F >= F observado) / (1 + n_permutacoes).
+    """
+    _, y, inicios, tamanhos, _ = _preparar(fator, y)
+    n, k = len(y), len(tamanhos)
+    if n <= k:
+        raise ValueError("O número de observações deve ser maior que o número de grupos.")
+
+    observada = float(_estatistica_entre(np.add.reduceat(y, inicios), tamanhos))
+    ss_total = float(y @ y)
+    f = (observada / (k - 1)) / ((ss_total - observada) / (n - k))
+
+    lotes = _lotes(n_permutacoes, n, semente)
+    contagens = _executar(_contar_permutacoes, (y, inicios, tamanhos, observada), lotes, max_workers)
+    pvalor = (1 + sum(contagens)) / (1 + n_permutacoes)
+    return ResultadoPermutacao(f=f, pvalor=pvalor, n_permutacoes=n_permutacoes)
+
+
+# ================================
+# BOOTSTRAP DAS MÉDIAS
+# ================================
+
+def _medias_bootstrap(lote):
+    """Médias por grupo de cada reamostra do lote (reamostragem dentro de cada grupo)."""
+    semente, tamanho = lote
+    y, inicios, tamanhos = _dados_processo
+    rng = np.random.default_rng(semente)
+    inicio_linha = np.repeat(inicios, tamanhos)
+    tamanho_linha = np.repeat(tamanhos, tamanhos)
+    sorteios = inicio_linha + (rng.random((tamanho, len(y))) * tamanho_linha).astype(np.int64)
+    return np.add.reduceat(y[sorteios], inicios, axis=1) / tamanhos
+
+
+def bootstrap_medias(fator, y, n_reamostras=2000, confianca=0.95, semente=0, max_workers=1):
+    """
+    Intervalos de confiança bootstrap (percentis) para a média de cada grupo.
+
+    Cada reamostra sorteia, com reposição, n_g observações dentro de cada grupo g.
+    Retorna um DataFrame indexado pelos níveis com n, media, ic_inf e ic_sup.
+    """
+    niveis, y, inicios, tamanhos, deslocamento = _preparar(fator, y)
+
+    lotes = _lotes(n_reamostras, len(y), semente)
+    medias = np.vstack(_executar(_medias_bootstrap, (y, inicios, tamanhos), lotes, max_workers))
+    alfa = 1 - confianca
+    inferior, superior = np.quantile(medias, [alfa / 2, 1 - alfa / 2], axis=0)
+
+    return pd.DataFrame({
+        'n': tamanhos,
+        'media': np.add.reduceat(y, inicios) / tamanhos + deslocamento,
+        'ic_inf': inferior + deslocamento,
+        'ic_sup': superior + deslocamento,
+    }, index=pd.Index(niveis, name='nivel'))
@@ -0,0 +1,402 @@
+# relatorio.py - Descrição das colunas e relatório final montados a partir dos dados
+#
+# O dicionário de descrições e o relatório final eram recriados a cada rerun,
+# e as conclusões do relatório eram escritas à mão. Aqui a tabela de
+# descrições depende só dos nomes das colunas, e todas as partes do relatório
+# que falam dos dados (Q-Q plots, boxplots, tabela de pressupostos,
+# normalidade, Kruskal-Wallis, Games-Howell e conclusão) são montadas a partir
+# dos resultados já calculados de cada fator; só as introduções dos testes,
+# as referências e os autores são texto fixo. O aplicativo gera os dois uma
+# vez por conjunto de dados e os reaproveita nos reruns.
+
+import numpy as np
+import pandas as pd
+
+# ================================
+# DESCRIÇÃO DAS COLUNAS
+# ================================
+
+DESCRICOES_COLUNAS = {
+    'Order': 'Identificador de ordem no dataset',
+    'PID': 'Identificador único da propriedade',
+    'MS SubClass': 'Tipo de construção (código)',
+    'MS Zoning': 'Classificação de zoneamento da propriedade',
+    'Lot Frontage': 'Frente do lote (em pés)',
+    'Lot Area': 'Área total do lote (em pés quadrados)',
+    'Street': 'Tipo de rua de acesso',
+    'Alley': 'Tipo de beco de acesso (se houver)',
+    'Lot Shape': 'Formato do lote',
+    'Land Contour': 'Contorno do terreno',
+    'Utilities': 'Serviços públicos disponíveis',
+    'Lot Config': 'Configuração do lote',
+    'Land Slope': 'Inclinação do terreno',
+    'Neighborhood': 'Bairro onde a casa está localizada',
+    'Condition 1': 'Proximidade com vias principais ou outras condições',
+    'Condition 2': 'Condição adicional',
+    'Bldg Type': 'Tipo de edificação',
+    'House Style': 'Estilo da residência',
+    'Overall Qual': 'Qualidade geral do material e acabamento',
+    'Overall Cond': 'Condição geral da casa',
+    'Year Built': 'Ano de construção',
+    'Year Remod/Add': 'Ano da última reforma ou adição',
+    'Roof Style': 'Estilo do telhado',
+    'Roof Matl': 'Material do telhado',
+    'Exterior 1st': 'Acabamento externo primário',
+    'Exterior 2nd': 'Acabamento externo secundário',
+    'Mas Vnr Type': 'Tipo de revestimento de alvenaria',
+    'Mas Vnr Area': 'Área de revestimento de alvenaria',
+    'Exter Qual': 'Qualidade do acabamento externo',
+    'Exter Cond': 'Condição do acabamento externo',
+    'Foundation': 'Tipo de fundação',
+    'Bsmt Qual': 'Qualidade do porão',
+    'Bsmt Cond': 'Condição do porão',
+    'Bsmt Exposure': 'Exposição do porão à luz natural',
+    'BsmtFin Type 1': 'Tipo de acabamento do porão 1',
+    'BsmtFin SF 1': 'Área do porão finalizada (tipo 1)',
+    'BsmtFin Type 2': 'Tipo de acabamento do porão 2',
+    'BsmtFin SF 2': 'Área do porão finalizada (tipo 2)',
+    'Bsmt Unf SF': 'Área do porão não finalizada',
+    'Total Bsmt SF': 'Área total do porão',
+    'Heating': 'Tipo de aquecimento',
+    'Heating QC': 'Qualidade do sistema de aquecimento',
+    'Central Air': 'Possui ar condicionado central',
+    'Electrical': 'Sistema elétrico',
+    '1st Flr SF': 'Área do primeiro andar',
+    '2nd Flr SF': 'Área do segundo andar',
+    'Low Qual Fin SF': 'Área de baixa qualidade finalizada',
+    'Gr Liv Area': 'Área total habitável acima do solo',
+    'Bsmt Full Bath': 'Banheiro completo no porão',
+    'Bsmt Half Bath': 'Meio banheiro no porão',
+    'Full Bath': 'Banheiros completos acima do solo',
+    'Half Bath': 'Meios banheiros acima do solo',
+    'Bedroom AbvGr': 'Número de quartos acima do solo',
+    'Kitchen AbvGr': 'Número de cozinhas acima do solo',
+    'Kitchen Qual': 'Qualidade da cozinha',
+    'TotRms AbvGrd': 'Total de cômodos acima do solo',
+    'Functional': 'Funcionalidade da casa',
+    'Fireplaces': 'Número de lareiras',
+    'Fireplace Qu': 'Qualidade das lareiras',
+    'Garage Type': 'Tipo de garagem',
+    'Garage Yr Blt': 'Ano de construção da garagem',
+    'Garage Finish': 'Acabamento da garagem',
+    'Garage Cars': 'Capacidade de carros na garagem',
+    'Garage Area': 'Área da garagem',
+    'Garage Qual': 'Qualidade da garagem',
+    'Garage Cond': 'Condição da garagem',
+    'Paved Drive': 'Entrada pavimentada',
+    'Wood Deck SF': 'Área do deck de madeira',
+    'Open Porch SF': 'Área da varanda aberta',
+    'Enclosed Porch': 'Área da varanda fechada',
+    '3Ssn Porch': 'Área da varanda de três estações',
+    'Screen Porch': 'Área da varanda com tela',
+    'Pool Area': 'Área da piscina',
+    'Pool QC': 'Qualidade da piscina',
+    'Fence': 'Tipo de cerca',
+    'Misc Feature': 'Recursos adicionais (elevador, etc.)',
+    'Misc Val': 'Valor dos recursos adicionais',
+    'Mo Sold': 'Mês da venda',
+    'Yr Sold': 'Ano da venda',
+    'Sale Type': 'Tipo de venda',
+    'Sale Condition': 'Condição da venda',
+    'SalePrice': 'Preço final de venda da casa',
+}
+
+
+def tabela_descricoes(colunas):
+    """DataFrame com cada coluna e sua descrição (nomes com '_' são procurados também com espaços)."""
+    return pd.DataFrame({
+        "Coluna": list(colunas),
+        "Descrição": [DESCRICOES_COLUNAS.get(col.replace('_', ' '), DESCRICOES_COLUNAS.get(col, "")) for col in colunas],
+    })
+
+
+# ================================
+# RELATÓRIO FINAL
+# ================================
+
+# Correlação mínima entre quantis teóricos e amostrais para "muito próximos" e "relativamente próximos" da reta
+LIMITES_QQ = (0.98, 0.97)
+# Grupos menores não entram na comparação de medianas e dispersões dos boxplots
+MIN_GRUPO_RESUMO = 5
+# Razão entre a maior e a menor amplitude interquartil acima da qual as dispersões são heterogêneas
+RAZAO_IQR_HETEROGENEA = 3.0
+
+INTRO_SHAPIRO = """\
+### 📊 4. Teste de Shapiro-Wilk
+
+O teste de Shapiro-Wilk verifica se uma distribuição é significativamente diferente  
+de uma normal. Embora eficaz, ele é sensível a grandes amostras, nas quais  
+pequenos desvios da normalidade já geram p-valores baixos.
+"""
+
+INTRO_KRUSKAL = """\
+### 🔁 Teste Não Paramétrico (Kruskal-Wallis)
+
+Segundo Andy Field (2009), a ANOVA de um fator tem como equivalente não paramétrico  
+o **teste de Kruskal-Wallis**, recomendado quando pressupostos como normalidade  
+ou homocedasticidade são violados.
+"""
+
+INTRO_GAMES_HOWELL = """\
+### 🔬 Teste Post Hoc (Games-Howell)
+
+Andy Field (2009) recomenda o **teste de Games-Howell** quando há dúvida sobre  
+a homogeneidade das variâncias ou quando os tamanhos amostrais são muito diferentes.  
+É uma alternativa robusta ao teste de Tukey tradicional.
+"""
+
+SECAO_REFERENCIAS = """\
+### 📚 Referências
+- Field, A. (2009). Descobrindo a estatística usando o SPSS. 2. ed. Porto Alegre: Artmed, 2009
+"""
+
+SECAO_AUTORES = """\
+### Autores
+- **PPCA**: Programa de Computação Aplicada - UNB  
+- **AEDI**: Análise Estatística de Dados e Informações  
+- **Prof.** João Gabriel de Moraes Souza  
+- **Aluna**: Silva Laryssa Branco da Silva  
+- **Data**: 2024-01-15
+
+
+### 🔗 Links
+
+- 📊 Projeto no Community Cloud: [https://aedianova.streamlit.app/](https://aedianova.streamlit.app/)  
+- 💻 Código fonte GitHub: [https://github.com/silvialaryssa/anova](https://github.com/silvialaryssa/anova)
+"""
+
+
+
+def _formatar_p(pvalor):
+    return '< 0.0001' if pvalor < 0.0001 else f'{pvalor:.4f}'
+
+
+def _atende(pvalor, alpha=0.05):
+    texto = 'p < 0.0001' if pvalor < 0.0001 else f'p = {pvalor:.4f}'
+    return f'✅ Sim ({texto})' if pvalor >= alpha else f'❌ Não ({texto})'
+
+
+def _lista(nomes):
+    """['a', 'b', 'c'] -> '**a**, **b** e **c**'."""
+    nomes = [f'**{nome}**' for nome in nomes]
+    return nomes[0] if len(nomes) == 1 else ', '.join(nomes[:-1]) + ' e ' + nomes[-1]
+
+
+def _numericos(rotulos):
+    """Rótulos convertidos em números, ou None se algum não for numérico."""
+    try:
+        return np.array([float(r) for r in rotulos])
+    except (TypeError, ValueError):
+        return None
+
+
+def secao_qq(qq_medias):
+    """
+    Análise dos Q-Q plots das médias por grupo.
+
+    Parâmetros:
+    - qq_medias: dict {fator: resultado de `calcular_qq_medias`}
+
+    A aderência à normal é medida pela correlação entre os quantis teóricos e
+    amostrais (LIMITES_QQ).
+    """
+    linhas = [
+        "### 🔍 1. Análise dos Q-Q Plots",
+        "Os Q-Q Plots das médias de preço por categoria foram utilizados para verificar a normalidade "
+        "das médias dos grupos para cada variável categórica analisada:",
+    ]
+    for var, qq in qq_medias.items():
+        if qq['n'] < 3:
+            texto = f"Apenas {qq['n']} grupo(s): poucos pontos para avaliar a normalidade das médias."
+        else:
+            r = float(np.corrcoef(qq['teoricos'], qq['amostrais'])[0, 1])
+            if r >= LIMITES_QQ[0]:
+                texto = (f"Os pontos estão muito próximos da linha reta (r = {r:.3f}), indicando uma forte "
+                         f"aderência à normalidade das médias entre os {qq['n']} grupos.")
+            elif r >= LIMITES_QQ[1]:
+                texto = (f"Os pontos estão relativamente próximos da linha, com leves desvios (r = {r:.3f}) — "
+                         f"distribuição aproximadamente normal das médias dos {qq['n']} grupos.")
+            else:
+                texto = (f"Os pontos se afastam da linha de referência (r = {r:.3f}), sugerindo violação da "
+                         f"normalidade das médias dos {qq['n']} grupos.")
+        linhas += ["", f"**{var}:**  ", texto]
+    return '\n'.join(linhas) + '\n'
+
+
+def secao_boxplot(boxplots):
+    """
+    Análise dos boxplots a partir do resumo por grupo.
+
+    Parâmetros:
+    - boxplots: dict {fator: DataFrame de resumo de `calcular_resumo_boxplot`}
+
+    Compara medianas e amplitudes interquartis dos grupos com pelo menos
+    MIN_GRUPO_RESUMO linhas; com níveis numéricos, indica se as medianas
+    crescem ou decrescem com o nível.
+    """
+    linhas = [
+        "### 📦 2. Análise dos Boxplots",
+        "Os boxplots mostram a distribuição do preço de venda para cada categoria das variáveis:",
+    ]
+    for var, resumo in boxplots.items():
+        grupos = resumo[resumo['n'] >= MIN_GRUPO_RESUMO]
+        if len(grupos) < 2:
+            linhas += ["", f"**{var}:**  ",
+                       f"Menos de dois grupos com pelo menos {MIN_GRUPO_RESUMO} observações para comparar."]
+            continue
+        maior = grupos.loc[grupos['mediana'].idxmax()]
+        menor = grupos.loc[grupos['mediana'].idxmin()]
+        iqr = grupos['q3'] - grupos['q1']
+        razao = iqr.max() / iqr.min() if iqr.min() > 0 else np.inf
+        dispersao = ("dispersões heterogêneas entre os grupos" if razao > RAZAO_IQR_HETEROGENEA
+                     else "dispersões semelhantes entre os grupos")
+        texto = (f"As medianas variam de {menor['mediana']:,.0f} ({menor['nivel']}) a {maior['mediana']:,.0f} "
+                 f"({maior['nivel']}); a maior amplitude interquartil é {razao:.1f} vezes a menor, "
+                 f"com {dispersao}.")
+        niveis = _numericos(grupos['nivel'])
+        if niveis is not None and len(grupos) >= 3:
+            medianas = grupos['mediana'].to_numpy()[np.argsort(niveis)]
+            passos = np.diff(medianas)
+            if (passos > 0).all():
+                texto += " As medianas aumentam progressivamente com o nível, sugerindo uma tendência ordinal."
+            elif (passos < 0).all():
+                texto += " As medianas diminuem progressivamente com o nível, sugerindo uma tendência ordinal."
+        linhas += ["", f"**{var}:**  ", texto]
+    return '\n'.join(linhas) + '\n'
+
+
+def _pvalor_final(resultado):
+    """p-valor do teste usado na conclusão: Kruskal-Wallis quando aplicado, senão a ANOVA."""
+    return resultado.p_kruskal if resultado.p_kruskal is not None else resultado.pvalor_anova
+
+
+def secao_testes(avaliacoes, alpha=0.05):
+    """
+    Tabela de ANOVA e pressupostos de cada fator, com a conclusão.
+
+    Parâmetros:
+    - avaliacoes: dict {fator: ResultadoAvaliacao} (ver `calcular_avaliacao`)
+    - alpha: nível de significância
+    """
+    testes = sorted({r.teste_normalidade for r in avaliacoes.values()})
+    linhas = [
+        "### 📈 3. Testes Estatísticos (ANOVA e Pós-Hoc)",
+        "",
+        f"| Variável | ANOVA p-valor | η² | {' / '.join(testes)} (Normalidade) | Breusch-Pagan (Homoscedasticidade) "
+        f"| ANOVA Tradicional Adequada? |",
+        "|---|---|---|---|---|---|",
+    ]
+    for var, r in avaliacoes.items():
+        adequada = '✅ Sim' if r.atende_pressupostos else '❌ Não'
+        linhas.append(f"| {var} | {_formatar_p(r.pvalor_anova)} | {r.eta_quadrado:.3f} | {_atende(r.p_normalidade, alpha)} "
+                      f"| {_atende(r.p_bp, alpha)} | {adequada} |")
+
+    violadas = [var for var, r in avaliacoes.items() if not r.atende_pressupostos]
+    if not violadas:
+        conclusao = "Em todas as variáveis os pressupostos da ANOVA tradicional foram atendidos."
+    elif len(violadas) == len(avaliacoes):
+        conclusao = ("Em nenhuma das variáveis os pressupostos da ANOVA tradicional foram atendidos. "
+                     "Portanto, testes alternativos não paramétricos foram utilizados.")
+    else:
+        conclusao = (f"Os pressupostos da ANOVA tradicional não foram atendidos em {_lista(violadas)}; "
+                     f"nessas variáveis foram utilizados testes alternativos não paramétricos.")
+    linhas += ["", f"📌 **Conclusão:** {conclusao}"]
+    return '\n'.join(linhas) + '\n'
+
+
+def secao_normalidade(avaliacoes, alpha=0.05):
+    """Texto sobre o teste de normalidade dos resíduos, com o resultado de cada fator."""
+    testes = sorted({r.teste_normalidade for r in avaliacoes.values()})
+    if testes == ['Shapiro-Wilk']:
+        intro = INTRO_SHAPIRO
+    else:
+        intro = (f"### 📊 4. Teste de Normalidade ({' / '.join(testes)})\n\n"
+                 "Com muitas observações, os testes de normalidade detectam desvios pequenos  \n"
+                 "e geram p-valores baixos mesmo quando a distribuição é quase normal.\n")
+    normais = [var for var, r in avaliacoes.items() if r.p_normalidade >= alpha]
+    if not normais:
+        resultado = f"Todas as variáveis apresentaram **p < {alpha}**, indicando violação da normalidade."
+    elif len(normais) == len(avaliacoes):
+        resultado = f"Todas as variáveis apresentaram **p ≥ {alpha}**: não há evidência contra a normalidade."
+    else:
+        resultado = f"Apenas {_lista(normais)} apresentaram **p ≥ {alpha}**; nas demais, a normalidade foi violada."
+    return intro + f"\nNo nosso caso, foi usado para testar a **normalidade dos resíduos da ANOVA**.  \n{resultado}\n"
+
+
+def secao_kruskal(avaliacoes, alpha=0.05):
+    """Texto sobre o Kruskal-Wallis, aplicado aos fatores que não atendem os pressupostos."""
+    aplicados = {var: r for var, r in avaliacoes.items() if r.p_kruskal is not None}
+    if not aplicados:
+        return INTRO_KRUSKAL + "\nComo os pressupostos foram atendidos, o Kruskal-Wallis não foi necessário.\n"
+    significativas = [var for var, r in aplicados.items() if r.p_kruskal < alpha]
+    if len(significativas) == len(avaliacoes):
+        resultado = f"**Todas as variáveis apresentaram p < {alpha}**, confirmando diferenças entre os grupos."
+    elif significativas:
+        resultado = f"{_lista(significativas)} apresentaram **p < {alpha}**, confirmando diferenças entre os grupos."
+    else:
+        resultado = f"Nenhuma variável apresentou **p < {alpha}**."
+    efeitos = ', '.join(f"{var}: ε² = {r.epsilon_quadrado:.3f}" for var, r in aplicados.items())
+    return (INTRO_KRUSKAL + f"\nDiante da violação dos pressupostos, aplicamos o Kruskal-Wallis.  \n{resultado}  \n"
+            f"Tamanhos de efeito — {efeitos}.\n")
+
+
+def secao_games_howell(comparacoes):
+    """
+    Texto sobre o Games-Howell.
+
+    Parâmetros:
+    - comparacoes: dict {fator: (pares significativos, total de pares)}
+    """
+    com_diferencas = [var for var, (significativos, _) in comparacoes.items() if significativos]
+    contagens = '; '.join(f"{var}: {s} de {t} pares" for var, (s, t) in comparacoes.items())
+    if len(com_diferencas) == len(comparacoes):
+        alcance = "para todas as variáveis"
+    elif com_diferencas:
+        alcance = f"em {_lista(com_diferencas)}"
+    else:
+        return INTRO_GAMES_HOWELL + "\nO Games-Howell não identificou diferenças significativas entre as categorias.\n"
+    return (INTRO_GAMES_HOWELL + "\nSubstituímos o Tukey pelo Games-Howell, que identificou  \n"
+            f"**diferenças estatísticas significativas entre as categorias** {alcance} ({contagens}).\n")
+
+
+def secao_conclusao(avaliacoes, alpha=0.05):
+    """Conclusão geral: fatores com efeito significativo e os testes usados."""
+    significativas = [var for var, r in avaliacoes.items() if _pvalor_final(r) < alpha]
+    if significativas:
+        verbo = 'afeta' if len(significativas) == 1 else 'afetam'
+        artigo = 'A variável' if len(significativas) == 1 else 'As variáveis'
+        efeito = (f"{artigo} {_lista(significativas)} {verbo} de forma  \n"
+                  "estatisticamente significativa o preço de venda das casas.  \n")
+    else:
+        efeito = "Nenhuma das variáveis afeta de forma estatisticamente significativa o preço de venda das casas.  \n"
+    if any(not r.atende_pressupostos for r in avaliacoes.values()):
+        testes = ("Como os pressupostos da ANOVA tradicional foram violados, utilizamos o **Kruskal-Wallis**,  \n"
+                  "e como teste post hoc, o **Games-Howell**, apropriado para variâncias desiguais.")
+    else:
+        testes = "Como os pressupostos foram atendidos, a ANOVA tradicional é adequada para todas as variáveis."
+    return f"### 🧠 Conclusão Geral\n\n{efeito}\n{testes}\n"
+
+
+def relatorio_final(avaliacoes, comparacoes, qq_medias, boxplots, alpha=0.05):
+    """
+    Markdown do relatório final, com as partes que falam dos dados montadas a partir dos resultados.
+
+    Parâmetros:
+    - avaliacoes: dict {fator: ResultadoAvaliacao} (ver `calcular_avaliacao`)
+    - comparacoes: dict {fator: (pares significativos, total de pares)} do Games-Howell
+    - qq_medias: dict {fator: resultado de `calcular_qq_medias`}
+    - boxplots: dict {fator: resumo por grupo de `calcular_resumo_boxplot`}
+    - alpha: nível de significância
+    """
+    secoes = [
+        secao_qq(qq_medias),
+        secao_boxplot(boxplots),
+        secao_testes(avaliacoes, alpha),
+        secao_normalidade(avaliacoes, alpha),
+        secao_kruskal(avaliacoes, alpha),
+        secao_games_howell(comparacoes),
+        secao_conclusao(avaliacoes, alpha),
+        SECAO_REFERENCIAS,
+        SECAO_AUTORES,
+    ]
+    return '\n---\n\n'.join(secoes)
@@ -0,0 +1,309 @@
+# streaming.py - ANOVA em blocos para arquivos maiores que a memória
+#
+# O CSV é lido em pedaços e cada pedaço é resumido em momentos por grupo
+# (contagem, média e M2), combinados entre pedaços pela atualização de Chan
+# (generalização de Welford). Para a ANOVA multifatorial também são acumuladas
+# as contagens cruzadas entre cada par de fatores, suficientes para montar X'X.
+# A memória usada depende apenas do número de níveis, não do número de linhas,
+# exceto pelo registro de linhas que protege `retirar`: um dicionário
+# hash -> contagem com uma entrada por linha distinta (da ordem de 100 bytes
+# cada), atualizado em O(tamanho do lote). `acumular_csv` não usa o registro.
+
+import numpy as np
+import pandas as pd
+
+from anova.dados import normalizar_nome
+from anova.multifatorial import equacoes_normais, tabela_tipo2
+from anova.tardio import ModuloTardio
+
+stats = ModuloTardio('scipy.stats')
+
+TAMANHO_BLOCO_PADRAO = 500_000
+
+
+def combinar_momentos(n_a, media_a, m2_a, n_b, media_b, m2_b):
+    """Combina dois conjuntos de momentos (contagem, média, M2) pela fórmula de Chan."""
+    n = n_a + n_b
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = media_b - media_a
+        media = np.where(n > 0, media_a + delta * n_b / n, 0.0)
+        m2 = np.where(n > 0, m2_a + m2_b + delta ** 2 * n_a * n_b / n, 0.0)
+    return n, media, m2
+
+
+def retirar_momentos(n, media, m2, n_b, media_b, m2_b):
+    """Inverso de `combinar_momentos`: remove o conjunto b dos momentos totais."""
+    # Em numpy, a divisão por n_a = 0 (todas as linhas retiradas) não levanta ZeroDivisionError
+    n, n_b = np.asarray(n, dtype=np.float64), np.asarray(n_b, dtype=np.float64)
+    n_a = n - n_b
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media_a = np.where(n_a > 0, (n * media - n_b * media_b) / n_a, 0.0)
+        delta = media_b - media_a
+        m2_a = np.where(n_a > 0, m2 - m2_b - delta ** 2 * n_a * n_b / n, 0.0)
+    return n_a, media_a, m2_a
+
+
+def hash_linhas(bloco, var_target, fatores):
+    """
+    Hash de 64 bits de cada linha (índice, resposta como float e rótulos dos fatores como texto).
+
+    Os fatores são convertidos em texto para que a mesma linha tenha o mesmo
+    hash vinda como `category`, texto ou número.
+    """
+    normalizado = pd.DataFrame({fator: bloco[fator].astype(str) for fator in fatores}, index=bloco.index)
+    normalizado[var_target] = pd.to_numeric(bloco[var_target]).astype(np.float64)
+    return pd.util.hash_pandas_object(normalizado, index=True).to_numpy()
+
+
+def momentos_por_codigo(codigos, y, k):
+    """Contagem, média e M2 de `y` para cada código 0..k-1."""
+    n = np.bincount(codigos, minlength=k).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media = np.where(n > 0, np.bincount(codigos, weights=y, minlength=k) / n, 0.0)
+    desvio = y - media[codigos]
+    m2 = np.bincount(codigos, weights=desvio * desvio, minlength=k)
+    return n, media, m2
+
+
+class AcumuladorAnova:
+    """
+    Momentos combináveis de `var_target` por nível de cada fator.
+
+    Use `atualizar` com cada bloco de dados (linhas com valores ausentes são
+    descartadas, como no `dropna` do aplicativo), `retirar` para desfazer
+    linhas já acumuladas e `combinar` para juntar acumuladores calculados em paralelo.
+
+    Com `registrar_linhas`, o acumulador conta quantas vezes cada linha (hash
+    do índice e dos valores) foi acrescentada; `retirar` só aceita linhas
+    presentes nessa contagem e recusa o lote inteiro, sem alterar nada, quando
+    alguma não está. O registro custa O(tamanho do lote) por chamada e uma
+    entrada de dicionário por linha distinta. Sem ele, `retirar` não é permitido.
+    """
+
+    def __init__(self, var_target, fatores, registrar_linhas=True):
+        self.var_target = var_target
+        self.fatores = list(fatores)
+        self.linhas = {} if registrar_linhas else None
+        self.n = 0.0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.niveis = [[] for _ in self.fatores]
+        self._indices = [{} for _ in self.fatores]
+        self.n_grupos = [np.zeros(0) for _ in self.fatores]
+        self.media_grupos = [np.zeros(0) for _ in self.fatores]
+        self.m2_grupos = [np.zeros(0) for _ in self.fatores]
+        self.cruzadas = {(i, j): np.zeros((0, 0))
+                         for i in range(len(self.fatores)) for j in range(i + 1, len(self.fatores))}
+
+    # -------- níveis --------
+
+    def _registrar_niveis(self, i, rotulos):
+        """Retorna o índice global de cada rótulo, criando os níveis novos."""
+        indice = self._indices[i]
+        for rotulo in rotulos:
+            if rotulo not in indice:
+                indice[rotulo] = len(self.niveis[i])
+                self.niveis[i].append(rotulo)
+        k = len(self.niveis[i])
+        falta = k - len(self.n_grupos[i])
+        if falta > 0:
+            self.n_grupos[i] = np.pad(self.n_grupos[i], (0, falta))
+            self.media_grupos[i] = np.pad(self.media_grupos[i], (0, falta))
+            self.m2_grupos[i] = np.pad(self.m2_grupos[i], (0, falta))
+            for (a, b), tabela in self.cruzadas.items():
+                if i in (a, b):
+                    ka, kb = len(self.niveis[a]), len(self.niveis[b])
+                    self.cruzadas[(a, b)] = np.pad(tabela, ((0, ka - tabela.shape[0]), (0, kb - tabela.shape[1])))
+        return np.array([indice[r] for r in rotulos], dtype=np.int64)
+
+    def _codigos_globais(self, bloco):
+        codigos = []
+        for i, fator in enumerate(self.fatores):
+            categorico = pd.Categorical(bloco[fator])
+            mapa = self._registrar_niveis(i, categorico.categories.tolist())
+            codigos.append(mapa[categorico.codes])
+        return codigos
+
+    # -------- registro de linhas --------
+
+    def _conferir_retirada(self, hashes):
+        """Hashes distintos e contagens do lote; ValueError se alguma linha não estiver registrada."""
+        if self.linhas is None:
+            raise ValueError("Acumulador criado sem registro de linhas: não é possível retirar linhas.")
+        unicos, contagens = np.unique(hashes, return_counts=True)
+        unicos, contagens = unicos.tolist(), contagens.tolist()
+        if any(self.linhas.get(h, 0) < c for h, c in zip(unicos, contagens)):
+            raise ValueError("Não é possível retirar linhas que não foram acrescentadas ao acumulador "
+                             "(ou que já foram retiradas).")
+        return unicos, contagens
+
+    def _contar_linhas(self, unicos, contagens, sinal):
+        linhas = self.linhas
+        for h, c in zip(unicos, contagens):
+            restante = linhas.get(h, 0) + sinal * c
+            if restante:
+                linhas[h] = restante
+            else:
+                del linhas[h]
+
+    # -------- acúmulo --------
+
+    def _aplicar(self, bloco, sinal):
+        bloco = bloco[[self.var_target] + self.fatores].dropna()
+        if bloco.empty:
+            return
+        y = pd.to_numeric(bloco[self.var_target]).to_numpy(dtype=np.float64)
+        # Verificado antes de qualquer alteração: um lote recusado não muda o estado
+        if sinal < 0:
+            unicos, contagens = self._conferir_retirada(hash_linhas(bloco, self.var_target, self.fatores))
+            self._contar_linhas(unicos, contagens, sinal)
+        elif self.linhas is not None:
+            unicos, contagens = np.unique(hash_linhas(bloco, self.var_target, self.fatores), return_counts=True)
+            self._contar_linhas(unicos.tolist(), contagens.tolist(), sinal)
+        codigos = self._codigos_globais(bloco)
+        momentos = [momentos_por_codigo(cod, y, len(self.niveis[i])) for i, cod in enumerate(codigos)]
+
+        n_b = float(len(y))
+        media_b = float(y.mean())
+        m2_b = float(((y - media_b) ** 2).sum())
+        self.n, self.media, self.m2 = self._juntar(self.n, self.media, self.m2, n_b, media_b, m2_b, sinal)
+
+        for i, (n_g, media_g, m2_g) in enumerate(momentos):
+            self.n_grupos[i], self.media_grupos[i], self.m2_grupos[i] = self._juntar(
+                self.n_grupos[i], self.media_grupos[i], self.m2_grupos[i], n_g, media_g, m2_g, sinal)
+
+        for (a, b), tabela in self.cruzadas.items():
+            ka, kb = tabela.shape
+            conjunta = np.bincount(codigos[a] * kb + codigos[b], minlength=ka * kb).reshape(ka, kb)
+            self.cruzadas[(a, b)] = tabela + sinal * conjunta
+
+    @staticmethod
+    def _juntar(n_a, media_a, m2_a, n_b, media_b, m2_b, sinal):
+        if sinal > 0:
+            n, media, m2 = combinar_momentos(n_a, media_a, m2_a, n_b, media_b, m2_b)
+        else:
+            n, media, m2 = retirar_momentos(n_a, media_a, m2_a, n_b, media_b, m2_b)
+        if np.ndim(n) == 0:
+            return float(n), float(media), float(m2)
+        return n, media, np.maximum(m2, 0.0)
+
+    def atualizar(self, bloco):
+        """Acrescenta as linhas de um DataFrame aos momentos."""
+        self._aplicar(bloco, +1)
+        return self
+
+    def retirar(self, bloco):
+        """
+        Remove dos momentos linhas acrescentadas anteriormente (inverso de `atualizar`).
+
+        ValueError, sem alterar o acumulador, se alguma linha do lote (mesmo
+        índice e valores) não foi acrescentada ou já foi retirada.
+        """
+        self._aplicar(bloco, -1)
+        return self
+
+    def combinar(self, outro):
+        """Incorpora os momentos de outro acumulador com os mesmos fatores."""
+        if outro.fatores != self.fatores or outro.var_target != self.var_target:
+            raise ValueError("Acumuladores com variáveis diferentes não podem ser combinados.")
+        if self.linhas is not None and outro.linhas is not None:
+            self._contar_linhas(list(outro.linhas), list(outro.linhas.values()), +1)
+        else:
+            self.linhas = None
+        mapas = [self._registrar_niveis(i, outro.niveis[i]) for i in range(len(self.fatores))]
+        self.n, self.media, self.m2 = self._juntar(self.n, self.media, self.m2, outro.n, outro.media, outro.m2, +1)
+        for i, mapa in enumerate(mapas):
+            k = len(self.niveis[i])
+            n_o, media_o, m2_o = (np.zeros(k) for _ in range(3))
+            n_o[mapa], media_o[mapa], m2_o[mapa] = outro.n_grupos[i], outro.media_grupos[i], outro.m2_grupos[i]
+            self.n_grupos[i], self.media_grupos[i], self.m2_grupos[i] = self._juntar(
+                self.n_grupos[i], self.media_grupos[i], self.m2_grupos[i], n_o, media_o, m2_o, +1)
+        for (a, b), tabela in outro.cruzadas.items():
+            self.cruzadas[(a, b)][np.ix_(mapas[a], mapas[b])] += tabela
+        return self
+
+    # -------- resultados --------
+
+    def _ordem(self, i):
+        """
+        Índices dos níveis observados do fator i, em ordem crescente de rótulo (como o patsy).
+
+        Rótulos de tipos diferentes (número em um bloco, texto em outro) não
+        são comparáveis entre si; nesse caso a ordem é a do rótulo como texto.
+        """
+        niveis = self.niveis[i]
+        observados = [j for j in range(len(niveis)) if self.n_grupos[i][j] > 0]
+        try:
+            return sorted(observados, key=lambda j: niveis[j])
+        except TypeError:
+            return sorted(observados, key=lambda j: str(niveis[j]))
+
+    def resumo_grupos(self, fator):
+        """DataFrame com n, média e variância (ddof=1) de cada nível de `fator`."""
+        i = self.fatores.index(fator)
+        ordem = self._ordem(i)
+        n = self.n_grupos[i][ordem]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variancia = np.where(n > 1, self.m2_grupos[i][ordem] / (n - 1), np.nan)
+        return pd.DataFrame({'n': n.astype(np.int64), 'media': self.media_grupos[i][ordem], 'variancia': variancia},
+                            index=pd.Index([self.niveis[i][j] for j in ordem], name=fator))
+
+    def tabela_um_fator(self, fator):
+        """Tabela ANOVA de um fator (formato `anova_lm`) a partir dos momentos por grupo."""
+        i = self.fatores.index(fator)
+        ordem = self._ordem(i)
+        n_g, media_g = self.n_grupos[i][ordem], self.media_grupos[i][ordem]
+        k, n = len(ordem), self.n
+        ss_entre = float((n_g * (media_g - self.media) ** 2).sum())
+        ss_dentro = float(self.m2_grupos[i][ordem].sum())
+        gl_entre, gl_dentro = k - 1, n - k
+        # Um só nível ou um só valor por nível: sem graus de liberdade, F indefinido
+        if gl_entre <= 0 or gl_dentro <= 0:
+            f = pvalor = np.nan
+        else:
+            f = (ss_entre / gl_entre) / (ss_dentro / gl_dentro) if ss_dentro > 0 else np.inf
+            pvalor = float(stats.f.sf(f, gl_entre, gl_dentro))
+        return pd.DataFrame(
+            {'sum_sq': [ss_entre, ss_dentro],
+             'df': [float(gl_entre), float(gl_dentro)],
+             'F': [f, np.nan],
+             'PR(>F)': [pvalor, np.nan]},
+            index=[f'C({fator})', 'Residual'])
+
+    def tabela_multifatorial(self):
+        """Tabela ANOVA Tipo II do modelo aditivo com todos os fatores."""
+        ordens = [self._ordem(i) for i in range(len(self.fatores))]
+        contagens = [self.n_grupos[i][o] for i, o in enumerate(ordens)]
+        somas = [self.n_grupos[i][o] * (self.media_grupos[i][o] - self.media) for i, o in enumerate(ordens)]
+        cruzadas = {(a, b): tabela[np.ix_(ordens[a], ordens[b])] for (a, b), tabela in self.cruzadas.items()}
+        xtx, xty, blocos = equacoes_normais(contagens, cruzadas, somas, self.n)
+        return tabela_tipo2(xtx, xty, self.m2, self.n, {f'C({f})': b for f, b in zip(self.fatores, blocos)})
+
+
+def acumular_csv(caminho, var_target, fatores, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """
+    Lê `caminho` em blocos de `tamanho_bloco` linhas e retorna o AcumuladorAnova resultante.
+
+    Os fatores são lidos como texto: o tipo inferido pelo pandas muda de um
+    bloco para outro (1 num bloco, '1' ou 'A' em outro), e os rótulos de um
+    mesmo nível precisam ser iguais em todos os blocos.
+    """
+    desejadas = {var_target, *fatores}
+    colunas = [c for c in pd.read_csv(caminho, nrows=0).columns if normalizar_nome(c) in desejadas]
+    tipos = {c: str for c in colunas if normalizar_nome(c) != var_target}
+    acumulador = AcumuladorAnova(var_target, fatores, registrar_linhas=False)
+    leitor = pd.read_csv(caminho, usecols=colunas, dtype=tipos, chunksize=tamanho_bloco)
+    for bloco in leitor:
+        bloco.columns = [normalizar_nome(c) for c in bloco.columns]
+        acumulador.atualizar(bloco)
+    return acumulador
+
+
+def anova_um_fator_streaming(caminho, var, var_target, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """ANOVA de um fator de `var_target` por `var` lendo o CSV em blocos."""
+    return acumular_csv(caminho, var_target, [var], tamanho_bloco).tabela_um_fator(var)
+
+
+def anova_multifatorial_streaming(caminho, var_target, fatores, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """ANOVA Tipo II do modelo aditivo `var_target ~ C(f1) + C(f2) + ...` lendo o CSV em blocos."""
+    return acumular_csv(caminho, var_target, fatores, tamanho_bloco).tabela_multifatorial()
@@ -0,0 +1,34 @@
+# tardio.py - Importação adiada de bibliotecas pesadas
+#
+# scipy.stats, statsmodels, matplotlib e altair levam de 0,3 s a 1,5 s cada
+# para importar e dominam a partida a frio do aplicativo. Um ModuloTardio
+# ocupa o lugar do módulo no escopo global e só o importa no primeiro acesso
+# a um atributo, quando a seção que precisa dele é executada:
+#
+#     stats = ModuloTardio('scipy.stats')   # em vez de `import scipy.stats as stats`
+#     ...
+#     stats.f.sf(f, gl1, gl2)               # a importação acontece aqui
+
+import importlib
+
+
+class ModuloTardio:
+    """Representa o módulo `nome`, importado apenas quando um atributo é usado pela primeira vez."""
+
+    def __init__(self, nome):
+        self._nome = nome
+        self._modulo = None
+
+    def _carregar(self):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nome)
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        if atributo in ('_nome', '_modulo'):
+            raise AttributeError(atributo)
+        return getattr(self._carregar(), atributo)
+
+    def __repr__(self):
+        estado = 'carregado' if self._modulo is not None else 'não carregado'
+        return f"<ModuloTardio {self._nome!r} ({estado})>"
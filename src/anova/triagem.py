@@ -0,0 +1,108 @@
+# triagem.py - Triagem dos pressupostos da ANOVA para todas as colunas categóricas
+#
+# Cada coluna é avaliada em um processo separado. A variável resposta é enviada
+# uma única vez para cada processo (initializer); por tarefa trafegam apenas os
+# códigos inteiros do fator.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from anova.estatisticas import anova_um_fator, codificar_fator
+from anova.normalidade import testar_normalidade
+
+# Variável resposta compartilhada pelas tarefas de cada processo
+_y_processo = None
+
+
+def _inicializar_processo(y):
+    global _y_processo
+    _y_processo = y
+
+
+def colunas_categoricas(df, excluir=()):
+    """Lista as colunas não numéricas (texto ou category) de `df`, exceto as de `excluir`."""
+    return [
+        col for col in df.columns
+        if col not in excluir
+        and (isinstance(df[col].dtype, pd.CategoricalDtype)
+             or pd.api.types.is_object_dtype(df[col])
+             or pd.api.types.is_string_dtype(df[col]))
+    ]
+
+
+def avaliar_pressupostos(var, codigos, y, min_grupo=3, metodo_normalidade='auto'):
+    """
+    Avalia uma coluna: ANOVA de um fator, normalidade (ver `testar_normalidade`) e Breusch-Pagan dos resíduos.
+
+    Retorna None quando a coluna tem menos de 2 grupos ou algum grupo com menos
+    de `min_grupo` observações.
+    """
+    validos = codigos >= 0
+    codigos, y = codigos[validos], y[validos]
+    contagens = np.bincount(codigos)
+    contagens = contagens[contagens > 0]
+    if len(contagens) < 2 or contagens.min() < min_grupo:
+        return None
+
+    anova = anova_um_fator(codigos, y)
+    normalidade = testar_normalidade(anova.residuos, metodo_normalidade)
+    return {
+        'Variável': var,
+        'Grupos': len(contagens),
+        'ANOVA (p)': anova.pvalor,
+        'Teste de normalidade': normalidade.nome,
+        'Normalidade (p)': round(normalidade.pvalor, 4),
+        'Breusch-Pagan (p)': round(anova.bp_pvalor, 4),
+        'Atende Pressupostos': bool(normalidade.pvalor >= 0.05 and anova.bp_pvalor >= 0.05),
+    }
+
+
+def _avaliar_no_processo(args):
+    var, codigos, min_grupo, metodo_normalidade = args
+    try:
+        return var, avaliar_pressupostos(var, codigos, _y_processo, min_grupo, metodo_normalidade), None
+    except Exception as e:
+        return var, None, str(e)
+
+
+def triagem_pressupostos(df, var_target='SalePrice', min_grupo=3, max_workers=None, excluir=('PID',),
+                         metodo_normalidade='auto'):
+    """
+    Avalia os pressupostos da ANOVA de `var_target` contra cada coluna categórica de `df`.
+
+    Parâmetros:
+    - df: DataFrame com os dados
+    - var_target: string com o nome da variável resposta
+    - min_grupo: tamanho mínimo de cada grupo para a coluna ser avaliada
+    - max_workers: número de processos (None = número de CPUs; 1 = executa no processo atual)
+    - excluir: colunas que não devem ser avaliadas além da própria resposta
+    - metodo_normalidade: teste de normalidade dos resíduos (chave de METODOS_NORMALIDADE)
+
+    Retorna (tabela, erros): um DataFrame com uma linha por coluna avaliada e
+    um dict {coluna: mensagem} com as colunas que falharam.
+    """
+    dados = df[df[var_target].notna()]
+    y = pd.to_numeric(dados[var_target], errors='coerce').to_numpy(dtype=np.float64)
+    cat_cols = colunas_categoricas(dados, excluir=set(excluir) | {var_target})
+    tarefas = [(var, codificar_fator(dados[var])[0], min_grupo, metodo_normalidade) for var in cat_cols]
+
+    if max_workers is None:
+        max_workers = min(len(tarefas), os.cpu_count() or 1)
+
+    if max_workers <= 1:
+        _inicializar_processo(y)
+        saidas = [_avaliar_no_processo(t) for t in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_inicializar_processo,
+                                 initargs=(y,)) as executor:
+            saidas = list(executor.map(_avaliar_no_processo, tarefas, chunksize=4))
+
+    linhas = [linha for _, linha, _ in saidas if linha is not None]
+    erros = {var: erro for var, _, erro in saidas if erro is not None}
+    tabela = pd.DataFrame(linhas, columns=['Variável', 'Grupos', 'ANOVA (p)', 'Teste de normalidade',
+                                           'Normalidade (p)', 'Breusch-Pagan (p)', 'Atende Pressupostos'])
+    return tabela, erros
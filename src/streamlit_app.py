@@ -2,13 +2,38 @@
 
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import scipy.stats as stats
-import statsmodels.api as sm
-from statsmodels.stats.diagnostic import het_breuschpagan
-from statsmodels.stats.multicomp import pairwise_tukeyhsd
-import altair as alt
+
+from anova.amostragem import N_AMOSTRA_PREVIA
+from anova.analises import (
+    calcular_anova_multifatorial,
+    calcular_avaliacao,
+    calcular_bootstrap_medias,
+    calcular_dunn,
+    calcular_gameshowell,
+    calcular_multialvo,
+    calcular_permutacao,
+    calcular_planejamento,
+    calcular_previa_avaliacao,
+    calcular_previa_gameshowell,
+    calcular_previa_multifatorial,
+    calcular_qq_medias,
+    calcular_qq_residuos,
+    calcular_resumo_boxplot,
+    calcular_triagem,
+    calcular_tukey,
+)
+from anova.cache import chave_conteudo
+from anova.dados import carregar_tabela
+from anova.efeito import classificar_eta
+from anova.graficos import grafico_boxplot, grafico_qq
+from anova.indice import IndiceDados
+from anova.normalidade import METODOS_NORMALIDADE
+from anova.perfil import Perfilador
+from anova.relatorio import relatorio_final, tabela_descricoes
+from anova.tardio import ModuloTardio
+
+# Importadas só quando a primeira seção que as usa é executada
+alt = ModuloTardio('altair')
 
 # ================================
 # CONFIGURAÇÕES INICIAIS
@@ -16,184 +41,156 @@ import altair as alt
 st.set_page_config(page_title="Análise ANOVA - Ames Housing", layout="wide")
 st.title("Análise Estatística com ANOVA - Ames Housing Dataset")
 
+# Instrumentação por etapa (ativada com ANOVA_PERFIL=1); um perfil novo a cada rerun
+perfil = Perfilador()
+
 # ================================
 # FUNÇÕES UTILITÁRIAS
 # ================================
 uploaded_file = 'AmesHousing.csv'  # Default file for demonstration
 @st.cache_data
 def carregar_dados(uploaded_file):
- return pd.read_csv(uploaded_file)
+    # Colunas de texto chegam como `category` e os nomes já vêm com '_' no lugar de espaços
+    return carregar_tabela(uploaded_file)
 
-def exibir_colunas_descricao(df):
-    descricoes = {
-    'Order': 'Identificador de ordem no dataset',
-    'PID': 'Identificador único da propriedade',
-    'MS SubClass': 'Tipo de construção (código)',
-    'MS Zoning': 'Classificação de zoneamento da propriedade',
-    'Lot Frontage': 'Frente do lote (em pés)',
-    'Lot Area': 'Área total do lote (em pés quadrados)',
-    'Street': 'Tipo de rua de acesso',
-    'Alley': 'Tipo de beco de acesso (se houver)',
-    'Lot Shape': 'Formato do lote',
-    'Land Contour': 'Contorno do terreno',
-    'Utilities': 'Serviços públicos disponíveis',
-    'Lot Config': 'Configuração do lote',
-    'Land Slope': 'Inclinação do terreno',
-    'Neighborhood': 'Bairro onde a casa está localizada',
-    'Condition 1': 'Proximidade com vias principais ou outras condições',
-    'Condition 2': 'Condição adicional',
-    'Bldg Type': 'Tipo de edificação',
-    'House Style': 'Estilo da residência',
-    'Overall Qual': 'Qualidade geral do material e acabamento',
-    'Overall Cond': 'Condição geral da casa',
-    'Year Built': 'Ano de construção',
-    'Year Remod/Add': 'Ano da última reforma ou adição',
-    'Roof Style': 'Estilo do telhado',
-    'Roof Matl': 'Material do telhado',
-    'Exterior 1st': 'Acabamento externo primário',
-    'Exterior 2nd': 'Acabamento externo secundário',
-    'Mas Vnr Type': 'Tipo de revestimento de alvenaria',
-    'Mas Vnr Area': 'Área de revestimento de alvenaria',
-    'Exter Qual': 'Qualidade do acabamento externo',
-    'Exter Cond': 'Condição do acabamento externo',
-    'Foundation': 'Tipo de fundação',
-    'Bsmt Qual': 'Qualidade do porão',
-    'Bsmt Cond': 'Condição do porão',
-    'Bsmt Exposure': 'Exposição do porão à luz natural',
-    'BsmtFin Type 1': 'Tipo de acabamento do porão 1',
-    'BsmtFin SF 1': 'Área do porão finalizada (tipo 1)',
-    'BsmtFin Type 2': 'Tipo de acabamento do porão 2',
-    'BsmtFin SF 2': 'Área do porão finalizada (tipo 2)',
-    'Bsmt Unf SF': 'Área do porão não finalizada',
-    'Total Bsmt SF': 'Área total do porão',
-    'Heating': 'Tipo de aquecimento',
-    'Heating QC': 'Qualidade do sistema de aquecimento',
-    'Central Air': 'Possui ar condicionado central',
-    'Electrical': 'Sistema elétrico',
-    '1st Flr SF': 'Área do primeiro andar',
-    '2nd Flr SF': 'Área do segundo andar',
-    'Low Qual Fin SF': 'Área de baixa qualidade finalizada',
-    'Gr Liv Area': 'Área total habitável acima do solo',
-    'Bsmt Full Bath': 'Banheiro completo no porão',
-    'Bsmt Half Bath': 'Meio banheiro no porão',
-    'Full Bath': 'Banheiros completos acima do solo',
-    'Half Bath': 'Meios banheiros acima do solo',
-    'Bedroom AbvGr': 'Número de quartos acima do solo',
-    'Kitchen AbvGr': 'Número de cozinhas acima do solo',
-    'Kitchen Qual': 'Qualidade da cozinha',
-    'TotRms AbvGrd': 'Total de cômodos acima do solo',
-    'Functional': 'Funcionalidade da casa',
-    'Fireplaces': 'Número de lareiras',
-    'Fireplace Qu': 'Qualidade das lareiras',
-    'Garage Type': 'Tipo de garagem',
-    'Garage Yr Blt': 'Ano de construção da garagem',
-    'Garage Finish': 'Acabamento da garagem',
-    'Garage Cars': 'Capacidade de carros na garagem',
-    'Garage Area': 'Área da garagem',
-    'Garage Qual': 'Qualidade da garagem',
-    'Garage Cond': 'Condição da garagem',
-    'Paved Drive': 'Entrada pavimentada',
-    'Wood Deck SF': 'Área do deck de madeira',
-    'Open Porch SF': 'Área da varanda aberta',
-    'Enclosed Porch': 'Área da varanda fechada',
-    '3Ssn Porch': 'Área da varanda de três estações',
-    'Screen Porch': 'Área da varanda com tela',
-    'Pool Area': 'Área da piscina',
-    'Pool QC': 'Qualidade da piscina',
-    'Fence': 'Tipo de cerca',
-    'Misc Feature': 'Recursos adicionais (elevador, etc.)',
-    'Misc Val': 'Valor dos recursos adicionais',
-    'Mo Sold': 'Mês da venda',
-    'Yr Sold': 'Ano da venda',
-    'Sale Type': 'Tipo de venda',
-    'Sale Condition': 'Condição da venda',
-    'SalePrice': 'Preço final de venda da casa'
-}
-
-
-    df.columns = df.columns.str.replace(' ', '_')
+def secao_sob_demanda(titulo, chave, aberta=False):
+    """Interruptor de uma seção: o conteúdo só é calculado e exibido quando está ligado."""
+    return st.toggle(titulo, value=aberta, key=f"secao_{chave}")
+
+def resultado_em_sessao(assinatura, etapa, var, calcular):
+    """
+    Guarda o resultado de uma etapa em `st.session_state` até os dados mudarem.
+
+    Parâmetros:
+    - assinatura: chave de conteúdo dos dados analisados
+    - etapa, var: identificam o resultado (var pode ser None)
+    - calcular: função sem argumentos chamada apenas na primeira vez
+    """
+    resultados = st.session_state.get('resultados')
+    if resultados is None or resultados['assinatura'] != assinatura:
+        resultados = st.session_state['resultados'] = {'assinatura': assinatura, 'itens': {}}
+    if (etapa, var) not in resultados['itens']:
+        resultados['itens'][(etapa, var)] = calcular()
+    return resultados['itens'][(etapa, var)]
+
+def chave_sessao(indice, var):
+    """Chave de `var` em `resultado_em_sessao`, separada quando `indice` é a amostra da prévia rápida."""
+    return var if indice.origem is None else (var, 'previa', len(indice))
+
+@st.cache_data
+def descricao_colunas(colunas):
+    # Depende só dos nomes das colunas: montada uma vez por conjunto de colunas
+    return tabela_descricoes(colunas)
 
+def exibir_colunas_descricao(df):
     st.subheader("Descrição de todas as colunas")
-    colunas_df = pd.DataFrame({
-        "Coluna": df.columns,
-        "Descrição": [descricoes.get(col.replace('_', ' '), descricoes.get(col, "")) for col in df.columns]
-    })
-    st.dataframe(colunas_df)
-    
+    st.dataframe(descricao_colunas(tuple(df.columns)))
+
 # Categorias selecionadas para análise
     st.subheader("Colunas selecionadas para análise")
-    colunas_selecionadas = ['SalePrice', 'Neighborhood', 'House_Style', 'Bsmt_Full_Bath']    
+    colunas_selecionadas = ['SalePrice', 'Neighborhood', 'House_Style', 'Bsmt_Full_Bath']
     st.dataframe(df[colunas_selecionadas].head())
-    
+
 # ================================
 # Q-Q Plot das Médias    
 # ================================    
 
-def qq_plot_medias(df, var_categ, var_target):
-    medias = df.groupby(var_categ)[var_target].mean().dropna()
-    fig = plt.figure(figsize=(4, 3))
-    stats.probplot(medias, dist="norm", plot=plt)
-    plt.title(f"Q-Q Plot das Médias de {var_target} por {var_categ}", fontsize=10)
-    plt.xlabel("Quantis teóricos", fontsize=8)
-    plt.ylabel("Quantis amostrais", fontsize=8)
-    plt.xticks(fontsize=7)
-    plt.yticks(fontsize=7)
-    plt.grid(True)
-    plt.tight_layout()
-    return fig
+def qq_plot_medias(indice, var_categ, var_target):
+    qq = resultado_em_sessao(assinatura_dados, 'qq_medias', var_categ,
+                             lambda: calcular_qq_medias(indice, var_categ))
+    return grafico_qq(qq, f"Médias de {var_target} por {var_categ}")
+
+def qq_plot_residuos(indice, var_categ, var_target):
+    qq = resultado_em_sessao(assinatura_dados, 'qq_residuos', var_categ,
+                             lambda: calcular_qq_residuos(indice, var_categ))
+    titulo = f"Resíduos da ANOVA por {var_categ}"
+    if qq['n'] > len(qq['amostrais']):
+        titulo += f" ({len(qq['amostrais'])} de {qq['n']} pontos)"
+    return grafico_qq(qq, titulo)
 
 # ================================
 # ANOVA E AVALIAÇÃO DAS VARIÁVEIS
 # ================================
 
-def avaliar_variavel(var, df_clean, var_target):
+def avaliar_variavel(var, indice, var_target, metodo_normalidade='auto', reamostragem=False, indice_previa=None):
     st.subheader(f"Variável: {var}")
-    grupos = [group[var_target].values for name, group in df_clean.groupby(var)]
-    anova = stats.f_oneway(*grupos)
-    st.write(f"p-valor da ANOVA: {anova.pvalue:.6f}")
-
-    if anova.pvalue < 0.001:
+    # Prévia rápida: usa a amostra, a menos que a conclusão dela seja limítrofe
+    if indice_previa is not None:
+        previa = resultado_em_sessao(
+            assinatura_dados, 'previa_avaliacao', (chave_sessao(indice_previa, var), metodo_normalidade),
+            lambda: calcular_previa_avaliacao(indice_previa, var, metodo_normalidade))
+        eta_min, eta_max = previa.eta_intervalo
+        p_min, p_max = previa.pvalor_projetado
+        if previa.limitrofe:
+            st.warning(f"🔎 Prévia limítrofe ({', '.join(previa.motivos)}): resultado recalculado com todas as "
+                       f"{previa.n_total} linhas.")
+        else:
+            st.info(f"🔎 Prévia com {previa.n_amostra} de {previa.n_total} linhas. IC 95% de η²: "
+                    f"[{eta_min:.4f}, {eta_max:.4f}]; p-valor esperado com todas as linhas entre "
+                    f"{p_min:.2g} e {p_max:.2g}.")
+            indice = indice_previa
+    resultado = resultado_em_sessao(
+        assinatura_dados, 'avaliacao', (chave_sessao(indice, var), metodo_normalidade),
+        lambda: calcular_avaliacao(indice, var, metodo_normalidade))
+    st.write(f"p-valor da ANOVA: {resultado.pvalor_anova:.6f}")
+
+    if resultado.pvalor_anova < 0.001:
         st.markdown("🔬 **Conclusão**: Existe uma **diferença estatisticamente muito significativa** entre as médias dos grupos.")
-    elif anova.pvalue < 0.05:
+    elif resultado.pvalor_anova < 0.05:
         st.markdown("🔬 **Conclusão**: Existe uma **diferença estatisticamente significativa** entre as médias dos grupos.")
     else:
         st.markdown("📊 **Conclusão**: **Não há evidência estatística suficiente** para afirmar que as médias dos grupos são diferentes.")
+    st.write(f"Tamanho de efeito: η² = {resultado.eta_quadrado:.4f} ({classificar_eta(resultado.eta_quadrado)}), "
+             f"ω² = {resultado.omega_quadrado:.4f}")
 
-    modelo = sm.OLS.from_formula(f'{var_target} ~ C({var})', data=df_clean).fit()
-    residuos = modelo.resid
-    shapiro = stats.shapiro(residuos)
-    bp_test = het_breuschpagan(residuos, modelo.model.exog)
-
-    p_shapiro = shapiro.pvalue
-    st.write(f"Shapiro-Wilk (Normalidade dos resíduos): {p_shapiro:.4f}")
-    if p_shapiro >= 0.05:
+    p_normalidade = resultado.p_normalidade
+    st.write(f"{resultado.teste_normalidade} (Normalidade dos resíduos): {p_normalidade:.4f}")
+    if p_normalidade >= 0.05:
         st.success("✅ Os resíduos seguem uma distribuição normal (p ≥ 0.05).")
     else:
         st.warning("⚠️ Os resíduos **não seguem** uma distribuição normal (p < 0.05).")
 
-    p_bp = bp_test[1]
+    p_bp = resultado.p_bp
     st.write(f"Breusch-Pagan (Homocedasticidade dos resíduos): {p_bp:.4f}")
     if p_bp >= 0.05:
         st.success("✅ Variância constante dos resíduos (homocedasticidade verificada).")
     else:
         st.warning("⚠️ Os resíduos **não têm variância constante** (heterocedasticidade detectada).")
 
-    if shapiro.pvalue < 0.05 or bp_test[1] < 0.05:
-        kruskal = stats.kruskal(*grupos)
-        st.warning(f"ANOVA não atende pressupostos. Usando Kruskal-Wallis: p = {kruskal.pvalue:.4f}")
+    if not resultado.atende_pressupostos:
+        st.warning(f"ANOVA não atende pressupostos. Usando Kruskal-Wallis: p = {resultado.p_kruskal:.4f}")
         st.success("Pressupostos não atendidos, logo o teste não paramétrico - Kruskal-Wallis foi aplicado.")
-        if kruskal.pvalue < 0.001:
+        if resultado.p_kruskal < 0.001:
             st.markdown("🔬 **Conclusão**: Existe uma **diferença estatisticamente muito significativa** entre as medianas dos grupos.")
+        st.write(f"Tamanho de efeito do Kruskal-Wallis: ε² = {resultado.epsilon_quadrado:.4f}")
+        comparacoes = resultado_em_sessao(
+            assinatura_dados, 'dunn', chave_sessao(indice, var),
+            lambda: calcular_dunn(indice, var))
+        st.caption("Pós-teste de Dunn (p-valores ajustados por Holm), sobre os mesmos postos do Kruskal-Wallis")
+        st.dataframe(comparacoes.sort_values('p-adj'))
     else:
         st.success("Pressupostos atendidos para ANOVA tradicional")
 
+    if reamostragem:
+        permutacao = resultado_em_sessao(
+            assinatura_dados, 'permutacao', chave_sessao(indice, var),
+            lambda: calcular_permutacao(indice, var))
+        st.write(f"Teste F por permutação ({permutacao.n_permutacoes} permutações): p = {permutacao.pvalor:.4f}")
+        ic_medias = resultado_em_sessao(
+            assinatura_dados, 'bootstrap_medias', chave_sessao(indice, var),
+            lambda: calcular_bootstrap_medias(indice, var))
+        st.caption("Médias por grupo com intervalo de confiança bootstrap de 95%")
+        st.dataframe(ic_medias)
+
 # ================================
 # ENTRADA DE DADOS
 # ================================
-df = carregar_dados(uploaded_file)
-df.columns = df.columns.str.replace(' ', '_')
+with perfil.etapa('carregar_dados'):
+    df = carregar_dados(uploaded_file)
 st.success("Arquivo carregado com sucesso!")
-exibir_colunas_descricao(df)
+if secao_sob_demanda("Mostrar descrição das colunas", 'descricao'):
+    with perfil.etapa('exibir_colunas_descricao', linhas=len(df)):
+        exibir_colunas_descricao(df)
 
 # ================================
 # DEFINIÇÃO DE VARIÁVEIS
@@ -204,40 +201,84 @@ var2 = 'House_Style'
 var3 = 'Bsmt_Full_Bath'
 #var3 = 'Fence'  # Alterado para 'Yr_Sold' como exemplo
 df_clean = df[[var_target, var1, var2, var3]].dropna()
+# Resultados por seção ficam na sessão enquanto os dados analisados não mudarem
+assinatura_dados = chave_conteudo(df_clean)
+# Fatores codificados e agrupados uma única vez; todas as seções por fator usam este índice
+indice = resultado_em_sessao(
+    assinatura_dados, 'indice', None,
+    lambda: IndiceDados(df_clean, var_target, [var1, var2, var3], assinatura=assinatura_dados))
+
+# Só os fatores escolhidos são calculados nas seções por fator
+fatores_exibidos = st.sidebar.multiselect(
+    "Fatores exibidos", [var1, var2, var3], default=[var1],
+    help="As seções por fator calculam apenas os fatores selecionados.",
+)
+metodo_normalidade = st.sidebar.selectbox(
+    "Teste de normalidade dos resíduos", list(METODOS_NORMALIDADE), format_func=METODOS_NORMALIDADE.get,
+    help="No modo automático, Shapiro-Wilk até 5000 resíduos e D'Agostino K² acima disso.",
+)
+reamostragem = st.sidebar.checkbox(
+    "Teste de permutação e bootstrap",
+    help="Acrescenta à avaliação de cada variável o teste F por permutação e ICs bootstrap das médias.",
+)
+previa_rapida = st.sidebar.checkbox(
+    "Prévia rápida (amostra estratificada)",
+    help="Em bases grandes, a avaliação por variável, a ANOVA multifatorial e o Games-Howell rodam sobre uma "
+         "amostra estratificada pelos níveis dos fatores; resultados limítrofes são refeitos com todas as linhas.",
+)
+indice_previa = None
+if previa_rapida:
+    n_previa = int(st.sidebar.number_input("Linhas da amostra", min_value=1000, value=N_AMOSTRA_PREVIA, step=1000))
+    if len(indice) > n_previa:
+        with perfil.etapa('amostra_previa', linhas=len(df_clean)):
+            indice_previa = resultado_em_sessao(assinatura_dados, 'indice_previa', n_previa,
+                                                lambda: indice.amostra(n_previa))
 
 # ================================
 # Q-Q Plots
 # ================================
 st.header("Q-Q Plot das Médias por Variável")
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.subheader(var1)
-    st.pyplot(qq_plot_medias(df_clean, var1, var_target))
-with col2:
-    st.subheader(var2)
-    st.pyplot(qq_plot_medias(df_clean, var2, var_target))
-with col3:
-    st.subheader(var3)
-    st.pyplot(qq_plot_medias(df_clean, var3, var_target))
+if secao_sob_demanda("Calcular Q-Q plots", 'qq') and fatores_exibidos:
+    tipo_qq = st.radio("Q-Q plot de", ["Médias por grupo", "Resíduos da ANOVA"], horizontal=True, key='tipo_qq')
+    etapa_qq, qq_plot = (('qq_plot_medias', qq_plot_medias) if tipo_qq == "Médias por grupo"
+                         else ('qq_plot_residuos', qq_plot_residuos))
+    for coluna, var in zip(st.columns(len(fatores_exibidos)), fatores_exibidos):
+        with coluna, perfil.etapa(etapa_qq, fator=var, linhas=len(df_clean)):
+            st.subheader(var)
+            st.altair_chart(qq_plot(indice, var, var_target), use_container_width=True)
 
 # ================================
 # Boxplots com Altair
 # ================================
 st.header("Boxplots para Visualização das Variáveis")
-for var in [var1, var2, var3]:
-    chart_data = df_clean[[var, var_target]].dropna()
-    chart = alt.Chart(chart_data).mark_boxplot(extent='min-max').encode(
-        x=alt.X(f'{var}:N', title=var),
-        y=alt.Y(f'{var_target}:Q', title='Preço de Venda'),
-        color=alt.Color(f'{var}:N', legend=None)
-    ).properties(width=400, height=200)
-    st.altair_chart(chart, use_container_width=True)
+# Por padrão os quartis são calculados aqui e só o resumo (poucas linhas por
+# grupo) vai para o navegador; o modo bruto envia todas as linhas ao Vega.
+modo_boxplot = st.sidebar.radio(
+    "Boxplots",
+    ["Resumo por grupo", "Linhas brutas"],
+    help="'Linhas brutas' envia todas as linhas ao navegador; use apenas com poucos dados.",
+)
+if secao_sob_demanda("Calcular boxplots", 'boxplot'):
+    for var in fatores_exibidos:
+        with perfil.etapa('boxplot', fator=var, linhas=len(df_clean)):
+            if modo_boxplot == "Resumo por grupo":
+                resumo, outliers = resultado_em_sessao(
+                    assinatura_dados, 'resumo_boxplot', var,
+                    lambda: calcular_resumo_boxplot(indice, var))
+                chart = grafico_boxplot(resumo, outliers, var, 'Preço de Venda')
+            else:
+                chart_data = df_clean[[var, var_target]].dropna()
+                chart = alt.Chart(chart_data).mark_boxplot(extent='min-max').encode(
+                    x=alt.X(f'{var}:N', title=var),
+                    y=alt.Y(f'{var_target}:Q', title='Preço de Venda'),
+                    color=alt.Color(f'{var}:N', legend=None)
+                )
+            chart = chart.properties(width=400, height=200)
+            st.altair_chart(chart, use_container_width=True)
     
 # ================================
 # ANOVA de múltiplos fatores (Two-Way ou mais)
 # ================================    
-import statsmodels.api as sm
-import statsmodels.formula.api as smf
 
 # Modelo ANOVA com 3 variáveis categóricas
 ##modelo = smf.ols('SalePrice ~ C(Neighborhood) + C(House_Style) + C(Bsmt_Full_Bath)', data=df_clean).fit()
@@ -261,32 +302,35 @@ import statsmodels.formula.api as smf
 ##st.subheader("📊 ANOVA Two-way (Neighborhood + House_Style + Bsmt_Full_Bath)")
 ##st.dataframe(anova_tabela)
 
-#modelo_interacao = smf.ols('SalePrice ~ C(Neighborhood) * C(House_Style) + C(Bsmt_Full_Bath)', data=df_clean).fit()
-#anova_inter = sm.stats.anova_lm(modelo_interacao, typ=2)
-#st.subheader("📊 ANOVA com Interação (Neighborhood * House_Style)")
-#st.dataframe(anova_inter)
-
 #######################################################################################################################
-import statsmodels.formula.api as smf
-import statsmodels.api as sm
 
-def anova_multifatorial(df, var_target, fatores):
+def anova_multifatorial(indice, fatores, indice_previa=None):
     """
     Executa ANOVA multifatorial e interpreta resultados.
 
     Parâmetros:
-    - df: DataFrame com os dados
-    - var_target: string com o nome da variável resposta
+    - indice: IndiceDados com a variável resposta e os fatores já codificados
     - fatores: lista de strings com os nomes das variáveis categóricas
+    - indice_previa: amostra da prévia rápida (None = todas as linhas)
     """
 
-    # Monta a fórmula para o modelo, aplicando C() em cada fator
-    fatores_formula = ' + '.join([f'C({f})' for f in fatores])
-    formula = f'{var_target} ~ {fatores_formula}'
+    anova_tabela = None
+    if indice_previa is not None:
+        tabela_previa, limitrofe = resultado_em_sessao(
+            assinatura_dados, 'previa_multifatorial', chave_sessao(indice_previa, tuple(fatores)),
+            lambda: calcular_previa_multifatorial(indice_previa, list(fatores)))
+        if limitrofe:
+            st.warning(f"🔎 Prévia limítrofe: ANOVA recalculada com todas as {len(indice)} linhas.")
+        else:
+            st.info(f"🔎 Prévia com {len(indice_previa)} de {len(indice)} linhas; p_completo_min e p_completo_max "
+                    f"dão a faixa do p-valor esperado com todas as linhas.")
+            anova_tabela = tabela_previa
 
-    # Ajusta o modelo e calcula ANOVA
-    modelo = smf.ols(formula, data=df).fit()
-    anova_tabela = sm.stats.anova_lm(modelo, typ=2)
+    # Ajusta o modelo e calcula ANOVA (resultado em cache)
+    if anova_tabela is None:
+        anova_tabela = resultado_em_sessao(
+            assinatura_dados, 'anova_multifatorial', tuple(fatores),
+            lambda: calcular_anova_multifatorial(indice, list(fatores)))
 
     # Título interpretativo
     st.header(f"🧠 Interpretação dos Resultados - ANOVA  Two-way")
@@ -295,13 +339,14 @@ def anova_multifatorial(df, var_target, fatores):
     for fator in [f'C({f})' for f in fatores]:
         p_valor = anova_tabela.loc[fator, 'PR(>F)']
         f_stat  = anova_tabela.loc[fator, 'F']
+        eta_p   = anova_tabela.loc[fator, 'partial_eta_sq']
         
         if p_valor < 0.001:
-            st.success(f"🔹 {fator}: Influência **muito significativa** (F = {f_stat:.2f}, p < 0.001).")
+            st.success(f"🔹 {fator}: Influência **muito significativa** (F = {f_stat:.2f}, p < 0.001, η²p = {eta_p:.3f}).")
         elif p_valor < 0.05:
-            st.info(f"🔹 {fator}: Influência **significativa** (F = {f_stat:.2f}, p = {p_valor:.4f}).")
+            st.info(f"🔹 {fator}: Influência **significativa** (F = {f_stat:.2f}, p = {p_valor:.4f}, η²p = {eta_p:.3f}).")
         else:
-            st.warning(f"🔹 {fator}: **Sem influência significativa** (F = {f_stat:.2f}, p = {p_valor:.4f}).")
+            st.warning(f"🔹 {fator}: **Sem influência significativa** (F = {f_stat:.2f}, p = {p_valor:.4f}, η²p = {eta_p:.3f}).")
 
     # Exibe a tabela ANOVA
     st.subheader(f"📊 ANOVA Two-way ({' + '.join(fatores)})")
@@ -310,7 +355,52 @@ def anova_multifatorial(df, var_target, fatores):
     return anova_tabela  # opcional: retorna a tabela para uso externo
 
 fatores = [var1,var2,var3]
-anova_multifatorial(df_clean, var_target='SalePrice', fatores=fatores)
+if secao_sob_demanda("Calcular ANOVA multifatorial", 'anova_multifatorial'):
+    with perfil.etapa('anova_multifatorial', linhas=len(df_clean)):
+        anova_multifatorial(indice, fatores=fatores, indice_previa=indice_previa)
+
+
+def anova_interacao(indice, fatores, interacao, tipo=2):
+    """
+    ANOVA com interação, calculada a partir das caselas observadas (sem colunas one-hot).
+
+    Parâmetros:
+    - indice: IndiceDados com a variável resposta e os fatores já codificados
+    - fatores: lista de strings com os nomes das variáveis categóricas
+    - interacao: tupla de fatores da interação, por exemplo (var1, var2)
+    - tipo: soma de quadrados Tipo II ou III
+    """
+    st.subheader(f"📊 ANOVA com Interação ({' * '.join(interacao)}) - Tipo {'II' if tipo == 2 else 'III'}")
+    try:
+        anova_inter = resultado_em_sessao(
+            assinatura_dados, 'anova_interacao', (tuple(fatores), tuple(interacao), tipo),
+            lambda: calcular_anova_multifatorial(indice, list(fatores), (tuple(interacao),), tipo))
+    except ValueError as e:
+        st.warning(f"⚠️ {e}")
+        return
+
+    for termo, caselas in anova_inter.attrs.get('caselas', {}).items():
+        st.write(f"{termo}: {caselas['observadas']} de {caselas['possiveis']} caselas observadas "
+                 f"({caselas['vazias']} vazias, {caselas['unitarias']} com uma única observação).")
+        if caselas['vazias']:
+            st.caption("Caselas vazias reduzem os graus de liberdade da interação; a Tipo III não é definida nesse caso.")
+
+    termo_interacao = ':'.join(f'C({f})' for f in interacao)
+    p_valor = anova_inter.loc[termo_interacao, 'PR(>F)']
+    f_stat = anova_inter.loc[termo_interacao, 'F']
+    if p_valor < 0.05:
+        st.info(f"🔹 {termo_interacao}: **interação significativa** (F = {f_stat:.2f}, p = {p_valor:.4g}) — "
+                f"o efeito de {interacao[0]} sobre o preço depende de {interacao[1]}.")
+    else:
+        st.success(f"🔹 {termo_interacao}: **sem interação significativa** (F = {f_stat:.2f}, p = {p_valor:.4f}).")
+    st.dataframe(anova_inter)
+
+
+if secao_sob_demanda(f"Calcular ANOVA com interação ({var1} * {var2})", 'anova_interacao'):
+    tipo_ss = st.radio("Soma de quadrados", [2, 3], format_func=lambda t: f"Tipo {'II' if t == 2 else 'III'}",
+                       horizontal=True, key='tipo_ss_interacao')
+    with perfil.etapa('anova_interacao', linhas=len(df_clean)):
+        anova_interacao(indice, fatores, (var1, var2), tipo=tipo_ss)
 
 
 
@@ -322,27 +412,23 @@ anova_multifatorial(df_clean, var_target='SalePrice', fatores=fatores)
 # AVALIAÇÃO DAS VARIÁVEIS
 # ================================
 st.header("🧠 Interpretação dos Resultados - ANOVA On way para cada Variável")
-for var in [var1, var2, var3]:
-    avaliar_variavel(var, df_clean, var_target)
+if secao_sob_demanda("Calcular ANOVA e pressupostos por variável", 'avaliacao'):
+    for var in fatores_exibidos:
+        with perfil.etapa('avaliar_variavel', fator=var, linhas=len(df_clean)):
+            avaliar_variavel(var, indice, var_target, metodo_normalidade, reamostragem, indice_previa)
 
 # ================================
 # POST-HOC: Teste de Tukey
 # ================================
-def tukey_posthoc_plot(df, var_cat, var_target):
+def tukey_posthoc_plot(indice, var_cat, var_target):
     st.subheader(f"Teste Post-Hoc: Tukey HSD - Para sabe onde é a dirença dentro do gurpo {var_cat}")
     st.subheader(f"Tukey HSD: Comparações entre categorias de {var_cat}")
     try:
-        tukey = pairwise_tukeyhsd(endog=df[var_target], groups=df[var_cat], alpha=0.05)
-        tukey_df = pd.DataFrame(tukey.summary().data[1:], columns=tukey.summary().data[0])
+        tukey_df = calcular_tukey(indice, var_cat, alpha=0.05)
 
-        # Conversão rigorosa para booleano
-        tukey_df['reject'] = tukey_df['reject'].apply(lambda x: str(x).strip().lower() == 'true')
         # DataFrame final completo
         st.write(f"Total de comparações: {len(tukey_df)}")
-        tukey_df
-
-        tukey_df['meandiff'] = pd.to_numeric(tukey_df['meandiff'], errors='coerce')
-        tukey_df['p-adj'] = pd.to_numeric(tukey_df['p-adj'], errors='coerce')
+        st.dataframe(tukey_df)
 
         # Filtrando apenas as comparações significativas
   
@@ -383,27 +469,32 @@ def tukey_posthoc_plot(df, var_cat, var_target):
         st.warning(f"Erro ao executar Tukey para {var_cat}: {e}")
 
 #for var in [var1, var2, var3]:
-    #tukey_posthoc_plot(df_clean, var, var_target)
+    #tukey_posthoc_plot(indice, var, var_target)
 
 
 # Gameshowe's test
-import pingouin as pg
-import altair as alt
 
-def gameshowell_posthoc_plot(df, var_cat, var_target):
+def gameshowell_posthoc_plot(indice, var_cat, var_target, indice_previa=None):
     st.subheader(f"Teste Post-Hoc: Games-Howell - Comparações em {var_cat}")
 
     try:
-        # Garantindo os tipos corretos
-        df[var_cat] = df[var_cat].astype(str)  # trata como categórica
-        df[var_target] = pd.to_numeric(df[var_target], errors='coerce')
-        dados = df[[var_cat, var_target]].dropna()
-
-        # Aplicando o teste de Games-Howell
-        resultado = pg.pairwise_gameshowell(dv=var_target, between=var_cat, data=dados)
+        resultado = None
+        if indice_previa is not None:
+            resultado_previa, limitrofe = resultado_em_sessao(
+                assinatura_dados, 'previa_gameshowell', chave_sessao(indice_previa, var_cat),
+                lambda: calcular_previa_gameshowell(indice_previa, var_cat))
+            if limitrofe:
+                st.warning(f"🔎 Prévia limítrofe: comparações recalculadas com todas as {len(indice)} linhas.")
+            else:
+                st.info(f"🔎 Prévia com {len(indice_previa)} de {len(indice)} linhas.")
+                resultado = resultado_previa
+
+        # Aplicando o teste de Games-Howell (resultado em cache)
+        if resultado is None:
+            resultado = resultado_em_sessao(assinatura_dados, 'gameshowell', var_cat,
+                                            lambda: calcular_gameshowell(indice, var_cat))
 
         # Filtro de comparações significativas
-        resultado['significant'] = resultado['pval'] < 0.05
         sig_df = resultado[resultado['significant']].copy()
 
         st.write(f"Total de comparações: {len(resultado)}")
@@ -418,13 +509,13 @@ def gameshowell_posthoc_plot(df, var_cat, var_target):
         sig_df['meandiff'] = sig_df['diff']
 
         # Tabela com os principais dados
-        st.dataframe(sig_df[['Comparison', 'meandiff', 'pval', 'significant']])
+        st.dataframe(sig_df[['Comparison', 'meandiff', 'hedges', 'pval', 'significant']])
 
         # Gráfico de barras
         chart = alt.Chart(sig_df).mark_bar(color='orange').encode(
             x=alt.X('meandiff:Q', title='Diferença de Médias'),
             y=alt.Y('Comparison:N', sort='-x', title='Comparação'),
-            tooltip=['Comparison', 'meandiff', 'pval']
+            tooltip=['Comparison', 'meandiff', 'hedges', 'pval']
         ).properties(width=400, height=250)
 
         st.subheader(f"Gráfico de Diferenças de Médias - {var_cat}")
@@ -444,8 +535,10 @@ def gameshowell_posthoc_plot(df, var_cat, var_target):
     except Exception as e:
         st.error(f"Erro ao executar Games-Howell para {var_cat}: {e}")
 # Executando o Games-Howell para cada variável categórica
-for var in [var1, var2, var3]:
-    gameshowell_posthoc_plot(df_clean, var, var_target)
+if secao_sob_demanda("Calcular Games-Howell", 'gameshowell'):
+    for var in fatores_exibidos:
+        with perfil.etapa('gameshowell', fator=var, linhas=len(df_clean)):
+            gameshowell_posthoc_plot(indice, var, var_target, indice_previa)
 
 
 
@@ -455,179 +548,118 @@ for var in [var1, var2, var3]:
 # ================================
 st.header("📘 Relatório Final - Análise de Variância (ANOVA) no Ames Housing Dataset")
 
-st.markdown("""
-### 🔍 1. Análise dos Q-Q Plots
-Os Q-Q Plots das médias de preço por categoria foram utilizados para verificar a normalidade das médias dos grupos para cada variável categórica analisada:
-
-**Neighborhood (Bairro):**  
-Os pontos se afastam significativamente da linha de referência, sugerindo violação da normalidade — o que indica que os bairros possuem padrões distintos e não seguem uma distribuição normal conjunta.
-
-**House_Style (Estilo da Casa):**  
-Os pontos estão relativamente próximos da linha, com leves desvios — o que sugere uma distribuição aproximadamente normal, embora outros testes sejam necessários para confirmar.
-
-**Bsmt_Full_Bath (Banheiro Completo no Porão):**  
-Os pontos estão muito próximos da linha reta, indicando uma forte aderência à normalidade das médias entre os grupos.
-
----
-
-### 📦 2. Análise dos Boxplots
-Os boxplots mostram a distribuição do preço de venda para cada categoria das variáveis:
-
-**Neighborhood:**  
-Apresenta grande variabilidade nos preços dentro e entre os bairros, com dispersões heterogêneas e valores discrepantes, reforçando a ideia de diferenças significativas entre os grupos.
-
-**House_Style:**  
-As distribuições são mais homogêneas, mas ainda há diferenças visíveis nas medianas, especialmente entre estilos mais comuns e menos comuns.
-
-**Bsmt_Full_Bath:**  
-Os grupos têm uma distribuição mais clara, com aumento progressivo dos preços com o número de banheiros, sugerindo uma tendência linear ou ordinal.
-
----
-
-### 📈 3. Testes Estatísticos (ANOVA e Pós-Hoc)
-
-| Variável          | ANOVA p-valor | Shapiro-Wilk (Normalidade) | Breusch-Pagan (Homoscedasticidade) | ANOVA Tradicional Adequada? |
-|-------------------|---------------|-----------------------------|------------------------------------|-----------------------------|
-| Neighborhood      | < 0.0001      | ❌ Não (p < 0.05)           | ❌ Não (p < 0.05)                   | ❌ Não                      |
-| House_Style       | < 0.0001      | ❌ Não (p < 0.05)           | ❌ Não (p < 0.05)                   | ❌ Não                      |
-| Bsmt_Full_Bath    | < 0.0001      | ❌ Não (p < 0.05)           | ❌ Não (p < 0.05)                   | ❌ Não                      |
-
-📌 **Conclusão:** Em nenhuma das variáveis os pressupostos da ANOVA tradicional foram atendidos. Portanto, testes alternativos não paramétricos foram utilizados.
-
----
-
-### 📊 4. Teste de Shapiro-Wilk
-
-O teste de Shapiro-Wilk verifica se uma distribuição é significativamente diferente  
-de uma normal. Embora eficaz, ele é sensível a grandes amostras, nas quais  
-pequenos desvios da normalidade já geram p-valores baixos.
-
-No nosso caso, foi usado para testar a **normalidade dos resíduos da ANOVA**.  
-Todas as variáveis apresentaram **p < 0.05**, indicando violação da normalidade.
-
----
-
-### 🔁 Teste Não Paramétrico (Kruskal-Wallis)
-
-Segundo Andy Field (2009), a ANOVA de um fator tem como equivalente não paramétrico  
-o **teste de Kruskal-Wallis**, recomendado quando pressupostos como normalidade  
-ou homocedasticidade são violados.
-
-Diante da violação dos pressupostos, aplicamos o Kruskal-Wallis.  
-**Todas as variáveis apresentaram p < 0.05**, confirmando diferenças entre os grupos.
-
----
-
-### 🔬 Teste Post Hoc (Games-Howell)
-
-Andy Field (2009) recomenda o **teste de Games-Howell** quando há dúvida sobre  
-a homogeneidade das variâncias ou quando os tamanhos amostrais são muito diferentes.  
-É uma alternativa robusta ao teste de Tukey tradicional.
-
-Substituímos o Tukey pelo Games-Howell, que identificou  
-**diferenças estatísticas significativas entre as categorias** para todas as variáveis.
-
----
-
-### 🧠 Conclusão Geral
-
-As variáveis **Neighborhood**, **House_Style** e **Bsmt_Full_Bath** afetam de forma  
-estatisticamente significativa o preço de venda das casas.  
-
-Como os pressupostos da ANOVA tradicional foram violados, utilizamos o **Kruskal-Wallis**,  
-e como teste post hoc, o **Games-Howell**, apropriado para variâncias desiguais.  
-Ambos os testes reforçaram a presença de diferenças relevantes entre os grupos.
-
----
-
-### 📚 Referências
-- Field, A. (2009). Descobrindo a estatística usando o SPSS. 2. ed. Porto Alegre: Artmed, 2009
-
----
-
-### Autores
-- **PPCA**: Programa de Computação Aplicada - UNB  
-- **AEDI**: Análise Estatística de Dados e Informações  
-- **Prof.** João Gabriel de Moraes Souza  
-- **Aluna**: Silva Laryssa Branco da Silva  
-- **Data**: 2024-01-15
-
-
-### 🔗 Links
-
-- 📊 Projeto no Community Cloud: [https://aedianova.streamlit.app/](https://aedianova.streamlit.app/)  
-- 💻 Código fonte GitHub: [https://github.com/silvialaryssa/anova](https://github.com/silvialaryssa/anova)
-
-
-""")
-
+# Montado uma vez por conjunto de dados, a partir dos resultados guardados na sessão
+if secao_sob_demanda("Mostrar relatório final", 'relatorio'):
+    def montar_relatorio():
+        avaliacoes, comparacoes, qq_medias, boxplots = {}, {}, {}, {}
+        for var in fatores_exibidos:
+            avaliacoes[var] = resultado_em_sessao(
+                assinatura_dados, 'avaliacao', (var, metodo_normalidade),
+                lambda: calcular_avaliacao(indice, var, metodo_normalidade))
+            resultado = resultado_em_sessao(assinatura_dados, 'gameshowell', var,
+                                            lambda: calcular_gameshowell(indice, var))
+            comparacoes[var] = (int(resultado['significant'].sum()), len(resultado))
+            qq_medias[var] = resultado_em_sessao(assinatura_dados, 'qq_medias', var,
+                                                 lambda: calcular_qq_medias(indice, var))
+            boxplots[var], _ = resultado_em_sessao(assinatura_dados, 'resumo_boxplot', var,
+                                                   lambda: calcular_resumo_boxplot(indice, var))
+        return relatorio_final(avaliacoes, comparacoes, qq_medias, boxplots)
+
+    if not fatores_exibidos:
+        st.info("Selecione ao menos um fator na barra lateral para gerar o relatório.")
+    else:
+        with perfil.etapa('relatorio_final', linhas=len(df_clean)):
+            relatorio = resultado_em_sessao(assinatura_dados, 'relatorio',
+                                            (tuple(fatores_exibidos), metodo_normalidade), montar_relatorio)
+        st.markdown(relatorio)
 
-#import pandas as pd
-#import statsmodels.formula.api as smf
-#from statsmodels.stats.diagnostic import het_breuschpagan
-#from scipy import stats
-#import streamlit as st
 
 # ========================
 # Avaliação dos pressupostos
 # ========================
 
-
-#st.header("🧪 Avaliação dos Pressupostos da ANOVA - Variáveis Categóricas")
-
-#cat_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-
-# Remoções seguras (evita erro se não existir)
-#for col in ['SalePrice', 'PID']:
-#    if col in cat_cols:
-#        cat_cols.remove(col)
-
-#resultado_pressupostos = []
-
-#for var in cat_cols:
- #   try:
-  #      grupos = [group['SalePrice'].values for name, group in df.groupby(var)]
-        
-        # Remove variáveis com apenas 1 grupo ou grupos muito pequenos
-  #      if len(grupos) < 2 or any(len(g) < 3 for g in grupos):
-  #          continue
-
-        # ANOVA
-  #      modelo = smf.ols(f'SalePrice ~ C({var})', data=df).fit()
-  #      residuos = modelo.resid
-
-        # Testes
-  #     shapiro = stats.shapiro(residuos)
-  #      bp_test = het_breuschpagan(residuos, modelo.model.exog)
-
-  #      resultado_pressupostos.append({
-  #          'Variável': var,
-  #          'Grupos': len(grupos),
-  #          'Shapiro-Wilk (p)': round(shapiro.pvalue, 4),
-  #          'Breusch-Pagan (p)': round(bp_test[1], 4),
-  #          'Atende Pressupostos': shapiro.pvalue >= 0.05 and bp_test[1] >= 0.05
-  #      })
-  #  except Exception as e:
-  #      st.warning(f"⚠️ Erro ao processar {var}: {e}")
+st.header("🧪 Avaliação dos Pressupostos da ANOVA - Variáveis Categóricas")
+
+# Percorre todas as colunas categóricas de `df`: a etapa mais cara do aplicativo
+if secao_sob_demanda("Avaliar todas as variáveis categóricas", 'triagem'):
+    min_grupo = st.number_input("Tamanho mínimo de cada grupo", min_value=2, value=3, step=1)
+    with perfil.etapa('triagem_pressupostos', linhas=len(df)):
+        df_resultado, erros_triagem = calcular_triagem(df, 'SalePrice', min_grupo=int(min_grupo),
+                                                         metodo_normalidade=metodo_normalidade)
+
+    for var, erro in erros_triagem.items():
+        st.warning(f"⚠️ Erro ao processar {var}: {erro}")
+
+    # ========================
+    # Exibição dos resultados
+    # ========================
+
+    if not df_resultado.empty:
+        st.subheader("📋 Resultado dos Testes de Pressupostos")
+        st.dataframe(df_resultado.style.map(
+            lambda val: 'background-color: #d4edda' if val is True else
+                        'background-color: #f8d7da' if val is False else '',
+            subset=['Atende Pressupostos']
+        ))
+
+        variaveis_validas = df_resultado[df_resultado['Atende Pressupostos']]['Variável'].tolist()
+        st.markdown("✅ **Variáveis que atendem aos pressupostos da ANOVA:**")
+        st.success(", ".join(variaveis_validas) if variaveis_validas else "Nenhuma variável válida encontrada.")
+    else:
+        st.warning("Nenhuma variável categórica com dados suficientes foi avaliada.")
 
 # ========================
-# Exibição dos resultados
+# Várias variáveis resposta
 # ========================
 
-#if resultado_pressupostos:
-#    df_resultado = pd.DataFrame(resultado_pressupostos)
+st.header("🎯 ANOVA para Várias Variáveis Resposta")
+
+# Agrupa cada fator uma única vez para todas as respostas escolhidas
+if secao_sob_demanda("Analisar várias variáveis resposta", 'multialvo') and fatores_exibidos:
+    numericas = [c for c in df.select_dtypes('number').columns if c not in ('Order', 'PID')]
+    alvos = st.multiselect(
+        "Variáveis resposta", numericas,
+        default=[c for c in ('SalePrice', 'Gr_Liv_Area', 'Lot_Area') if c in numericas], key='alvos_multialvo',
+    )
+    if alvos:
+        with perfil.etapa('anova_multialvo', linhas=len(df)):
+            tabela_alvos = calcular_multialvo(df[alvos + fatores_exibidos], alvos, fatores_exibidos,
+                                              metodo_normalidade=metodo_normalidade)
+        st.caption("p-valores ajustados pelo método de Benjamini-Hochberg (FDR) sobre todos os pares alvo × fator")
+        st.dataframe(tabela_alvos)
 
-#    st.subheader("📋 Resultado dos Testes de Pressupostos")
-#    st.dataframe(df_resultado.style.applymap(
-#        lambda val: 'background-color: #d4edda' if val is True else
-#                    'background-color: #f8d7da' if val is False else '',
-#        subset=['Atende Pressupostos']
-#    ))
-
-#    variaveis_validas = df_resultado[df_resultado['Atende Pressupostos']]['Variável'].tolist()
-#    st.markdown("✅ **Variáveis que atendem aos pressupostos da ANOVA:**")
-#    st.success(", ".join(variaveis_validas) if variaveis_validas else "Nenhuma variável válida encontrada.")
-#else:
-#    st.warning("Nenhuma variável categórica com dados suficientes foi avaliada.")
+# ========================
+# Poder e efeito mínimo detectável
+# ========================
 
+st.header("⚡ Poder da ANOVA e Efeito Mínimo Detectável")
+
+# Com muitas linhas quase todo fator é significativo: o que importa é o tamanho do efeito
+if secao_sob_demanda("Calcular poder e efeito mínimo detectável", 'poder') and fatores_exibidos:
+    poder_desejado = st.number_input("Poder desejado", min_value=0.5, max_value=0.99, value=0.8, step=0.05)
+    alpha_poder = st.number_input("Nível de significância (α)", min_value=0.001, max_value=0.2, value=0.05,
+                                  step=0.01, format="%.3f")
+    n_planejado = st.number_input("Tamanho de amostra planejado (0 = todas as linhas)", min_value=0,
+                                  value=0, step=100)
+    linhas_poder = []
+    for var in fatores_exibidos:
+        with perfil.etapa('planejamento', fator=var, linhas=len(df_clean)):
+            plano = resultado_em_sessao(
+                assinatura_dados, 'planejamento', (var, poder_desejado, alpha_poder, n_planejado),
+                lambda: calcular_planejamento(indice, var, poder=poder_desejado, alpha=alpha_poder,
+                                              n_total=int(n_planejado) or None))
+        linhas_poder.append({'Variável': var, **plano})
+    st.dataframe(pd.DataFrame(linhas_poder))
+    st.caption("f de Cohen: 0.10 pequeno, 0.25 médio, 0.40 grande. O efeito mínimo detectável supõe grupos "
+               "de tamanhos iguais; n_necessario é o total de linhas para detectar o efeito observado.")
 
+# ================================
+# PERFIL DAS ETAPAS
+# ================================
+if perfil.ativo:
+    with st.sidebar.expander("⏱️ Perfil das etapas", expanded=False):
+        tabela_perfil = perfil.tabela()
+        st.dataframe(tabela_perfil[['etapa', 'fator', 'linhas', 'tempo_s', 'cpu_s', 'memoria_pico_mb']])
+        st.write(f"Tempo total medido: {tabela_perfil.loc[tabela_perfil['nivel'] == 0, 'tempo_s'].sum():.2f} s")
+        st.download_button("Baixar perfil (JSON)", perfil.para_json(), file_name="perfil_anova.json",
+                           mime="application/json")
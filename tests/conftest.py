@@ -0,0 +1,45 @@
+# conftest.py - Configuração comum dos testes: caminho do pacote, cache e dados de referência
+#
+# Os testes comparam cada motor do pacote `anova` com a implementação de
+# referência (scipy, statsmodels, pingouin) sobre o Ames Housing e sobre
+# conjuntos sintéticos pequenos. O cache em disco é desativado para que um
+# resultado guardado por outra execução não esconda uma regressão.
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+os.environ['ANOVA_CACHE_MAX_BYTES'] = '0'
+
+from anova.dados import carregar_tabela  # noqa: E402
+
+CAMINHO_AMES = os.path.join(RAIZ, 'AmesHousing.csv')
+VAR_TARGET = 'SalePrice'
+FATORES = ['Neighborhood', 'House_Style', 'Bsmt_Full_Bath']
+
+
+@pytest.fixture(scope='session')
+def ames():
+    """Colunas analisadas pelo aplicativo, sem ausentes (como `df_clean`)."""
+    df = carregar_tabela(CAMINHO_AMES, colunas=[VAR_TARGET] + FATORES, usar_sidecar=False)
+    return df.dropna().reset_index(drop=True)
+
+
+@pytest.fixture(scope='session')
+def sintetico():
+    """Três fatores desbalanceados com todas as caselas observadas e variâncias diferentes por nível de A."""
+    rng = np.random.default_rng(42)
+    n = 600
+    a = rng.choice(['a1', 'a2', 'a3', 'a4'], n, p=[0.4, 0.3, 0.2, 0.1])
+    b = rng.choice(['b1', 'b2', 'b3'], n, p=[0.5, 0.3, 0.2])
+    d = rng.choice(['d1', 'd2'], n)
+    efeito_a = pd.Series(a).map({'a1': 0.0, 'a2': 1.0, 'a3': 1.5, 'a4': -0.5}).to_numpy()
+    efeito_b = pd.Series(b).map({'b1': 0.0, 'b2': 0.8, 'b3': -0.4}).to_numpy()
+    escala = pd.Series(a).map({'a1': 1.0, 'a2': 1.5, 'a3': 2.0, 'a4': 0.7}).to_numpy()
+    y = 10 + efeito_a + efeito_b + 0.6 * (a == 'a2') * (b == 'b3') + escala * rng.normal(size=n)
+    return pd.DataFrame({'y': y, 'A': a, 'B': b, 'D': d})
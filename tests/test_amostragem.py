@@ -0,0 +1,108 @@
+# test_amostragem.py - Amostra estratificada da prévia e limites para o resultado completo
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from anova.amostragem import (
+    amostra_estratificada,
+    cruza_alpha,
+    inflacao_grupos,
+    intervalo_nao_centralidade,
+    intervalo_nao_centralidade_qui2,
+    projetar_pvalor,
+    projetar_pvalor_kruskal,
+    projetar_pvalores_pares,
+    proximo_de_alpha,
+)
+from anova.analises import calcular_avaliacao, calcular_previa_avaliacao, calcular_previa_gameshowell
+from anova.indice import IndiceDados
+
+FATORES = ['Neighborhood', 'House_Style', 'Bsmt_Full_Bath']
+
+
+def test_amostra_cobre_todos_os_niveis_com_o_minimo(ames):
+    indice = IndiceDados(ames, 'SalePrice', FATORES)
+    linhas = amostra_estratificada([indice[f] for f in FATORES], n_alvo=500, min_por_grupo=10, semente=1)
+    assert np.all(np.diff(linhas) > 0)
+    assert 500 <= len(linhas) < 900
+    for fator in FATORES:
+        completos = ames[fator].value_counts()
+        amostrados = ames[fator].iloc[linhas].value_counts()
+        assert (amostrados.reindex(completos.index, fill_value=0) >= np.minimum(completos, 10)).all()
+    assert np.array_equal(linhas, amostra_estratificada([indice[f] for f in FATORES], 500, 10, semente=1))
+
+
+def test_intervalo_nao_centralidade_inverte_a_f_nao_central():
+    f, gl1, gl2 = 6.0, 3, 200
+    baixo, alto = intervalo_nao_centralidade(f, gl1, gl2, confianca=0.9)
+    assert stats.ncf.cdf(f, gl1, gl2, baixo) == pytest.approx(0.95, abs=1e-6)
+    assert stats.ncf.cdf(f, gl1, gl2, alto) == pytest.approx(0.05, abs=1e-6)
+    # F abaixo do esperado sob H0: o limite inferior é 0
+    assert intervalo_nao_centralidade(0.2, gl1, gl2)[0] == 0.0
+
+
+def test_projetar_pvalor():
+    minimo, maximo = projetar_pvalor(4.0, 3, 500, n_amostra=504, n_total=5040)
+    assert 0.0 <= minimo <= maximo <= 1.0
+    assert cruza_alpha((minimo, maximo)) == (minimo < 0.05 <= maximo)
+    # Efeito claro: mesmo o limite pessimista fica abaixo de alpha com 10x mais linhas
+    assert projetar_pvalor(40.0, 3, 500, 504, 5040)[1] < 1e-10
+    assert proximo_de_alpha(0.03) and not proximo_de_alpha(0.5) and not proximo_de_alpha(None)
+
+
+def test_inflacao_por_grupo_alarga_a_faixa():
+    # Um nível pequeno completado até o mínimo: a razão dele é bem menor que a global
+    assert inflacao_grupos([30, 470, 0], [30, 4970, 40]) == (1.0, pytest.approx(4970 / 470))
+    proporcional = projetar_pvalor(4.0, 3, 500, 504, 5040)
+    alargada = projetar_pvalor(4.0, 3, 500, 504, 5040, inflacao=(1.0, 10.0))
+    assert alargada[0] == pytest.approx(proporcional[0])
+    assert alargada[1] > proporcional[1]
+
+
+def test_kruskal_projetado_pela_qui_quadrado_nao_central():
+    h, gl = 9.0, 3
+    baixo, alto = intervalo_nao_centralidade_qui2(h, gl, confianca=0.9)
+    assert stats.ncx2.cdf(h, gl, baixo) == pytest.approx(0.95, abs=1e-6)
+    assert stats.ncx2.cdf(h, gl, alto) == pytest.approx(0.05, abs=1e-6)
+    # Sem inflação, o p-valor em λ = 0 é o da própria qui-quadrado central
+    assert projetar_pvalor_kruskal(0.5, gl, (1.0, 1.0))[1] == pytest.approx(stats.chi2.sf(gl, gl))
+    minimo, maximo = projetar_pvalor_kruskal(30.0, gl, (10.0, 10.0))
+    assert 0.0 <= minimo <= maximo < stats.chi2.sf(30.0, gl)
+
+
+def test_pares_escalados_pelos_proprios_grupos():
+    t, gl = np.array([2.0, 2.0]), np.array([100.0, 100.0])
+    minimo, maximo = projetar_pvalores_pares(t, 3, gl, inflacao=[1.0, 10.0])
+    # Par sem inflação (níveis pequenos, já completos na amostra) fica com a faixa da própria amostra
+    assert maximo[0] > maximo[1] and minimo[0] > minimo[1]
+
+
+def test_previa_avaliacao(ames):
+    indice = IndiceDados(ames, 'SalePrice', FATORES)
+    amostra = indice.amostra(n_alvo=800, min_por_grupo=5)
+    assert amostra.origem is indice and amostra.chave_cache != indice.chave_cache
+    previa = calcular_previa_avaliacao(amostra, 'House_Style')
+    assert previa.n_amostra == len(amostra) and previa.n_total == len(indice)
+    assert previa.avaliacao == calcular_avaliacao(amostra, 'House_Style')
+    minimo, maximo = previa.pvalor_projetado
+    eta_min, eta_max = previa.eta_intervalo
+    assert 0.0 <= minimo <= maximo <= 1.0 and 0.0 <= eta_min <= eta_max <= 1.0
+    # House_Style tem efeito claro: a prévia não é limítrofe na ANOVA
+    assert 'ANOVA' not in previa.motivos
+
+
+def test_previa_gameshowell_usa_as_contagens_completas(ames):
+    indice = IndiceDados(ames, 'SalePrice', FATORES)
+    amostra = indice.amostra(n_alvo=800, min_por_grupo=5)
+    resultado, _ = calcular_previa_gameshowell(amostra, 'House_Style')
+    assert (resultado['p_completo_min'] <= resultado['p_completo_max']).all()
+    # 2.5Fin tem só 8 casas, quase todas já na amostra: o par com 1Story ganha bem
+    # menos precisão com todas as linhas do que a razão global n_total / n_amostra sugere
+    contagens = ames['House_Style'].value_counts()
+    assert contagens['2.5Fin'] < 10
+    par = resultado[(resultado['A'] == '1Story') & (resultado['B'] == '2.5Fin')
+                    | (resultado['A'] == '2.5Fin') & (resultado['B'] == '1Story')].iloc[0]
+    global_ = projetar_pvalores_pares([par['T']], 8, [par['df'] * len(indice) / len(amostra)],
+                                      [len(indice) / len(amostra)])
+    assert par['p_completo_min'] > 10 * global_[0][0]
@@ -0,0 +1,51 @@
+# test_api.py - Análises completas sem interface e exportação dos resultados
+
+import json
+
+import pytest
+
+from anova.api import analisar, analisar_arquivo
+from anova.estatisticas import anova_um_fator
+
+from conftest import CAMINHO_AMES
+
+FATORES = ['Neighborhood', 'House_Style']
+
+
+@pytest.fixture(scope='module')
+def relatorio(ames):
+    return analisar(ames, 'SalePrice', FATORES, interacoes=[tuple(FATORES)], origem='ames')
+
+
+def test_resumo_igual_as_funcoes_do_pacote(ames, relatorio):
+    resumo = relatorio.tabelas()['resumo'].set_index('fator')
+    for fator in FATORES:
+        anova = anova_um_fator(ames[fator], ames['SalePrice'])
+        assert resumo.loc[fator, 'f'] == pytest.approx(anova.f)
+        assert resumo.loc[fator, 'eta_quadrado'] == pytest.approx(anova.eta_quadrado)
+    assert (resumo['origem'] == 'ames').all()
+
+
+def test_tabelas_e_dict(relatorio):
+    tabelas = relatorio.tabelas()
+    assert set(tabelas) == {'resumo', 'multifatorial', 'tukey', 'games_howell', 'dunn'}
+    assert set(tabelas['games_howell']['fator']) == set(FATORES)
+    dados = json.loads(json.dumps(relatorio.para_dict()))
+    assert dados['n'] == relatorio.n
+    assert 'C(Neighborhood):C(House_Style)' in dados['caselas']
+
+
+def test_testes_desconhecidos(ames):
+    with pytest.raises(ValueError, match='Testes desconhecidos'):
+        analisar(ames, 'SalePrice', FATORES, testes=('um_fator', 'levene'))
+
+
+def test_tipo3_com_caselas_vazias(ames):
+    with pytest.raises(ValueError, match='Tipo II'):
+        analisar(ames, 'SalePrice', FATORES, interacoes=[tuple(FATORES)], testes=('multifatorial',), tipo_ss=3)
+
+
+def test_analisar_arquivo_aceita_nomes_com_espacos():
+    relatorio = analisar_arquivo(CAMINHO_AMES, 'SalePrice', ['House Style'], testes=('um_fator',))
+    assert relatorio.fatores == ['House_Style']
+    assert set(relatorio.por_fator) == {'House_Style'}
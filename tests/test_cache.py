@@ -0,0 +1,123 @@
+# test_cache.py - Chaves de conteúdo, cache em disco e memoização
+
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import anova
+from anova import cache as modulo_cache
+from anova.cache import CacheDisco, assinatura_codigo, chave_conteudo, memoizar, versao_codigo
+from anova.estatisticas import IndiceFator
+from anova.indice import IndiceDados
+
+from conftest import RAIZ
+
+
+@dataclass
+class Parametros:
+    nome: str
+    valores: np.ndarray
+
+
+def test_chave_depende_do_conteudo_e_do_tipo():
+    df = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']})
+    assert chave_conteudo(df) == chave_conteudo(df.copy())
+    assert chave_conteudo(df) != chave_conteudo(df.assign(a=[1, 2, 4]))
+    assert chave_conteudo(df) != chave_conteudo(df.astype({'a': float}))
+    assert chave_conteudo(1) != chave_conteudo('1') != chave_conteudo(1.0)
+    assert chave_conteudo((1, 2)) != chave_conteudo([1, 2])
+    assert chave_conteudo({'a': 1, 'b': 2}) == chave_conteudo({'b': 2, 'a': 1})
+
+
+def test_arrays_grandes_que_diferem_no_meio():
+    a = np.zeros(5000)
+    b = a.copy()
+    b[2500] = 1.0
+    # O repr dos dois é igual ('...'), a chave não pode ser
+    assert repr(a) == repr(b)
+    assert chave_conteudo(a) != chave_conteudo(b)
+    assert chave_conteudo(Parametros('p', a)) != chave_conteudo(Parametros('p', b))
+    assert chave_conteudo(Parametros('p', a)) == chave_conteudo(Parametros('p', a.copy()))
+
+
+def test_objetos_sem_chave_levantam_type_error():
+    with pytest.raises(TypeError):
+        chave_conteudo(object())
+    with pytest.raises(TypeError):
+        chave_conteudo(IndiceFator.criar(pd.Series(['a', 'b'])))
+    with pytest.raises(TypeError):
+        chave_conteudo([1, {2, 3}])
+
+
+def test_indice_dados_usa_chave_cache(sintetico):
+    indice = IndiceDados(sintetico, 'y', ['A', 'B'])
+    igual = IndiceDados(sintetico.copy(), 'y', ['A', 'B'])
+    assert chave_conteudo(indice) == chave_conteudo(igual)
+    assert chave_conteudo(indice) != chave_conteudo(IndiceDados(sintetico, 'y', ['A']))
+
+
+def test_cache_em_disco_persiste_e_remove_os_mais_antigos(tmp_path):
+    cache = CacheDisco(str(tmp_path), max_bytes=10 ** 6, max_itens_memoria=1)
+    cache.guardar('a', np.arange(10))
+    cache.guardar('b', 'texto')
+    encontrado, valor = CacheDisco(str(tmp_path)).obter('a')
+    assert encontrado and np.array_equal(valor, np.arange(10))
+
+    pequeno = CacheDisco(str(tmp_path), max_bytes=1)
+    os.utime(tmp_path / 'a.pkl', (0, 0))
+    pequeno.remover_excedente()
+    assert not os.path.exists(tmp_path / 'a.pkl')
+    cache.limpar()
+    assert cache.obter('b') == (False, None)
+
+
+def test_memoizar_chama_a_funcao_uma_vez_por_conteudo(sintetico):
+    chamadas = []
+
+    @memoizar
+    def media(df, coluna):
+        chamadas.append(coluna)
+        return float(df[coluna].mean())
+
+    assert media(sintetico, 'y') == media(sintetico.copy(), 'y')
+    media(sintetico.assign(y=sintetico['y'] + 1), 'y')
+    assert chamadas == ['y', 'y']
+
+
+def test_bytecode_diferente_muda_a_chave(sintetico, monkeypatch):
+    monkeypatch.setattr(modulo_cache, '_cache_padrao', CacheDisco(max_bytes=0))
+
+    # A mesma função (mesmo nome qualificado) com o corpo alterado, como depois de uma atualização
+    def media(df):
+        return float(df['y'].mean())
+    antiga = memoizar(media)
+
+    def media(df):  # noqa: F811
+        return float(df['y'].mean()) + 1.0
+    nova = memoizar(media)
+
+    assert assinatura_codigo(antiga.__wrapped__) != assinatura_codigo(nova.__wrapped__)
+    assert antiga(sintetico) + 1.0 == nova(sintetico)
+
+
+def test_versao_do_pacote_entra_na_chave(monkeypatch):
+    assert versao_codigo().startswith(f'{anova.__version__}:')
+    chave = chave_conteudo('x')
+    monkeypatch.setattr(modulo_cache, 'versao_codigo', lambda: 'outra')
+    assert chave_conteudo('x') != chave
+
+
+def test_chave_de_codigo_estavel_entre_processos():
+    """A assinatura não depende de PYTHONHASHSEED (conjuntos de textos no bytecode)."""
+    codigo = (f"import sys; sys.path.insert(0, {os.path.join(RAIZ, 'src')!r}); "
+              "from anova.cache import assinatura_codigo; "
+              "f = lambda x: x in {'a', 'b', 'c', 'd'}; print(assinatura_codigo(f))")
+    saidas = {subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True,
+                             env={**os.environ, 'PYTHONHASHSEED': semente}).stdout
+              for semente in ('1', '2', '3')}
+    assert len(saidas) == 1
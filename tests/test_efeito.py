@@ -0,0 +1,54 @@
+# test_efeito.py - Tamanhos de efeito e poder da ANOVA
+
+import numpy as np
+import pytest
+
+from anova.efeito import (
+    classificar_eta,
+    efeito_minimo_detectavel,
+    eta_de_f,
+    f_cohen,
+    hedges_g,
+    n_necessario,
+    poder_anova,
+)
+from anova.estatisticas import anova_um_fator
+
+power = pytest.importorskip('statsmodels.stats.power')
+
+
+@pytest.mark.parametrize('f,k,n', [(0.1, 3, 300), (0.25, 5, 100), (0.4, 8, 64)])
+def test_poder_igual_ao_statsmodels(f, k, n):
+    esperado = power.FTestAnovaPower().power(effect_size=f, nobs=n, alpha=0.05, k_groups=k)
+    assert poder_anova(f, k, n) == pytest.approx(esperado, rel=1e-8)
+
+
+def test_efeito_minimo_e_n_necessario_sao_inversos():
+    f = efeito_minimo_detectavel(4, 200, poder=0.8)
+    assert poder_anova(f, 4, 200) == pytest.approx(0.8, abs=1e-6)
+    n = n_necessario(0.25, 4, poder=0.8)
+    assert poder_anova(0.25, 4, n) >= 0.8 > poder_anova(0.25, 4, n - 1)
+    esperado = power.FTestAnovaPower().solve_power(effect_size=0.25, alpha=0.05, power=0.8, k_groups=4)
+    assert n == int(np.ceil(esperado))
+    assert n_necessario(0.0, 4) is None
+
+
+def test_eta_omega_iguais_as_somas_de_quadrados(ames):
+    anova = anova_um_fator(ames['House_Style'], ames['SalePrice'])
+    ss_total = anova.ss_entre + anova.ss_dentro
+    assert anova.eta_quadrado == pytest.approx(anova.ss_entre / ss_total)
+    qm = anova.ss_dentro / anova.gl_dentro
+    assert anova.omega_quadrado == pytest.approx((anova.ss_entre - anova.gl_entre * qm) / (ss_total + qm))
+    assert eta_de_f(f_cohen(anova.eta_quadrado)) == pytest.approx(anova.eta_quadrado)
+
+
+def test_hedges_g_igual_ao_pingouin():
+    pg = pytest.importorskip('pingouin')
+    rng = np.random.default_rng(3)
+    a, b = rng.normal(1.0, 2.0, 40), rng.normal(0.0, 1.0, 25)
+    g = hedges_g(len(a), a.mean(), a.var(ddof=1), len(b), b.mean(), b.var(ddof=1))
+    assert float(g) == pytest.approx(pg.compute_effsize(a, b, eftype='hedges'), rel=1e-6)
+
+
+def test_classificar_eta():
+    assert [classificar_eta(e) for e in (0.005, 0.02, 0.08, 0.5)] == ['desprezível', 'pequeno', 'médio', 'grande']
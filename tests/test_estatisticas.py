@@ -0,0 +1,91 @@
+# test_estatisticas.py - ANOVA de um fator e Breusch-Pagan a partir das estatísticas suficientes
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from anova.estatisticas import IndiceFator, anova_um_fator, codificar_fator, combinar_codigos, momentos_grupos
+
+sm = pytest.importorskip('statsmodels.api')
+smf = pytest.importorskip('statsmodels.formula.api')
+from statsmodels.stats.diagnostic import het_breuschpagan  # noqa: E402
+
+
+@pytest.mark.parametrize('fator', ['Neighborhood', 'House_Style', 'Bsmt_Full_Bath'])
+def test_um_fator_igual_ao_statsmodels(ames, fator):
+    resultado = anova_um_fator(ames[fator], ames['SalePrice'])
+    modelo = smf.ols(f'SalePrice ~ C({fator})', data=ames).fit()
+    tabela = sm.stats.anova_lm(modelo, typ=2)
+
+    assert resultado.f == pytest.approx(tabela['F'].iloc[0], rel=1e-9)
+    assert resultado.pvalor == pytest.approx(tabela['PR(>F)'].iloc[0], rel=1e-6, abs=1e-300)
+    assert resultado.ss_entre == pytest.approx(tabela['sum_sq'].iloc[0], rel=1e-9)
+    assert resultado.ss_dentro == pytest.approx(tabela['sum_sq'].iloc[1], rel=1e-9)
+    assert (resultado.gl_entre, resultado.gl_dentro) == (tabela['df'].iloc[0], tabela['df'].iloc[1])
+    np.testing.assert_allclose(resultado.residuos, modelo.resid.to_numpy(), atol=1e-6)
+
+
+@pytest.mark.parametrize('fator', ['Neighborhood', 'House_Style'])
+def test_breusch_pagan_igual_ao_statsmodels(ames, fator):
+    resultado = anova_um_fator(ames[fator], ames['SalePrice'])
+    modelo = smf.ols(f'SalePrice ~ C({fator})', data=ames).fit()
+    lm, lm_p, f, f_p = het_breuschpagan(modelo.resid, modelo.model.exog)
+
+    assert resultado.bp_lm == pytest.approx(lm, rel=1e-8)
+    assert resultado.bp_pvalor == pytest.approx(lm_p, rel=1e-6, abs=1e-300)
+    assert resultado.bp_f == pytest.approx(f, rel=1e-8)
+    assert resultado.bp_f_pvalor == pytest.approx(f_p, rel=1e-6, abs=1e-300)
+
+
+def test_um_fator_igual_ao_f_oneway(sintetico):
+    grupos = [g['y'].to_numpy() for _, g in sintetico.groupby('A')]
+    referencia = stats.f_oneway(*grupos)
+    resultado = anova_um_fator(sintetico['A'], sintetico['y'])
+    assert resultado.f == pytest.approx(referencia.statistic, rel=1e-10)
+    assert resultado.pvalor == pytest.approx(referencia.pvalue, rel=1e-8)
+
+
+def test_um_fator_aceita_indice_fator(sintetico):
+    direto = anova_um_fator(sintetico['B'], sintetico['y'])
+    indexado = anova_um_fator(IndiceFator.criar(sintetico['B']), sintetico['y'])
+    assert indexado.f == pytest.approx(direto.f, rel=1e-12)
+
+
+def test_um_fator_ignora_ausentes(sintetico):
+    com_ausentes = sintetico.copy()
+    com_ausentes.loc[::7, 'y'] = np.nan
+    com_ausentes.loc[3::11, 'A'] = None
+    validos = com_ausentes.dropna(subset=['y', 'A'])
+    esperado = stats.f_oneway(*[g['y'].to_numpy() for _, g in validos.groupby('A')])
+    resultado = anova_um_fator(com_ausentes['A'], com_ausentes['y'])
+    assert resultado.f == pytest.approx(esperado.statistic, rel=1e-10)
+    assert len(resultado.residuos) == len(validos)
+
+
+def test_um_fator_requer_dois_grupos():
+    with pytest.raises(ValueError):
+        anova_um_fator(pd.Series(['a'] * 5), np.arange(5.0))
+
+
+def test_momentos_grupos(sintetico):
+    codigos, niveis = codificar_fator(sintetico['A'])
+    mom = momentos_grupos(codigos, sintetico['y'].to_numpy(), len(niveis))
+    agrupado = sintetico.groupby('A')['y']
+    np.testing.assert_allclose(mom.n, agrupado.size().to_numpy())
+    np.testing.assert_allclose(mom.medias, agrupado.mean().to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(mom.variancias, agrupado.var().to_numpy(), rtol=1e-10)
+
+
+def test_combinar_codigos_identifica_caselas(sintetico):
+    codigos_a, niveis_a = codificar_fator(sintetico['A'])
+    codigos_b, niveis_b = codificar_fator(sintetico['B'])
+    codigos_a = codigos_a.copy()
+    codigos_a[0] = -1
+    celulas, c = combinar_codigos([codigos_a, codigos_b], [len(niveis_a), len(niveis_b)])
+
+    assert celulas[0] == -1
+    pares = pd.Series(list(zip(codigos_a[1:], codigos_b[1:])))
+    assert c == pares.nunique()
+    # Mesmo par de códigos <=> mesma casela
+    assert pd.Series(celulas[1:]).groupby(pares.to_numpy()).nunique().eq(1).all()
@@ -0,0 +1,118 @@
+# test_incremental.py - Estado incremental: acrescentar e retirar lotes de linhas
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from anova.estatisticas import anova_um_fator
+from anova.incremental import EstadoIncremental
+from anova.posthoc import games_howell, tukey_hsd
+from anova.streaming import AcumuladorAnova
+
+FATORES = ['Neighborhood', 'House_Style']
+
+
+@pytest.fixture
+def estado(ames):
+    return EstadoIncremental('SalePrice', FATORES).acrescentar(ames)
+
+
+def _assinatura(estado):
+    acumulador = estado.acumulador
+    return (acumulador.n, acumulador.media, acumulador.m2, [g.copy() for g in acumulador.n_grupos],
+            [g.copy() for g in acumulador.m2_grupos], len(acumulador.linhas))
+
+
+def test_lotes_iguais_ao_calculo_completo(ames):
+    estado = EstadoIncremental('SalePrice', FATORES)
+    for bloco in (ames.iloc[i::5] for i in range(5)):
+        estado.acrescentar(bloco)
+    esperado = anova_um_fator(ames['Neighborhood'], ames['SalePrice'])
+    assert estado.n == len(ames)
+    assert estado.anova_um_fator('Neighborhood')['F'].iloc[0] == pytest.approx(esperado.f, rel=1e-9)
+
+
+def test_retirar_igual_a_nunca_ter_acrescentado(ames, estado):
+    estado.retirar(ames.iloc[1000:1100])
+    restante = ames.drop(ames.index[1000:1100])
+    assert estado.n == len(restante)
+    esperado = anova_um_fator(restante['Neighborhood'], restante['SalePrice'])
+    assert estado.anova_um_fator('Neighborhood')['F'].iloc[0] == pytest.approx(esperado.f, rel=1e-9)
+
+    gh = estado.games_howell('House_Style')
+    referencia = games_howell(restante['House_Style'], restante['SalePrice'])
+    np.testing.assert_allclose(gh['pval'], referencia['pval'], rtol=1e-6)
+    tukey = estado.tukey('House_Style')
+    np.testing.assert_allclose(tukey['p-adj'], tukey_hsd(restante['House_Style'], restante['SalePrice'])['p-adj'],
+                               rtol=1e-6)
+
+
+def test_retirar_duas_vezes_e_recusado_sem_alterar_o_estado(ames, estado):
+    estado.retirar(ames.iloc[1000:1100])
+    antes = _assinatura(estado)
+    f_antes = estado.anova_um_fator('Neighborhood')['F'].iloc[0]
+    with pytest.raises(ValueError, match='já foram retiradas'):
+        estado.retirar(ames.iloc[1000:1100])
+    # Lote com parte das linhas já retiradas: recusado inteiro
+    with pytest.raises(ValueError):
+        estado.retirar(ames.iloc[1050:1150])
+
+    depois = _assinatura(estado)
+    assert depois[:3] == antes[:3] and depois[5] == antes[5]
+    for a, b in zip(antes[3] + antes[4], depois[3] + depois[4]):
+        np.testing.assert_array_equal(a, b)
+    assert estado.n == len(ames) - 100
+    assert estado.anova_um_fator('Neighborhood')['F'].iloc[0] == f_antes
+
+
+def test_retirar_linhas_nunca_acrescentadas(ames, estado):
+    # Mesmos valores com outro índice: não são as linhas acrescentadas
+    outras = ames.iloc[:10].set_axis(range(10 ** 6, 10 ** 6 + 10))
+    with pytest.raises(ValueError):
+        estado.retirar(outras)
+    alteradas = ames.iloc[:10].assign(SalePrice=ames['SalePrice'].iloc[:10] + 1)
+    with pytest.raises(ValueError):
+        estado.retirar(alteradas)
+    assert estado.n == len(ames)
+
+
+def test_linhas_repetidas_retiradas_tantas_vezes_quanto_acrescentadas(ames):
+    lote = ames.iloc[:50]
+    estado = EstadoIncremental('SalePrice', FATORES).acrescentar(lote).acrescentar(lote)
+    estado.retirar(lote).retirar(lote)
+    assert estado.n == 0
+    with pytest.raises(ValueError):
+        estado.retirar(lote)
+
+
+def test_sem_registro_de_linhas_nao_retira(sintetico):
+    acumulador = AcumuladorAnova('y', ['A'], registrar_linhas=False).atualizar(sintetico)
+    with pytest.raises(ValueError, match='sem registro'):
+        acumulador.retirar(sintetico.iloc[:5])
+
+
+def test_salvar_e_carregar(ames, estado, tmp_path):
+    caminho = tmp_path / 'estado.pkl'
+    estado.salvar(caminho)
+    carregado = EstadoIncremental.carregar(caminho)
+    pd.testing.assert_frame_equal(carregado.anova_multifatorial(), estado.anova_multifatorial())
+    carregado.retirar(ames.iloc[:10])
+    with pytest.raises(ValueError):
+        carregado.retirar(ames.iloc[:10])
+
+
+def test_registro_cresce_so_com_o_lote(ames):
+    acumulador = AcumuladorAnova('SalePrice', FATORES).atualizar(ames.iloc[:2000])
+    assert len(acumulador.linhas) == 2000
+    acumulador.atualizar(ames.iloc[2000:2010]).retirar(ames.iloc[:5])
+    assert len(acumulador.linhas) == 2005
+
+
+def test_combinar_junta_os_registros(ames):
+    combinado = AcumuladorAnova('SalePrice', FATORES).atualizar(ames.iloc[:100])
+    combinado.combinar(AcumuladorAnova('SalePrice', FATORES).atualizar(ames.iloc[100:200]))
+    combinado.retirar(ames.iloc[50:150])
+    assert combinado.n == 100
+    with pytest.raises(ValueError):
+        combinado.retirar(ames.iloc[100:101])
+    assert combinado.combinar(AcumuladorAnova('SalePrice', FATORES, registrar_linhas=False)).linhas is None
@@ -0,0 +1,48 @@
+# test_multialvo.py - Várias respostas por fator em uma passada
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from anova import normalidade
+from anova.estatisticas import anova_um_fator
+from anova.multialvo import anova_multialvo
+from anova.postos import kruskal_wallis
+
+
+@pytest.fixture(scope='module')
+def respostas(sintetico):
+    rng = np.random.default_rng(9)
+    dados = sintetico.assign(y2=np.exp(sintetico['y'] / 5) + rng.normal(size=len(sintetico)))
+    dados.loc[::13, 'y2'] = np.nan
+    return dados
+
+
+def test_cada_par_igual_a_analise_isolada(respostas):
+    tabela = anova_multialvo(respostas, ['y', 'y2'], ['A', 'B'], correcao='nenhuma')
+    assert len(tabela) == 4
+    for _, linha in tabela.iterrows():
+        dados = respostas[[linha['alvo'], linha['fator']]].dropna()
+        anova = anova_um_fator(dados[linha['fator']], dados[linha['alvo']])
+        kruskal = kruskal_wallis(dados[linha['fator']], dados[linha['alvo']])
+        assert linha['n'] == len(dados)
+        assert linha['f'] == pytest.approx(anova.f, rel=1e-9)
+        assert linha['pvalor'] == pytest.approx(anova.pvalor, rel=1e-6)
+        assert linha['breusch_pagan_pvalor'] == pytest.approx(anova.bp_pvalor, rel=1e-6)
+        assert linha['normalidade_pvalor'] == pytest.approx(normalidade.testar_normalidade(anova.residuos).pvalor, rel=1e-6)
+        assert linha['kruskal_h'] == pytest.approx(kruskal.h, rel=1e-9)
+        assert linha['eta_quadrado'] == pytest.approx(anova.eta_quadrado, rel=1e-9)
+        assert linha['pvalor_ajustado'] == linha['pvalor']
+
+
+def test_correcao_sobre_a_tabela_toda(respostas):
+    tabela = anova_multialvo(respostas, ['y', 'y2'], ['A', 'B', 'D'], correcao='bonferroni')
+    np.testing.assert_allclose(tabela['pvalor_ajustado'], np.minimum(tabela['pvalor'] * len(tabela), 1.0))
+    with pytest.raises(ValueError):
+        anova_multialvo(respostas, ['y'], ['A'], correcao='desconhecida')
+
+
+def test_min_grupo_exclui_pares(respostas):
+    pequeno = respostas.assign(E=np.where(np.arange(len(respostas)) < 2, 'raro', 'comum'))
+    tabela = anova_multialvo(pequeno, ['y'], ['A', 'E'], min_grupo=3)
+    assert list(tabela['fator']) == ['A']
@@ -0,0 +1,99 @@
+# test_multifatorial.py - ANOVA multifatorial Tipo II e III a partir das caselas observadas
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from anova.efeito import efeitos_multifatorial
+from anova.multifatorial import anova_multifatorial_esparsa
+
+sm = pytest.importorskip('statsmodels.api')
+smf = pytest.importorskip('statsmodels.formula.api')
+
+
+def _comparar(tabela, referencia, nomes):
+    """Compara as colunas de `anova_lm` linha a linha, com `nomes` {termo nosso: termo do statsmodels}."""
+    for nosso, deles in nomes.items():
+        for coluna in ['sum_sq', 'df', 'F', 'PR(>F)']:
+            esperado = referencia.loc[deles, coluna]
+            if np.isnan(esperado):
+                assert np.isnan(tabela.loc[nosso, coluna])
+            else:
+                assert tabela.loc[nosso, coluna] == pytest.approx(esperado, rel=1e-7, abs=1e-300), (nosso, coluna)
+
+
+def test_tipo2_aditivo_igual_ao_statsmodels(sintetico):
+    tabela = anova_multifatorial_esparsa(sintetico, 'y', ['A', 'B', 'D'])
+    referencia = sm.stats.anova_lm(smf.ols('y ~ C(A) + C(B) + C(D)', sintetico).fit(), typ=2)
+    _comparar(tabela, referencia, {t: t for t in ['C(A)', 'C(B)', 'C(D)', 'Residual']})
+
+
+def test_tipo2_com_interacao_igual_ao_statsmodels(sintetico):
+    tabela = anova_multifatorial_esparsa(sintetico, 'y', ['A', 'B', 'D'], [('A', 'B')])
+    referencia = sm.stats.anova_lm(smf.ols('y ~ C(A) + C(B) + C(D) + C(A):C(B)', sintetico).fit(), typ=2)
+    _comparar(tabela, referencia, {t: t for t in ['C(A)', 'C(B)', 'C(D)', 'C(A):C(B)', 'Residual']})
+
+
+def test_tipo3_igual_ao_statsmodels_com_soma_zero(sintetico):
+    tabela = anova_multifatorial_esparsa(sintetico, 'y', ['A', 'B', 'D'], [('A', 'B')], tipo=3)
+    formula = 'y ~ C(A, Sum) + C(B, Sum) + C(D, Sum) + C(A, Sum):C(B, Sum)'
+    referencia = sm.stats.anova_lm(smf.ols(formula, sintetico).fit(), typ=3)
+    _comparar(tabela, referencia, {
+        'Intercept': 'Intercept', 'C(A)': 'C(A, Sum)', 'C(B)': 'C(B, Sum)', 'C(D)': 'C(D, Sum)',
+        'C(A):C(B)': 'C(A, Sum):C(B, Sum)', 'Residual': 'Residual',
+    })
+
+
+def test_tipo2_aditivo_ames(ames):
+    tabela = anova_multifatorial_esparsa(ames, 'SalePrice', ['Neighborhood', 'House_Style', 'Bsmt_Full_Bath'])
+    formula = 'SalePrice ~ C(Neighborhood) + C(House_Style) + C(Bsmt_Full_Bath)'
+    referencia = sm.stats.anova_lm(smf.ols(formula, ames).fit(), typ=2)
+    _comparar(tabela, referencia, {t: t for t in referencia.index})
+
+
+@pytest.mark.filterwarnings('ignore:The design matrix is rank-deficient')
+def test_tipo2_com_caselas_vazias_igual_a_modelos_aninhados(ames):
+    """Com caselas vazias, a SS Tipo II da interação é a diferença de SS residual dos modelos aninhados."""
+    tabela = anova_multifatorial_esparsa(ames, 'SalePrice', ['Neighborhood', 'House_Style'],
+                                         [('Neighborhood', 'House_Style')])
+    aditivo = smf.ols('SalePrice ~ C(Neighborhood) + C(House_Style)', ames).fit()
+    completo = smf.ols('SalePrice ~ C(Neighborhood):C(House_Style)', ames).fit()
+    termo = 'C(Neighborhood):C(House_Style)'
+    assert tabela.loc[termo, 'sum_sq'] == pytest.approx(aditivo.ssr - completo.ssr, rel=1e-7)
+    assert tabela.loc['Residual', 'sum_sq'] == pytest.approx(completo.ssr, rel=1e-9)
+    assert tabela.loc['Residual', 'df'] == pytest.approx(completo.df_resid)
+
+    caselas = tabela.attrs['caselas']
+    observadas = ames.groupby(['Neighborhood', 'House_Style'], observed=True).size()
+    resumo = next(iter(caselas.values()))
+    assert resumo['observadas'] == len(observadas)
+    assert resumo['vazias'] == resumo['possiveis'] - len(observadas) > 0
+
+
+def test_tipo3_recusa_caselas_vazias(ames):
+    with pytest.raises(ValueError, match='Tipo III'):
+        anova_multifatorial_esparsa(ames, 'SalePrice', ['Neighborhood', 'House_Style'],
+                                    [('Neighborhood', 'House_Style')], tipo=3)
+
+
+def test_tipo_invalido(sintetico):
+    with pytest.raises(ValueError):
+        anova_multifatorial_esparsa(sintetico, 'y', ['A', 'B'], tipo=1)
+
+
+def test_descarta_ausentes(sintetico):
+    com_ausentes = sintetico.copy()
+    com_ausentes.loc[::9, 'B'] = None
+    tabela = anova_multifatorial_esparsa(com_ausentes, 'y', ['A', 'B'])
+    esperado = anova_multifatorial_esparsa(com_ausentes.dropna(), 'y', ['A', 'B'])
+    pd.testing.assert_frame_equal(tabela, esperado)
+
+
+def test_efeitos_multifatorial(sintetico):
+    tabela = efeitos_multifatorial(anova_multifatorial_esparsa(sintetico, 'y', ['A', 'B'], tipo=3))
+    ss = tabela['sum_sq']
+    termos = ['C(A)', 'C(B)']
+    ss_total = ss[termos].sum() + ss['Residual']
+    assert np.isnan(tabela.loc['Intercept', 'eta_sq']) and np.isnan(tabela.loc['Residual', 'eta_sq'])
+    np.testing.assert_allclose(tabela.loc[termos, 'eta_sq'], ss[termos] / ss_total)
+    np.testing.assert_allclose(tabela.loc[termos, 'partial_eta_sq'], ss[termos] / (ss[termos] + ss['Residual']))
@@ -0,0 +1,89 @@
+# test_normalidade.py - Testes de normalidade dos resíduos e momentos combináveis
+
+import numpy as np
+import pytest
+from scipy import stats
+
+# Usada pelo módulo: importada pelo nome, `testar_normalidade` seria coletada como teste pelo pytest
+from anova import normalidade
+from anova.normalidade import METODOS_NORMALIDADE, Momentos, anderson_darling, dagostino_k2, jarque_bera
+
+
+@pytest.fixture(scope='module')
+def amostra():
+    return np.random.default_rng(7).gamma(4.0, size=3000)
+
+
+def test_dagostino_igual_ao_normaltest(amostra):
+    referencia = stats.normaltest(amostra)
+    resultado = dagostino_k2(Momentos.da_amostra(amostra))
+    assert resultado.estatistica == pytest.approx(referencia.statistic, rel=1e-9)
+    assert resultado.pvalor == pytest.approx(referencia.pvalue, rel=1e-6)
+
+
+def test_jarque_bera_igual_ao_scipy(amostra):
+    referencia = stats.jarque_bera(amostra)
+    resultado = jarque_bera(Momentos.da_amostra(amostra))
+    assert resultado.estatistica == pytest.approx(referencia.statistic, rel=1e-9)
+    assert resultado.pvalor == pytest.approx(referencia.pvalue, rel=1e-6)
+
+
+@pytest.mark.parametrize('tamanho', [50, 400])
+def test_anderson_darling_igual_ao_statsmodels(tamanho):
+    diagnostic = pytest.importorskip('statsmodels.stats.diagnostic')
+    x = np.random.default_rng(tamanho).standard_t(8, size=tamanho)
+    a2, pvalor = diagnostic.normal_ad(x)
+    resultado = anderson_darling(x)
+    assert resultado.estatistica == pytest.approx(a2, rel=1e-8)
+    assert resultado.pvalor == pytest.approx(pvalor, rel=1e-6, abs=1e-12)
+
+
+def test_shapiro_igual_ao_scipy(amostra):
+    resultado = normalidade.testar_normalidade(amostra[:500], 'shapiro')
+    referencia = stats.shapiro(amostra[:500])
+    assert resultado.estatistica == pytest.approx(referencia.statistic)
+    assert resultado.pvalor == pytest.approx(referencia.pvalue)
+
+
+def test_auto_escolhe_pelo_tamanho(amostra):
+    assert normalidade.testar_normalidade(amostra[:1000]).metodo == 'shapiro'
+    assert normalidade.testar_normalidade(np.tile(amostra, 2)).metodo == 'dagostino'
+
+
+def test_shapiro_subamostra_reprodutivel(amostra):
+    grande = np.tile(amostra, 3)
+    a = normalidade.testar_normalidade(grande, 'shapiro_subamostra', tamanho_shapiro=1000, semente=3)
+    b = normalidade.testar_normalidade(grande, 'shapiro_subamostra', tamanho_shapiro=1000, semente=3)
+    assert a.n == 1000 and a.pvalor == b.pvalor
+
+
+def test_momentos_combinados_iguais_aos_da_amostra_inteira(amostra):
+    combinado = Momentos()
+    for bloco in np.array_split(amostra, 7):
+        combinado.atualizar(bloco)
+    inteiro = Momentos.da_amostra(amostra)
+    for campo in ['n', 'media', 'm2', 'm3', 'm4']:
+        assert getattr(combinado, campo) == pytest.approx(getattr(inteiro, campo), rel=1e-9)
+    assert combinado.assimetria == pytest.approx(stats.skew(amostra), rel=1e-9)
+    assert combinado.curtose == pytest.approx(stats.kurtosis(amostra, fisher=False), rel=1e-9)
+
+
+def test_momentos_com_todos_os_metodos(amostra):
+    momentos = Momentos.da_amostra(amostra)
+    assert normalidade.testar_normalidade(momentos, 'dagostino').pvalor == pytest.approx(
+        normalidade.testar_normalidade(amostra, 'dagostino').pvalor)
+    with pytest.raises(ValueError, match='precisa dos resíduos'):
+        normalidade.testar_normalidade(momentos, 'shapiro')
+
+
+def test_metodo_desconhecido(amostra):
+    assert 'lilliefors' not in METODOS_NORMALIDADE
+    with pytest.raises(ValueError, match='desconhecido'):
+        normalidade.testar_normalidade(amostra, 'lilliefors')
+
+
+def test_poucas_observacoes():
+    with pytest.raises(ValueError):
+        dagostino_k2(Momentos.da_amostra(np.arange(5.0)))
+    with pytest.raises(ValueError):
+        anderson_darling(np.arange(5.0))
@@ -0,0 +1,85 @@
+# test_posthoc.py - Amplitude studentizada, Tukey HSD, Games-Howell e ajuste de p-valores
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from anova.posthoc import CORRECOES, ajustar_pvalores, games_howell, sf_amplitude_studentizada, tukey_hsd
+
+pytest.importorskip('statsmodels')
+from statsmodels.stats.multicomp import pairwise_tukeyhsd  # noqa: E402
+from statsmodels.stats.multitest import multipletests  # noqa: E402
+
+
+@pytest.mark.parametrize('k', [2, 3, 8, 28])
+@pytest.mark.parametrize('gl', [5.0, 30.0, 2900.0])
+def test_sf_amplitude_studentizada_igual_ao_scipy(k, gl):
+    q = np.array([0.5, 1.0, 2.5, 4.0, 6.0])
+    esperado = stats.studentized_range.sf(q, k, gl)
+    np.testing.assert_allclose(sf_amplitude_studentizada(q, k, gl), esperado, rtol=1e-5, atol=1e-10)
+
+
+@pytest.mark.parametrize('fator', ['House_Style', 'Bsmt_Full_Bath'])
+def test_tukey_igual_ao_statsmodels(ames, fator):
+    resultado = tukey_hsd(ames[fator], ames['SalePrice'])
+    referencia = pairwise_tukeyhsd(ames['SalePrice'], ames[fator].astype(str))
+    esperado = pd.DataFrame(referencia.summary().data[1:], columns=referencia.summary().data[0])
+
+    np.testing.assert_allclose(resultado['meandiff'], referencia.meandiffs, rtol=1e-9)
+    np.testing.assert_allclose(resultado['lower'], referencia.confint[:, 0], rtol=1e-6)
+    np.testing.assert_allclose(resultado['upper'], referencia.confint[:, 1], rtol=1e-6)
+    np.testing.assert_allclose(resultado['p-adj'], referencia.pvalues, atol=1e-4)
+    np.testing.assert_array_equal(resultado['reject'], referencia.reject)
+    assert list(resultado['group1'].astype(str)) == list(esperado['group1'].astype(str))
+
+
+def test_tukey_top_k_mantem_os_maiores_significativos(ames):
+    completo = tukey_hsd(ames['Neighborhood'], ames['SalePrice'])
+    top = tukey_hsd(ames['Neighborhood'], ames['SalePrice'], top_k=5)
+    significativos = completo[completo['reject']]
+    esperado = significativos.loc[significativos['meandiff'].abs().nlargest(5).index]
+    np.testing.assert_allclose(np.sort(top['meandiff'].abs()), np.sort(esperado['meandiff'].abs()))
+    assert top['reject'].all()
+
+
+def test_games_howell_igual_ao_pingouin(ames):
+    pg = pytest.importorskip('pingouin')
+    dados = ames.assign(House_Style=ames['House_Style'].astype(str))
+    referencia = pg.pairwise_gameshowell(data=dados, dv='SalePrice', between='House_Style')
+    resultado = games_howell(dados['House_Style'], dados['SalePrice'])
+
+    assert list(resultado['A']) == list(referencia['A'])
+    assert list(resultado['B']) == list(referencia['B'])
+    for coluna in ['diff', 'se', 'T', 'df', 'hedges']:
+        np.testing.assert_allclose(resultado[coluna], referencia[coluna], rtol=1e-6, err_msg=coluna)
+    np.testing.assert_allclose(resultado['pval'], referencia['pval'], atol=1e-5)
+
+
+def test_games_howell_ignora_ausentes(sintetico):
+    com_ausentes = sintetico.copy()
+    com_ausentes.loc[::5, 'y'] = np.nan
+    resultado = games_howell(com_ausentes['A'], com_ausentes['y'])
+    validos = com_ausentes.dropna(subset=['y'])
+    esperado = games_howell(validos['A'], validos['y'])
+    pd.testing.assert_frame_equal(resultado, esperado)
+
+
+@pytest.mark.parametrize('metodo,referencia', [('holm', 'holm'), ('bonferroni', 'bonferroni'), ('fdr_bh', 'fdr_bh')])
+def test_ajustar_pvalores_igual_ao_multipletests(metodo, referencia):
+    p = np.random.default_rng(1).uniform(0, 0.2, 40)
+    np.testing.assert_allclose(ajustar_pvalores(p, metodo), multipletests(p, method=referencia)[1], rtol=1e-12)
+
+
+def test_ajustar_pvalores_preserva_nan():
+    p = np.array([0.01, np.nan, 0.04, 0.03])
+    ajustados = ajustar_pvalores(p, 'bonferroni')
+    assert np.isnan(ajustados[1])
+    np.testing.assert_allclose(ajustados[[0, 2, 3]], [0.03, 0.12, 0.09])
+    np.testing.assert_array_equal(ajustar_pvalores(p, 'nenhuma'), p)
+
+
+def test_ajustar_pvalores_correcao_desconhecida():
+    assert 'sidak' not in CORRECOES
+    with pytest.raises(ValueError, match='Correção desconhecida'):
+        ajustar_pvalores([0.01, 0.02], 'sidak')
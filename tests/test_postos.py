@@ -0,0 +1,62 @@
+# test_postos.py - Postos, Kruskal-Wallis e pós-teste de Dunn
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from anova.postos import dunn, kruskal_postos, kruskal_wallis, ranquear
+
+
+def test_ranquear_igual_ao_rankdata():
+    y = np.array([3.0, 1.0, 2.0, 2.0, np.nan, 5.0, 3.0, 3.0])
+    resultado = ranquear(y)
+    validos = ~np.isnan(y)
+    np.testing.assert_allclose(resultado.postos[validos], stats.rankdata(y[validos]))
+    assert np.isnan(resultado.postos[4])
+    # Empates: um bloco de 2 e um de 3 -> (8 - 2) + (27 - 3)
+    assert resultado.soma_empates == pytest.approx(30.0)
+
+
+@pytest.mark.parametrize('fator', ['Neighborhood', 'House_Style', 'Bsmt_Full_Bath'])
+def test_kruskal_igual_ao_scipy(ames, fator):
+    referencia = stats.kruskal(*[g['SalePrice'].to_numpy() for _, g in ames.groupby(fator, observed=True)])
+    resultado = kruskal_wallis(ames[fator], ames['SalePrice'])
+    assert resultado.h == pytest.approx(referencia.statistic, rel=1e-10)
+    assert resultado.pvalor == pytest.approx(referencia.pvalue, rel=1e-6, abs=1e-300)
+
+
+def test_kruskal_postos_compartilhados(ames):
+    postos = ranquear(ames['SalePrice'])
+    for fator in ['Neighborhood', 'House_Style']:
+        assert kruskal_postos(ames[fator], postos).h == pytest.approx(
+            kruskal_wallis(ames[fator], ames['SalePrice']).h, rel=1e-12)
+
+
+def test_kruskal_requer_dois_grupos():
+    with pytest.raises(ValueError):
+        kruskal_wallis(np.array(['a'] * 6), np.arange(6.0))
+
+
+def test_dunn_igual_a_formula(sintetico):
+    resultado = dunn(sintetico['A'], sintetico['y'], correcao='nenhuma')
+    postos = stats.rankdata(sintetico['y'])
+    n = len(postos)
+    grupos = {nivel: postos[(sintetico['A'] == nivel).to_numpy()] for nivel in sorted(sintetico['A'].unique())}
+    # Sem empates: variância n(n+1)/12
+    for _, linha in resultado.iterrows():
+        a, b = grupos[linha['A']], grupos[linha['B']]
+        z = (a.mean() - b.mean()) / np.sqrt(n * (n + 1) / 12.0 * (1 / len(a) + 1 / len(b)))
+        assert linha['z'] == pytest.approx(z, rel=1e-10)
+        assert linha['pval'] == pytest.approx(2 * stats.norm.sf(abs(z)), rel=1e-8)
+    np.testing.assert_array_equal(resultado['p-adj'], resultado['pval'])
+
+
+def test_dunn_holm_e_correcao_desconhecida(sintetico):
+    bruto = dunn(sintetico['A'], sintetico['y'], correcao='nenhuma')
+    holm = dunn(sintetico['A'], sintetico['y'], correcao='holm')
+    p = bruto['pval'].to_numpy()
+    ordem = np.argsort(p)
+    esperado = np.minimum(np.maximum.accumulate(p[ordem] * (len(p) - np.arange(len(p)))), 1.0)
+    np.testing.assert_allclose(holm['p-adj'].to_numpy()[ordem], esperado)
+    with pytest.raises(ValueError):
+        dunn(sintetico['A'], sintetico['y'], correcao='tukey')
@@ -0,0 +1,52 @@
+# test_reamostragem.py - Teste F por permutação e bootstrap das médias por grupo
+
+import numpy as np
+import pytest
+
+from anova import reamostragem
+from anova.estatisticas import IndiceFator, anova_um_fator
+
+# Pelo módulo: importada pelo nome, `teste_permutacao_f` seria coletada como teste pelo pytest
+permutacao = reamostragem.teste_permutacao_f
+
+
+def test_permutacao_f_observado_igual_ao_da_anova(sintetico):
+    resultado = permutacao(sintetico['A'], sintetico['y'], n_permutacoes=199)
+    assert resultado.f == pytest.approx(anova_um_fator(sintetico['A'], sintetico['y']).f, rel=1e-10)
+
+
+def test_permutacao_efeito_forte_e_nulo():
+    rng = np.random.default_rng(5)
+    fator = np.repeat(['a', 'b', 'c'], 40)
+    forte = rng.normal(size=120) + 3 * (fator == 'c')
+    assert permutacao(fator, forte, n_permutacoes=499).pvalor == pytest.approx(1 / 500)
+    nulo = permutacao(fator, rng.normal(size=120), n_permutacoes=499)
+    assert 1 / 500 < nulo.pvalor <= 1.0
+
+
+def test_permutacao_reprodutivel_e_indice_fator(sintetico):
+    a = permutacao(sintetico['B'], sintetico['y'], n_permutacoes=299, semente=11)
+    b = permutacao(IndiceFator.criar(sintetico['B']), sintetico['y'], n_permutacoes=299, semente=11)
+    assert a == b
+
+
+def test_permutacao_requer_mais_observacoes_que_grupos():
+    with pytest.raises(ValueError):
+        permutacao(np.array(['a', 'b']), np.array([1.0, 2.0]), n_permutacoes=9)
+
+
+def test_bootstrap_medias(sintetico):
+    resultado = reamostragem.bootstrap_medias(sintetico['A'], sintetico['y'], n_reamostras=500, semente=2)
+    agrupado = sintetico.groupby('A')['y']
+    np.testing.assert_array_equal(resultado['n'], agrupado.size().to_numpy())
+    np.testing.assert_allclose(resultado['media'], agrupado.mean().to_numpy(), rtol=1e-12)
+    assert (resultado['ic_inf'] < resultado['media']).all() and (resultado['media'] < resultado['ic_sup']).all()
+    # Largura próxima de 2 · 1,96 · erro-padrão da média
+    largura_normal = 2 * 1.96 * (agrupado.std() / np.sqrt(agrupado.size())).to_numpy()
+    np.testing.assert_allclose(resultado['ic_sup'] - resultado['ic_inf'], largura_normal, rtol=0.2)
+
+
+def test_bootstrap_reprodutivel(sintetico):
+    a = reamostragem.bootstrap_medias(sintetico['B'], sintetico['y'], n_reamostras=200, semente=4)
+    b = reamostragem.bootstrap_medias(sintetico['B'], sintetico['y'], n_reamostras=200, semente=4)
+    np.testing.assert_array_equal(a.to_numpy(), b.to_numpy())
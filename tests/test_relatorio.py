@@ -0,0 +1,55 @@
+# test_relatorio.py - Descrição das colunas e relatório final montados a partir dos resultados
+
+import pytest
+
+from anova.analises import calcular_avaliacao, calcular_gameshowell, calcular_qq_medias, calcular_resumo_boxplot
+from anova.indice import IndiceDados
+from anova.relatorio import relatorio_final, secao_testes, tabela_descricoes
+
+FATORES = ['Neighborhood', 'House_Style', 'Bsmt_Full_Bath']
+
+
+@pytest.fixture(scope='module')
+def resultados(ames):
+    indice = IndiceDados(ames, 'SalePrice', FATORES)
+    avaliacoes = {var: calcular_avaliacao(indice, var) for var in FATORES}
+    comparacoes = {}
+    for var in FATORES:
+        gh = calcular_gameshowell(indice, var)
+        comparacoes[var] = (int(gh['significant'].sum()), len(gh))
+    qq = {var: calcular_qq_medias(indice, var) for var in FATORES}
+    boxplots = {var: calcular_resumo_boxplot(indice, var)[0] for var in FATORES}
+    return avaliacoes, comparacoes, qq, boxplots
+
+
+def test_tabela_descricoes():
+    tabela = tabela_descricoes(['House_Style', 'SalePrice', 'Coluna_Nova'])
+    assert list(tabela['Descrição']) == ['Estilo da residência', 'Preço final de venda da casa', '']
+
+
+def test_relatorio_segue_os_resultados(resultados):
+    avaliacoes, comparacoes, qq, boxplots = resultados
+    texto = relatorio_final(avaliacoes, comparacoes, qq, boxplots)
+    for var in FATORES:
+        assert f"| {var} |" in texto
+        significativos, total = comparacoes[var]
+        assert f"{var}: {significativos} de {total} pares" in texto
+    # Nenhum fator do Ames atende os pressupostos
+    assert "Em nenhuma das variáveis os pressupostos" in texto
+    assert texto.count('\n---\n') == 8
+
+
+def test_relatorio_muda_com_os_fatores(resultados):
+    so_house_style = [{'House_Style': resultado['House_Style']} for resultado in resultados]
+    texto = relatorio_final(*so_house_style)
+    assert 'Neighborhood' not in texto and 'House_Style' in texto
+
+
+def test_conclusao_quando_os_pressupostos_sao_atendidos(resultados):
+    avaliacoes = resultados[0]
+    atendido = {'X': type(avaliacoes['House_Style'])(
+        pvalor_anova=0.2, teste_normalidade='Shapiro-Wilk', p_normalidade=0.4, p_bp=0.3,
+        eta_quadrado=0.01, omega_quadrado=0.0)}
+    texto = secao_testes(atendido)
+    assert "| X | 0.2000 |" in texto and "✅ Sim (p = 0.4000)" in texto
+    assert "Em todas as variáveis os pressupostos da ANOVA tradicional foram atendidos." in texto
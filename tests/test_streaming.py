@@ -0,0 +1,94 @@
+# test_streaming.py - ANOVA em blocos a partir de CSV
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from anova.dados import carregar_tabela
+from anova.estatisticas import anova_um_fator
+from anova.multifatorial import anova_multifatorial_esparsa
+from anova.streaming import (
+    AcumuladorAnova,
+    acumular_csv,
+    anova_multifatorial_streaming,
+    anova_um_fator_streaming,
+)
+
+from conftest import CAMINHO_AMES
+
+
+def test_um_fator_em_blocos_igual_ao_completo():
+    tabela = anova_um_fator_streaming(CAMINHO_AMES, 'Bsmt_Full_Bath', 'SalePrice', tamanho_bloco=500)
+    # Só as colunas lidas entram no descarte de ausentes
+    dados = carregar_tabela(CAMINHO_AMES, colunas=['SalePrice', 'Bsmt_Full_Bath'], usar_sidecar=False).dropna()
+    esperado = anova_um_fator(dados['Bsmt_Full_Bath'], dados['SalePrice'])
+    assert tabela['F'].iloc[0] == pytest.approx(esperado.f, rel=1e-9)
+    assert tabela['sum_sq'].iloc[1] == pytest.approx(esperado.ss_dentro, rel=1e-9)
+
+
+def test_multifatorial_em_blocos_igual_ao_completo(ames):
+    fatores = ['Neighborhood', 'House_Style', 'Bsmt_Full_Bath']
+    tabela = anova_multifatorial_streaming(CAMINHO_AMES, 'SalePrice', fatores, tamanho_bloco=700)
+    esperado = anova_multifatorial_esparsa(ames, 'SalePrice', fatores)
+    np.testing.assert_allclose(tabela['sum_sq'], esperado['sum_sq'], rtol=1e-7)
+    np.testing.assert_allclose(tabela['df'], esperado['df'])
+
+
+def test_fator_com_tipos_diferentes_entre_blocos(tmp_path):
+    """Um bloco só com números e outro com texto: os rótulos '1' precisam ser o mesmo nível."""
+    rng = np.random.default_rng(0)
+    n = 4000
+    fator = np.concatenate([rng.choice(['1', '2'], n // 2), rng.choice(['1', '2', 'A'], n // 2)])
+    y = rng.normal(size=n) + (fator == 'A')
+    caminho = tmp_path / 'misto.csv'
+    pd.DataFrame({'Y': y, 'F': fator}).to_csv(caminho, index=False)
+
+    acumulador = acumular_csv(caminho, 'Y', ['F'], tamanho_bloco=n // 2)
+    assert sorted(acumulador.resumo_grupos('F').index) == ['1', '2', 'A']
+    tabela = acumulador.tabela_um_fator('F')
+    assert tabela['F'].iloc[0] == pytest.approx(anova_um_fator(fator, y).f, rel=1e-9)
+
+
+def test_combinar_acumuladores_igual_a_um_so(sintetico):
+    inteiro = AcumuladorAnova('y', ['A', 'B']).atualizar(sintetico)
+    partes = [AcumuladorAnova('y', ['A', 'B']).atualizar(bloco) for bloco in (sintetico.iloc[:200], sintetico.iloc[200:450], sintetico.iloc[450:])]
+    combinado = partes[0].combinar(partes[1]).combinar(partes[2])
+    pd.testing.assert_frame_equal(combinado.tabela_multifatorial(), inteiro.tabela_multifatorial(),
+                                  check_exact=False, rtol=1e-9)
+    pd.testing.assert_frame_equal(combinado.resumo_grupos('A'), inteiro.resumo_grupos('A'),
+                                  check_exact=False, rtol=1e-9)
+
+
+def test_combinar_variaveis_diferentes(sintetico):
+    with pytest.raises(ValueError):
+        AcumuladorAnova('y', ['A']).combinar(AcumuladorAnova('y', ['B']))
+
+
+def test_um_fator_sem_variancia_dentro_dos_grupos():
+    dados = pd.DataFrame({'y': [1.0, 1.0, 2.0, 2.0], 'g': ['a', 'a', 'b', 'b']})
+    tabela = AcumuladorAnova('y', ['g']).atualizar(dados).tabela_um_fator('g')
+    assert tabela.loc['C(g)', 'F'] == np.inf
+    assert tabela.loc['C(g)', 'PR(>F)'] == 0.0
+
+
+@pytest.mark.parametrize('y,g', [([1.0, 2.0, 3.0], ['a', 'a', 'a']), ([1.0, 2.0, 3.0], ['a', 'b', 'c'])])
+def test_um_fator_sem_graus_de_liberdade(y, g):
+    tabela = AcumuladorAnova('y', ['g']).atualizar(pd.DataFrame({'y': y, 'g': g})).tabela_um_fator('g')
+    assert np.isnan(tabela.loc['C(g)', 'F']) and np.isnan(tabela.loc['C(g)', 'PR(>F)'])
+
+
+def test_niveis_de_tipos_diferentes_entre_blocos():
+    acumulador = AcumuladorAnova('y', ['g'])
+    acumulador.atualizar(pd.DataFrame({'y': [1.0, 2.0, 3.0], 'g': [1, 1, 2]}))
+    acumulador.atualizar(pd.DataFrame({'y': [4.0, 6.0, 5.0], 'g': ['x', 'x', 'NA']}))
+    assert list(acumulador.resumo_grupos('g').index) == [1, 2, 'NA', 'x']
+    assert acumulador.tabela_um_fator('g').loc['Residual', 'df'] == 2.0
+
+
+def test_multifatorial_com_fatores_confundidos(sintetico):
+    """Sem posto completo a Tipo II cai nos submodelos: o fator duplicado fica com gl 0."""
+    dados = sintetico.assign(E=sintetico['A'].map({'a1': 'e1', 'a2': 'e2', 'a3': 'e3', 'a4': 'e4'}))
+    tabela = AcumuladorAnova('y', ['A', 'E', 'B']).atualizar(dados).tabela_multifatorial()
+    esperado = anova_multifatorial_esparsa(dados, 'y', ['A', 'E', 'B'])
+    assert list(tabela['df']) == list(esperado['df']) == [0.0, 0.0, 2.0, 594.0]
+    np.testing.assert_allclose(tabela['sum_sq'], esperado['sum_sq'], rtol=1e-9, atol=1e-8)
@@ -0,0 +1,34 @@
+# test_tardio.py - Importações adiadas: a partida não carrega as bibliotecas pesadas
+
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from anova import dados
+
+from conftest import RAIZ
+
+
+def _carregados_apos_importar(modulo, candidatos):
+    codigo = (f"import sys; sys.path.insert(0, {os.path.join(RAIZ, 'src')!r}); import {modulo}; "
+              f"print(','.join(m for m in {candidatos!r} if m in sys.modules))")
+    saida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True)
+    return [m for m in saida.stdout.strip().split(',') if m]
+
+
+def test_dados_nao_importa_o_parquet_na_partida():
+    assert _carregados_apos_importar('anova.dados', ['pyarrow.parquet', 'scipy.stats']) == []
+
+
+def test_sidecar_com_pyarrow_tardio(tmp_path):
+    pytest.importorskip('pyarrow')
+    caminho = tmp_path / 'dados.csv'
+    pd.DataFrame({'Sale Price': [1.0, 2.0, 3.0], 'Grupo': ['a', 'b', 'a']}).to_csv(caminho, index=False)
+    primeira = dados.carregar_tabela(str(caminho))
+    assert os.path.exists(dados.caminho_sidecar(str(caminho)))
+    segunda = dados.carregar_tabela(str(caminho), colunas=['Grupo'])
+    assert list(segunda['Grupo']) == list(primeira['Grupo']) == ['a', 'b', 'a']
+    assert dados.colunas_disponiveis(str(caminho)) == ['Sale_Price', 'Grupo']
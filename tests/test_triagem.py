@@ -0,0 +1,26 @@
+# test_triagem.py - Triagem dos pressupostos em todas as colunas categóricas
+
+import pandas as pd
+import pytest
+
+from anova.estatisticas import anova_um_fator
+from anova.triagem import colunas_categoricas, triagem_pressupostos
+
+
+def test_triagem_igual_a_analise_isolada(ames):
+    tabela, erros = triagem_pressupostos(ames, 'SalePrice', min_grupo=3, max_workers=1)
+    # Neighborhood tem um bairro com uma única venda
+    assert list(tabela['Variável']) == ['House_Style']
+    tabela, erros = triagem_pressupostos(ames, 'SalePrice', min_grupo=1, max_workers=1)
+    assert not erros
+    assert set(tabela['Variável']) == set(colunas_categoricas(ames, excluir={'SalePrice'}))
+    linha = tabela.set_index('Variável').loc['Neighborhood']
+    anova = anova_um_fator(ames['Neighborhood'], ames['SalePrice'])
+    assert linha['ANOVA (p)'] == pytest.approx(anova.pvalor, rel=1e-6, abs=1e-300)
+    assert linha['Breusch-Pagan (p)'] == round(anova.bp_pvalor, 4)
+    assert not linha['Atende Pressupostos']
+
+
+def test_colunas_categoricas():
+    df = pd.DataFrame({'x': [1.0, 2.0], 'c': pd.Categorical(['a', 'b']), 't': ['u', 'v'], 'PID': ['1', '2']})
+    assert colunas_categoricas(df, excluir={'PID'}) == ['c', 't']